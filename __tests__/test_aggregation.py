@@ -0,0 +1,120 @@
+import random
+
+from ..aggregation import Count, Distinct, Max, Mean, Min, Quantile, Sum
+from ..common import Barrier, Start, Stop
+from ..group_by_stage import GroupByStage
+from ..window_stage import SlidingWindowStage, TumblingWindowStage
+
+AGGREGATIONS = {
+    'items': (None, Count),
+    'total': ('value', Sum),
+    'low': ('value', Min),
+    'high': ('value', Max),
+    'mean': ('value', Mean),
+}
+
+
+def test_accumulators() -> None:
+    distinct = Distinct()
+    for i in range(20000):
+        distinct.add(i % 5000)
+    assert abs(distinct.result() - 5000) < 250
+
+    values = list(range(10001))
+    random.Random(1).shuffle(values)
+    median, p90 = Quantile(), Quantile(0.9)
+    for value in values:
+        median.add(value)
+        p90.add(value)
+    assert abs(median.result() - 5000) < 200
+    assert abs(p90.result() - 9000) < 200
+
+    exact = Quantile()
+    for value in [3, 1, 2]:
+        exact.add(value)
+    assert exact.result() == 2
+
+
+def test_group_by() -> None:
+    stage = GroupByStage('user', AGGREGATIONS, flush_items=3)
+    items = [{'user': f'user{i % 2}', 'value': i} for i in range(8)]
+    items.append({'user': 'user0', 'value': None})
+    result = list(stage.run([Start(), *items, Barrier(None), Stop()]))
+
+    assert result == [
+        Start(),
+        {'user': 'user0', 'items': 3, 'total': 6, 'low': 0, 'high': 4,
+         'mean': 2.0},
+        {'user': 'user1', 'items': 3, 'total': 9, 'low': 1, 'high': 5,
+         'mean': 3.0},
+        {'user': 'user0', 'items': 2, 'total': 6, 'low': 6, 'high': 6,
+         'mean': 6.0},
+        {'user': 'user1', 'items': 1, 'total': 7, 'low': 7, 'high': 7,
+         'mean': 7.0},
+        Stop(),
+    ]
+
+
+def test_count_windows() -> None:
+    items = [{'user': 'user0', 'value': i} for i in range(5)]
+    aggregations = {'total': ('value', Sum)}
+
+    tumbling = TumblingWindowStage(aggregations, key='user', size=2)
+    assert list(tumbling.run([Start(), *items, Stop()])) == [
+        Start(),
+        {'user': 'user0', 'window_start': 0, 'window_end': 2, 'total': 1},
+        {'user': 'user0', 'window_start': 2, 'window_end': 4, 'total': 5},
+        {'user': 'user0', 'window_start': 4, 'window_end': 5, 'total': 4},
+        Stop(),
+    ]
+
+    sliding = SlidingWindowStage(aggregations, step=1, size=3)
+    totals = [
+        item['total'] for item in sliding.run([Start(), *items, Stop()])
+        if 'total' in item
+    ]
+    assert totals == [3, 6, 9, 7, 4]
+
+
+def test_window_keys() -> None:
+    # The bounds are stream positions, and idle keys are dropped.
+    items = [{'user': f'user{i % 3}', 'value': i} for i in range(7)]
+    stage = TumblingWindowStage({'total': ('value', Sum)}, key='user', size=2)
+    result = list(stage.run([Start(), *items[:6]]))
+    assert result == [
+        Start(),
+        {'user': 'user0', 'window_start': 0, 'window_end': 4, 'total': 3},
+        {'user': 'user1', 'window_start': 1, 'window_end': 5, 'total': 5},
+        {'user': 'user2', 'window_start': 2, 'window_end': 6, 'total': 7},
+    ]
+    assert not stage._windows
+
+
+def test_logged_columns() -> None:
+    # The logged data of the items and signals is not merged into groups.
+    items = [{'user': f'user{i % 2}', 'value': i} for i in range(4)]
+    stage = GroupByStage('user', {'total': ('value', Sum)})
+    result = list(stage.run(
+        [Start(), *items, Stop()], logged_columns=['user', 'value']))
+    assert result[1:-1] == [
+        {'user': 'user0', 'total': 2}, {'user': 'user1', 'total': 4}]
+
+
+def test_time_windows() -> None:
+    times = [0.5, 1.5, 2.5, 1.0, 4.5, 0.2]
+    items = [{'time': t, 'value': 1} for t in times]
+    stage = SlidingWindowStage(
+        {'items': (None, Count)}, step=1, duration=2, time_column='time')
+    result = list(stage.run([Start(), *items, Stop()]))
+
+    assert result == [
+        Start(),
+        {'window_start': -1, 'window_end': 1, 'items': 1},
+        {'window_start': 0, 'window_end': 2, 'items': 2},
+        {'window_start': 1, 'window_end': 3, 'items': 3},
+        {'window_start': 2, 'window_end': 4, 'items': 1},
+        {'window_start': 3, 'window_end': 5, 'items': 1},
+        {'window_start': 4, 'window_end': 6, 'items': 1},
+        Stop(),
+    ]
+    assert stage.late_items == 1
@@ -0,0 +1,169 @@
+import asyncio
+from typing import AsyncIterator, Dict, Iterable, Iterator, List
+
+from ..async_consumer import AsyncConsumer
+from ..async_pipeline import AsyncPipeline
+from ..async_stage import AsyncStage
+from ..async_task import AsyncTask
+from ..common import Start, Stop
+from ..consumer import Consumer
+from ..filter import Filter
+from ..pipeline import Pipeline
+from ..predicates import col
+from ..producer import Producer
+from ..serial_producer import SerialProducer
+from .data import Stage1
+
+
+class DelayStage(AsyncStage):
+    def __init__(self) -> None:
+        super().__init__(concurrency=3)
+        self.running = 0
+        self.max_running = 0
+
+    @property
+    def input_columns(self) -> List[str]:
+        return ['key3']
+
+    async def process(self, item: Dict) -> AsyncIterator:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01 * (item['key3'] % 4))
+        self.running -= 1
+        yield {'key5': item['key3'] * 10}
+
+
+class BatchStage(Stage1):
+    def __init__(self) -> None:
+        super().__init__(batch_size=4)
+        self.batches: List[int] = []
+
+    def process_batch(self, items: List[Dict]) -> Iterator[Iterable[Dict]]:
+        self.batches.append(len(items))
+        return super().process_batch(items)
+
+
+class ListConsumer(AsyncConsumer):
+    def __init__(self) -> None:
+        self.items: List[Dict] = []
+
+    async def setup(self, item: Dict) -> None:
+        self.items.append(item)
+
+    async def process(self, item: Dict) -> None:
+        self.items.append(item)
+
+    async def teardown(self, item: Dict) -> None:
+        self.items.append(item)
+
+
+def get_producer() -> Producer:
+    return SerialProducer(
+        {'key1': i, 'key2': i, 'key4': i} for i in range(6))
+
+
+def test_pipeline() -> None:
+    stage = DelayStage()
+    consumer = ListConsumer()
+    pipeline = AsyncPipeline(
+        stage=Stage1(),
+        logged_columns=['key4'],
+    ).add_stage(
+        stage=stage,
+        logged_columns=['key4'],
+    )
+
+    async def run() -> None:
+        async def stream() -> AsyncIterator:
+            for item in get_producer().stream:
+                yield item
+        await consumer.consume(pipeline.run(stream()))
+
+    asyncio.run(run())
+
+    assert consumer.items == [
+        Start(),
+        *({'key5': 20 * i, 'key4': i} for i in range(6)),
+        Stop(),
+    ]
+    assert stage.max_running == 3
+
+
+class CollectConsumer(Consumer):
+    def __init__(self) -> None:
+        super().__init__()
+        self.items: List[Dict] = []
+
+    def process(self, item: Dict) -> None:
+        self.items.append(item)
+
+
+class SyncGraphTask(AsyncTask):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._consumer = CollectConsumer()
+
+    @property
+    def pipeline(self) -> Pipeline:
+        return Pipeline(stage=Stage1())
+
+    @property
+    def consumer(self) -> Consumer:
+        return self._consumer
+
+    @property
+    def producer(self) -> Producer:
+        return get_producer()
+
+
+def test_task_adapts_sync_graph() -> None:
+    task = SyncGraphTask()
+    task.main()
+
+    assert task.consumer.items == [{'key3': 2 * i} for i in range(6)]
+
+
+def test_sync_stage_run() -> None:
+    # Synchronous stages run through their own run method, in batch mode
+    # or with their predicates.
+    stage = BatchStage()
+    pipeline = AsyncPipeline(
+        Filter(where=col('key1') > 1, batch_size=2),
+    ).add_stage(stage, logged_columns=['key4'])
+    consumer = ListConsumer()
+
+    async def run() -> None:
+        async def stream() -> AsyncIterator:
+            for item in get_producer().stream:
+                yield item
+        await consumer.consume(pipeline.run(stream()))
+
+    asyncio.run(run())
+
+    assert consumer.items == [
+        Start(), *({'key3': 2 * i, 'key4': i} for i in range(2, 6)), Stop()]
+    assert stage.batches == [4]
+
+
+def test_nested_pipeline() -> None:
+    # The logged columns of the outer pipeline are carried through all the
+    # stages of a nested asynchronous pipeline.
+    pipeline = AsyncPipeline(
+        AsyncPipeline(Stage1()),
+        logged_columns=['key4'],
+    ).add_stage(DelayStage(), logged_columns=['key4'])
+    consumer = ListConsumer()
+
+    async def run() -> None:
+        async def stream() -> AsyncIterator:
+            for item in get_producer().stream:
+                yield item
+        await consumer.consume(pipeline.run(stream()))
+
+    asyncio.run(run())
+
+    assert consumer.items == [
+        Start(),
+        *({'key5': 20 * i, 'key4': i} for i in range(6)),
+        Stop(),
+    ]
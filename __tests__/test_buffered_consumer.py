@@ -0,0 +1,72 @@
+import csv
+import json
+import sqlite3
+from typing import Dict, List
+
+import pytest
+
+from ..buffered_consumer import BufferedConsumer
+from ..csv_consumer import CsvConsumer
+from ..json_lines_consumer import JsonLinesConsumer
+from ..serial_producer import SerialProducer
+from ..sqlite_consumer import SqliteConsumer
+
+
+class ListConsumer(BufferedConsumer):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.batches: List[List[Dict]] = []
+
+    @property
+    def required_columns(self):
+        return {'id'}
+
+    def flush(self, batch: List[Dict]) -> None:
+        self.batches.append(batch)
+
+
+def get_items(length: int) -> List[Dict]:
+    return [{'id': i, 'name': f'n{i}'} for i in range(length)]
+
+
+def test_flush_bounds() -> None:
+    consumer = ListConsumer(max_items=3)
+    consumer.consume(SerialProducer(get_items(7)).stream)
+    assert [len(batch) for batch in consumer.batches] == [3, 3, 1]
+
+    consumer = ListConsumer(max_items=100, max_bytes=1)
+    consumer.consume(SerialProducer(get_items(2)).stream)
+    assert [len(batch) for batch in consumer.batches] == [1, 1]
+
+
+def test_required_columns() -> None:
+    consumer = ListConsumer(max_items=10)
+    with pytest.raises(ValueError):
+        consumer.consume(SerialProducer([{'id': 1}, {'name': 'x'}]).stream)
+    assert consumer.batches == []
+
+
+def test_sinks(tmp_path) -> None:
+    items = get_items(5)
+    json_path = tmp_path / 'data.jsonl'
+    JsonLinesConsumer(str(json_path), max_items=2).consume(
+        SerialProducer(items).stream)
+    assert [
+        json.loads(line) for line in json_path.read_text().splitlines()
+    ] == items
+
+    csv_path = tmp_path / 'data.csv'
+    CsvConsumer(str(csv_path), ['name', 'id'], max_items=2).consume(
+        SerialProducer(items).stream)
+    with open(csv_path, newline='') as file:
+        assert list(csv.reader(file)) == [['name', 'id']] + [
+            [item['name'], str(item['id'])] for item in items]
+
+    database = str(tmp_path / 'data.db')
+    with sqlite3.connect(database) as connection:
+        connection.execute('CREATE TABLE data (id INTEGER, name TEXT)')
+    SqliteConsumer(database, 'data', ['id', 'name'], max_items=2).consume(
+        SerialProducer(items).stream)
+    with sqlite3.connect(database) as connection:
+        rows = connection.execute('SELECT id, name FROM data').fetchall()
+    assert rows == [(item['id'], item['name']) for item in items]
@@ -0,0 +1,66 @@
+from typing import Dict, Iterator, List
+
+from ..cache import MISSING, LFUCache, LRUCache, SqliteBackend, TTLCache
+from ..cached_stage import CachedStage
+from ..serial_producer import SerialProducer
+from ..stage import Stage
+
+
+class LookupStage(Stage):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    @property
+    def input_columns(self) -> List[str]:
+        return ['key']
+
+    def process(self, item: Dict) -> Iterator:
+        self.calls += 1
+        yield {'value': item['key'] * 10}
+
+
+def test_cached_stage() -> None:
+    stage = LookupStage()
+    cached = CachedStage(stage, cache=LRUCache(max_entries=2))
+    items = [{'key': key, 'id': i} for i, key in enumerate([1, 2, 1, 3, 1])]
+    result = list(cached.run(
+        SerialProducer(items).stream, logged_columns=['id']))
+
+    assert [item['value'] for item in result[1:-1]] == [10, 20, 10, 30, 10]
+    assert [item['id'] for item in result[1:-1]] == [0, 1, 2, 3, 4]
+    assert stage.calls == 3
+    assert (cached.hits, cached.misses) == (2, 3)
+
+
+def test_eviction() -> None:
+    lru = LRUCache(max_entries=2)
+    lfu = LFUCache(max_entries=2)
+    for cache in (lru, lfu):
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.get('a')
+        cache.get('b')
+        cache.put('c', 3)
+    assert lru.get('a') is MISSING and lru.get('b') == 2
+    assert lfu.get('a') == 1 and lfu.get('b') is MISSING
+
+    ttl = TTLCache(ttl=0)
+    ttl.put('a', 1)
+    assert ttl.get('a') is MISSING
+
+    cache = LRUCache(max_bytes=1000)
+    for i in range(100):
+        cache.put(i, [{'value': i}])
+    assert 0 < len(cache) < 100 and cache.size <= 1000
+
+
+def test_persistent_backend(tmp_path) -> None:
+    path = str(tmp_path / 'cache.db')
+    for run in range(2):
+        stage = LookupStage()
+        cached = CachedStage(stage, cache=LRUCache(
+            max_entries=10, backend=SqliteBackend(path)))
+        list(cached.run(SerialProducer([{'key': 1}, {'key': 2}]).stream))
+        assert stage.calls == (2 if run == 0 else 0)
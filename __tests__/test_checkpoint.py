@@ -0,0 +1,179 @@
+import json
+from typing import Dict, Iterator, List
+
+from ..buffered_consumer import BufferedConsumer
+from ..checkpoint import Checkpoint
+from ..common import Barrier, Start, Stop
+from ..consumer import Consumer
+from ..csv_producer import CsvProducer
+from ..filter import Filter
+from ..hybrid_consumer import HybridConsumer
+from ..json_lines_consumer import JsonLinesConsumer
+from ..json_lines_producer import JsonLinesProducer
+from ..pipeline import Pipeline
+from ..predicates import col
+from ..serial_producer import SerialProducer
+from ..stage import Stage
+from ..task import Task
+
+
+class PassStage(Stage):
+    @property
+    def stateless(self) -> bool:
+        return True
+
+    def process(self, item: Dict) -> Iterator:
+        yield item
+
+
+class FailingConsumer(BufferedConsumer):
+    def __init__(self, fail_at: int = None) -> None:
+        super().__init__(max_items=3)
+        self.fail_at = fail_at
+        self.items: List[Dict] = []
+
+    def process(self, item: Dict) -> None:
+        if item['key'] == self.fail_at:
+            raise RuntimeError('Failure')
+        super().process(item)
+
+    def flush(self, batch: List[Dict]) -> None:
+        self.items.extend(batch)
+
+
+class CheckpointTask(Task):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._consumer = FailingConsumer(kwargs.get('fail_at'))
+
+    @property
+    def producer(self) -> SerialProducer:
+        return SerialProducer([{'key': i} for i in range(10)])
+
+    @property
+    def pipeline(self) -> Pipeline:
+        return Pipeline(PassStage(batch_size=4))
+
+    @property
+    def consumer(self) -> Consumer:
+        return self._consumer
+
+
+def test_resume(tmp_path) -> None:
+    path = str(tmp_path / 'task.checkpoint')
+    task = CheckpointTask(checkpoint=path, checkpoint_items=2, fail_at=7)
+    task.main()
+    assert [item['key'] for item in task.consumer.items] == list(range(6))
+    assert Checkpoint(path).load() == 6
+
+    task = CheckpointTask(checkpoint=path, resume=True)
+    task.main()
+    assert [item['key'] for item in task.consumer.items] == [6, 7, 8, 9]
+    assert Checkpoint(path).load() is None
+
+
+class FilteredCheckpointTask(CheckpointTask):
+    @property
+    def pipeline(self) -> Pipeline:
+        return Pipeline(
+            Filter(where=col('key').isin({0, 2, 4, 6, 8})),
+        ).add_stage(PassStage(batch_size=4))
+
+
+def test_resume_optimized(tmp_path) -> None:
+    path = str(tmp_path / 'task.checkpoint')
+    task = FilteredCheckpointTask(
+        checkpoint=path, checkpoint_items=2, optimize=True, fail_at=6)
+    task.main()
+    assert [item['key'] for item in task.consumer.items] == [0, 2]
+    assert Checkpoint(path).load() == 3
+
+    task = FilteredCheckpointTask(checkpoint=path, resume=True, optimize=True)
+    task.main()
+    assert [item['key'] for item in task.consumer.items] == [4, 6, 8]
+    assert Checkpoint(path).load() is None
+
+
+class CrashingConsumer(JsonLinesConsumer):
+    def __init__(self, path: str, fail_at: int) -> None:
+        super().__init__(path, max_items=1000)
+        self.fail_at = fail_at
+        self.written = None
+
+    def process(self, item: Dict) -> None:
+        if item['key'] == self.fail_at:
+            # The lines written to the file so far survive a crash.
+            with open(self.path) as file:
+                self.written = len(file.readlines())
+            raise RuntimeError('Failure')
+        super().process(item)
+
+
+class FileCheckpointTask(CheckpointTask):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._consumer = CrashingConsumer(
+            kwargs['output'], kwargs.get('fail_at'))
+
+
+def test_resume_file_sink(tmp_path) -> None:
+    path = str(tmp_path / 'task.checkpoint')
+    task = FileCheckpointTask(
+        checkpoint=path, checkpoint_items=2, fail_at=7,
+        output=str(tmp_path / 'out.jsonl'),
+    )
+    task.main()
+    assert Checkpoint(path).load() == 6
+    assert task.consumer.written == 6
+
+
+class BufferingStage(Stage):
+    def __init__(self) -> None:
+        super().__init__()
+        self.items: List[Dict] = []
+
+    def process(self, item: Dict) -> List[Dict]:
+        self.items.append(item)
+        return []
+
+
+def test_stateful_stage_drops_barriers() -> None:
+    # Stages are stateful unless they declare otherwise.
+    signals = [Start(), {'key': 1}, Barrier(None), Stop()]
+    for stage, count in ((BufferingStage(), 0), (PassStage(), 1)):
+        outputs = list(stage.run(signals))
+        assert sum(isinstance(item, Barrier) for item in outputs) == count
+
+
+def test_barrier_waits_for_all_consumers() -> None:
+    acknowledged = []
+    first, second = FailingConsumer(), FailingConsumer()
+    consumer = HybridConsumer([first, second])
+    barrier = Barrier(callback=acknowledged.append)
+    consumer.consume([Start(), {'key': 1}, barrier, Stop()])
+    assert acknowledged == [barrier]
+    assert first.items == second.items == [{'key': 1}]
+
+
+def test_file_producer_offset(tmp_path) -> None:
+    path = tmp_path / 'data.jsonl'
+    items = [{'key': i} for i in range(50)]
+    path.write_text(''.join(json.dumps(item) + '\n' for item in items))
+    csv_path = tmp_path / 'data.csv'
+    csv_path.write_text('key\n' + ''.join(f'{i}\n' for i in range(50)))
+
+    for get_producer, expected in (
+        (lambda: JsonLinesProducer(str(path), chunk_size=64), items),
+        (
+            lambda: CsvProducer(str(csv_path), chunk_size=16),
+            [{'key': str(i)} for i in range(50)],
+        ),
+    ):
+        for position in (0, 1, 17, 49):
+            producer = get_producer()
+            stream = producer.to_stream()
+            for _ in range(position):
+                next(stream)
+            resumed = get_producer()
+            resumed.seek(json.loads(json.dumps(producer.offset)))
+            assert list(resumed.to_stream()) == expected[position:]
@@ -0,0 +1,53 @@
+import random
+
+from ..common import Barrier, Start, Stop
+from ..external_sort_stage import ExternalSortStage
+from ..pipeline import Pipeline
+
+
+def test_sort() -> None:
+    items = [{'key': i % 97, 'index': i} for i in range(1000)]
+    random.Random(1).shuffle(items)
+    expected = sorted(items, key=lambda item: item['key'])
+    stage = ExternalSortStage(
+        'key', max_items=30, max_runs=4, chunk_size=7)
+    result = list(stage.run([Start(), *items, Barrier(None), Stop()]))
+
+    assert result == [Start(), *expected, Stop()]
+    assert stage.spilled_runs > 33
+
+    stage = ExternalSortStage(['key', 'index'], reverse=True, max_bytes=1)
+    result = list(stage.run([Start(), *items[:20], Stop()]))
+    assert result[1:-1] == sorted(
+        items[:20], key=lambda item: (item['key'], item['index']),
+        reverse=True)
+
+
+class CountingSortStage(ExternalSortStage):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.open_runs = 0
+
+    def _spill(self) -> None:
+        super()._spill()
+        self.open_runs = max(self.open_runs, len(self._runs))
+
+
+def test_open_runs() -> None:
+    items = [{'key': i % 13} for i in range(500)]
+    stage = CountingSortStage('key', max_items=10, max_runs=4)
+    result = list(stage.run([Start(), *items, Stop()]))
+
+    assert result[1:-1] == sorted(items, key=lambda item: item['key'])
+    assert stage.spilled_runs > 50
+    assert stage.open_runs < 4
+
+
+def test_logged_columns() -> None:
+    # A sort emits its items unchanged, whatever the logged columns.
+    items = [{'key': 2 - i, 'index': i} for i in range(3)]
+    pipeline = Pipeline(ExternalSortStage('key'), logged_columns=['index'])
+    result = list(pipeline.run(
+        [Start(), *items, Stop()], logged_columns=['other']))
+    assert result[1:-1] == [
+        {'key': i, 'index': 2 - i} for i in range(3)]
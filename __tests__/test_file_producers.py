@@ -0,0 +1,70 @@
+import json
+import pickle
+from typing import Dict, List
+
+from ..csv_producer import CsvProducer
+from ..fixed_width_producer import FixedWidthProducer
+from ..json_lines_producer import JsonLinesProducer
+
+
+def get_items(length: int) -> List[Dict]:
+    return [{'id': i, 'name': 'x' * (i % 7)} for i in range(length)]
+
+
+def test_json_lines_shards(tmp_path) -> None:
+    path = tmp_path / 'data.jsonl'
+    items = get_items(100)
+    path.write_text(''.join(json.dumps(item) + '\n' for item in items))
+
+    for use_mmap in (False, True):
+        producer = JsonLinesProducer(
+            str(path), chunk_size=64, use_mmap=use_mmap)
+        assert list(producer.to_stream()) == items
+        for count in (2, 3, 7, 50):
+            result = [
+                item
+                for shard in producer.shards(count)
+                for item in shard.to_stream()
+            ]
+            assert result == items
+
+
+def test_csv_shards(tmp_path) -> None:
+    path = tmp_path / 'data.csv'
+    path.write_text('id,name\n' + ''.join(
+        f'{i},"a,{i}"\n' for i in range(20)) + '20,last')
+    expected = [{'id': str(i), 'name': f'a,{i}'} for i in range(20)]
+    expected.append({'id': '20', 'name': 'last'})
+
+    producer = CsvProducer(str(path), chunk_size=16)
+    assert list(producer.to_stream()) == expected
+    result = [
+        item for shard in producer.shards(4) for item in shard.to_stream()
+    ]
+    assert result == expected
+
+
+def test_csv_short_rows(tmp_path) -> None:
+    path = tmp_path / 'data.csv'
+    path.write_text('id,name,tag\n1,a,x\n2\n\n3,c\n')
+
+    producer = CsvProducer(str(path))
+    assert list(producer.to_stream()) == [
+        {'id': '1', 'name': 'a', 'tag': 'x'},
+        {'id': '2', 'name': None, 'tag': None},
+        {'id': '3', 'name': 'c', 'tag': None},
+    ]
+
+
+def test_fixed_width(tmp_path) -> None:
+    path = tmp_path / 'data.txt'
+    path.write_text('1   abc\n22  de \n')
+
+    producer = FixedWidthProducer(
+        str(path), [('id', 0, 4), ('name', 4, 7)], use_mmap=True)
+    assert list(producer.to_stream()) == [
+        {'id': '1', 'name': 'abc'},
+        {'id': '22', 'name': 'de'},
+    ]
+    copy = pickle.loads(pickle.dumps(producer))
+    assert list(copy.to_stream()) == list(producer.to_stream())
@@ -0,0 +1,49 @@
+import pytest
+
+from ..common import Start, Stop
+from ..hash_join_stage import HashJoinStage
+from ..pipeline import Pipeline
+from ..schema import SchemaError
+from ..serial_producer import SerialProducer
+from ..single_item_producer import SingleItemProducer
+
+SIDE = [
+    {'id': 1, 'label': 'one', 'size': 10},
+    {'id': 2, 'label': 'two', 'size': 20},
+    {'id': 2, 'label': 'deux', 'size': 20},
+]
+
+
+@pytest.mark.parametrize('backend', ['memory', 'sqlite', 'dbm'])
+def test_join(backend: str, tmp_path) -> None:
+    stage = HashJoinStage(
+        SerialProducer(SIDE), 'key', columns=['label'], side_key='id',
+        how='left', backend=backend,
+        path=str(tmp_path / 'index') if backend == 'dbm' else None,
+    )
+    pipeline = Pipeline(stage, logged_columns=['value'])
+    items = [{'key': k, 'value': k * 100} for k in [2, 3, 1]]
+    result = list(pipeline.run([Start(), *items, Stop()]))
+
+    assert result == [
+        Start(),
+        {'key': 2, 'label': 'two', 'value': 200},
+        {'key': 2, 'label': 'deux', 'value': 200},
+        {'key': 3, 'label': None, 'value': 300},
+        {'key': 1, 'label': 'one', 'value': 100},
+        Stop(),
+    ]
+    assert stage.index is None
+
+
+def test_validate() -> None:
+    stage = HashJoinStage(SerialProducer(SIDE), 'id')
+    assert list(stage.run([Start(), {'id': 1}, {'id': 3}, Stop()])) == [
+        Start(), {'id': 1, 'label': 'one', 'size': 10}, Stop()]
+    with pytest.raises(SchemaError):
+        HashJoinStage(
+            SingleItemProducer(SIDE[0]), 'id', columns=['name'],
+        ).validate({'id'})
+    assert HashJoinStage(
+        SingleItemProducer(SIDE[0]), 'id').validate({'id'}) == {
+        'id', 'label', 'size'}
@@ -0,0 +1,64 @@
+import threading
+from typing import Dict, List
+
+from ..common import Start, Stop
+from ..consumer import Consumer
+from ..hybrid_consumer import HybridConsumer
+from ..serial_producer import SerialProducer
+
+
+class RecordingConsumer(Consumer):
+    def __init__(self, gate: threading.Event = None) -> None:
+        self.gate = gate
+        self.items: List[Dict] = []
+
+    def setup(self, item: Dict) -> None:
+        self.items.append(item)
+
+    def process(self, item: Dict) -> None:
+        if self.gate:
+            self.gate.wait()
+        self.items.append(item)
+
+    def teardown(self, item: Dict) -> None:
+        self.items.append(item)
+
+
+def get_stream(length: int = 20):
+    return SerialProducer({'key': i} for i in range(length)).stream
+
+
+def test_fan_out_spill() -> None:
+    gate = threading.Event()
+    slow, fast = RecordingConsumer(gate), RecordingConsumer()
+    consumer = HybridConsumer(
+        consumers=[slow, fast],
+        fan_out=True,
+        queue_size=2,
+        full_policy='spill',
+    )
+    threading.Timer(0.05, gate.set).start()
+    consumer.consume(get_stream())
+
+    expected = [Start(), *({'key': i} for i in range(20)), Stop()]
+    assert slow.items == expected
+    assert fast.items == expected
+    stats = consumer.queue_stats
+    assert stats[0]['spilled'] > 0 and stats[0]['depth'] == 0
+    assert stats[1]['dropped'] == 0
+
+
+def test_fan_out_drop() -> None:
+    gate = threading.Event()
+    slow = RecordingConsumer(gate)
+    consumer = HybridConsumer(
+        consumers=[slow],
+        fan_out=True,
+        queue_size=2,
+        full_policy='drop',
+    )
+    threading.Timer(0.05, gate.set).start()
+    consumer.consume(get_stream())
+
+    assert slow.items[0] == Start() and slow.items[-1] == Stop()
+    assert len(slow.items) + consumer.queue_stats[0]['dropped'] == 22
@@ -0,0 +1,72 @@
+from typing import Dict, List
+
+from ..consumer import Consumer
+from ..metrics import LatencyHistogram, Metrics
+from ..pipeline import Pipeline
+from ..plan import ExecutionPlan
+from ..producer import Producer
+from ..serial_producer import SerialProducer
+from ..task import Task
+from .data import Stage1, Stage2
+
+
+class ListConsumer(Consumer):
+    items: List[Dict] = []
+
+    def process(self, item: Dict) -> None:
+        self.items.append(item)
+
+
+class InstrumentedTask(Task):
+    @property
+    def pipeline(self) -> Pipeline:
+        return Pipeline(stage=Stage1()).add_stage(stage=Stage2())
+
+    @property
+    def consumer(self) -> Consumer:
+        return ListConsumer()
+
+    @property
+    def producer(self) -> Producer:
+        return SerialProducer({'key1': i, 'key2': i} for i in range(100))
+
+
+def test_report() -> None:
+    task = InstrumentedTask(instrument=True)
+    task.main()
+    report = task.report
+
+    assert len(ListConsumer.items) == 100
+    assert set(report['stages']) == {'Stage1', 'Stage2'}
+    stage = report['stages']['Stage1']
+    assert stage['items_in'] == stage['items_out'] == 100
+    assert stage['latency']['count'] == 100
+    assert stage['wall_time']['process'] > 0
+    assert report['consumers']['ListConsumer']['items_in'] == 100
+    assert InstrumentedTask().report is None
+
+
+def test_latency_histogram() -> None:
+    histogram = LatencyHistogram()
+    for i in range(1, 1001):
+        histogram.record(i / 1000)
+
+    assert abs(histogram.percentile(50) - 0.5) / 0.5 < 1 / 16
+    assert abs(histogram.percentile(99) - 0.99) / 0.99 < 1 / 16
+    assert histogram.percentile(100) == 1.0
+
+
+def test_instrument_again() -> None:
+    ListConsumer.items = []
+    first, second = Metrics(), Metrics()
+    plan = ExecutionPlan(
+        Pipeline(stage=Stage1()), ListConsumer(), metrics=first)
+    second.instrument(plan.pipeline)
+    second.instrument(plan.consumer)
+    plan.run(SerialProducer({'key1': i, 'key2': i} for i in range(10)))
+
+    report = second.report()
+    assert report['stages']['Stage1']['items_in'] == 10
+    assert report['stages']['Stage1']['latency']['count'] == 10
+    assert report['consumers']['ListConsumer']['items_in'] == 10
+    assert first.report()['stages']['Stage1']['items_in'] == 0
@@ -0,0 +1,106 @@
+from typing import Dict, List
+
+import pytest
+
+from ..common import Start, Stop
+from ..consumer import Consumer
+from ..multipath_consumer import MultiPathConsumer
+from ..routing import ColumnRouter, PredicateRouter, RangeRouter
+from ..serial_producer import SerialProducer
+
+
+class ListConsumer(Consumer):
+    def __init__(self) -> None:
+        self.items: List[Dict] = []
+        self.calls = 0
+        self.signals = []
+
+    def setup(self, item: Dict) -> None:
+        self.signals.append('setup')
+
+    def process(self, item: Dict) -> None:
+        self.items.append(item)
+
+    def teardown(self, item: Dict) -> None:
+        self.signals.append('teardown')
+
+    def consume(self, source) -> None:
+        self.calls += 1
+        super().consume(source)
+
+
+def get_items(length: int) -> List[Dict]:
+    return [{'id': i, 'kind': 'ab'[i % 2]} for i in range(length)]
+
+
+def test_column_router() -> None:
+    a, b = ListConsumer(), ListConsumer()
+    consumer = MultiPathConsumer(
+        {'a': a, 'b': b}, router=ColumnRouter('kind'), batch_size=4)
+    consumer.consume(SerialProducer(get_items(10)).stream)
+
+    assert a.items == get_items(10)[::2]
+    assert b.items == get_items(10)[1::2]
+    assert a.signals == b.signals == ['setup', 'teardown']
+    # Start, 3 batches, Stop.
+    assert a.calls == b.calls == 5
+    assert consumer.unmatched_count == 0
+
+
+def test_range_router() -> None:
+    low, high, default = ListConsumer(), ListConsumer(), ListConsumer()
+    consumer = MultiPathConsumer(
+        {'low': low, 'high': high},
+        router=RangeRouter('id', {'low': (None, 3), 'high': (5, 8)}),
+    )
+    consumer.consume(SerialProducer(get_items(10)).stream)
+    assert [item['id'] for item in low.items] == [0, 1, 2]
+    assert [item['id'] for item in high.items] == [5, 6, 7]
+    assert consumer.unmatched_count == 4
+
+    consumer.default = default
+    consumer.consume(SerialProducer(get_items(10)).stream)
+    assert [item['id'] for item in default.items] == [3, 4, 8, 9]
+
+    with pytest.raises(ValueError):
+        RangeRouter('id', {'low': (None, 3), 'high': (2, 8)})
+
+
+def test_predicate_router() -> None:
+    even = ListConsumer()
+    consumer = MultiPathConsumer(
+        {'even': even},
+        router=PredicateRouter([('even', lambda item: item['id'] % 2 == 0)]),
+    )
+    consumer.consume([Start(), *get_items(4), Stop()])
+    assert even.items == get_items(4)[::2]
+    assert consumer.unmatched_count == 2
+
+
+def test_route_broadcasts_signals() -> None:
+    divisible, other = ListConsumer(), ListConsumer()
+    consumer = MultiPathConsumer(
+        {True: divisible, False: other},
+        route=lambda item: item.get('id', 1) % 3 == 0,
+    )
+    consumer.consume(SerialProducer(get_items(6)).stream)
+    assert divisible.signals == other.signals == ['setup', 'teardown']
+    assert [item['id'] for item in divisible.items] == [0, 3]
+
+
+def test_stream() -> None:
+    a, b = ListConsumer(), ListConsumer()
+    consumer = MultiPathConsumer(
+        {'a': a, 'b': b},
+        router=ColumnRouter('kind'),
+        stream=True,
+        queue_size=2,
+    )
+    consumer.consume(SerialProducer(get_items(10)).stream)
+
+    assert a.items == get_items(10)[::2]
+    assert b.items == get_items(10)[1::2]
+    assert a.signals == b.signals == ['setup', 'teardown']
+    assert a.calls == b.calls == 1
+    assert len(consumer.queue_stats) == 2
+    assert all(stats['max_depth'] <= 2 for stats in consumer.queue_stats)
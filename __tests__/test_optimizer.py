@@ -0,0 +1,54 @@
+from typing import Dict, List
+
+from ..common import Start, Stop
+from ..filter import Filter
+from ..optimizer import optimize
+from ..pipeline import Pipeline
+from .data import Stage1, Stage2
+
+
+def get_items(length: int) -> List[Dict]:
+    return [
+        {'key1': i, 'key2': i, 'key4': 'x', 'key5': 'y'}
+        for i in range(length)
+    ]
+
+
+def build() -> Pipeline:
+    inner = Pipeline(
+        Filter(['key1', 'key2', 'key4']),
+    ).add_stage(
+        Stage1(), logged_columns=['key4'],
+    ).add_stage(
+        Filter(),
+    )
+    return Pipeline(Filter()).add_stage(
+        inner, logged_columns=['key5'],
+    ).add_stage(Stage2())
+
+
+def test_nested_pipeline() -> None:
+    pipeline = build()
+    result = list(pipeline.run([Start(), *get_items(3), Stop()]))
+
+    assert result == [
+        Start(),
+        *[{'key3': 2 * i, 'key4': 'x', 'key5': 'y'} for i in range(3)],
+        Stop(),
+    ]
+
+
+def test_optimize() -> None:
+    pipeline = build()
+    optimized = optimize(pipeline)
+
+    assert [type(info['stage']) for info in optimized.stages] == [
+        Stage1, Stage2]
+    assert optimized.stages[0]['logged_columns'] == ['key4', 'key5']
+    assert len(pipeline.stages) == 3
+    assert list(optimized.run([Start(), *get_items(3), Stop()])) == list(
+        pipeline.run([Start(), *get_items(3), Stop()]))
+
+    kept = Pipeline(Filter(['key1'])).add_stage(
+        Stage2(), logged_columns=['key4'])
+    assert len(optimize(kept).stages) == 2
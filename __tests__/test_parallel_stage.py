@@ -0,0 +1,80 @@
+import time
+from typing import Dict, Iterator, List
+
+from ..common import Barrier, Start, Stop
+from ..parallel_stage import ParallelStage
+from ..serial_producer import SerialProducer
+
+
+class SleepStage(ParallelStage):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(workers=4, **kwargs)
+        self.events: List[str] = []
+
+    @property
+    def input_columns(self) -> List[str]:
+        return ['delay']
+
+    def setup(self, item: Dict) -> Iterator:
+        self.events.append('setup')
+        yield from super().setup(item)
+
+    def process(self, item: Dict) -> Iterator:
+        time.sleep(item['delay'])
+        self.events.append('process')
+        yield {'slept': item['delay']}
+
+    def teardown(self, item: Dict) -> Iterator:
+        self.events.append('teardown')
+        yield from super().teardown(item)
+
+
+class StatelessSleepStage(SleepStage):
+    @property
+    def stateless(self) -> bool:
+        return True
+
+
+def get_stream() -> Iterator:
+    delays = [0.04, 0.01, 0.03, 0.0]
+    return SerialProducer(
+        {'delay': delay, 'index': index} for index, delay in enumerate(delays)
+    ).stream
+
+
+def test_ordered() -> None:
+    stage = SleepStage()
+    result = list(stage.run(get_stream(), logged_columns=['index']))
+
+    assert result == [
+        Start(),
+        {'slept': 0.04, 'index': 0},
+        {'slept': 0.01, 'index': 1},
+        {'slept': 0.03, 'index': 2},
+        {'slept': 0.0, 'index': 3},
+        Stop(),
+    ]
+    assert stage.events == ['setup'] + ['process'] * 4 + ['teardown']
+
+
+def test_unordered() -> None:
+    result = list(SleepStage(ordered=False).run(
+        get_stream(), logged_columns=['index']))
+
+    assert result[0] == Start() and result[-1] == Stop()
+    assert sorted(result[1:-1], key=lambda item: item['index']) == [
+        {'slept': 0.04, 'index': 0},
+        {'slept': 0.01, 'index': 1},
+        {'slept': 0.03, 'index': 2},
+        {'slept': 0.0, 'index': 3},
+    ]
+    assert result[1]['index'] != 0
+
+
+def test_barriers() -> None:
+    # Subclasses are stateful, and drop barriers, unless they opt in.
+    signals = [Start(), {'delay': 0.01}, Barrier(None), Stop()]
+    for stage, count in ((SleepStage(), 0), (StatelessSleepStage(), 1)):
+        outputs = list(stage.run(signals))
+        assert sum(isinstance(item, Barrier) for item in outputs) == count
+        assert outputs[-1] == Stop()
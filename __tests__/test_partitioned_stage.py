@@ -0,0 +1,71 @@
+from typing import Dict, Iterator, List
+
+import pytest
+
+from ..common import Barrier, Start, Stop
+from ..partitioned_stage import PartitionedStage
+from ..stage import Stage
+
+
+class SessionStage(Stage):
+    def __init__(self) -> None:
+        super().__init__()
+        self.counts: Dict[str, int] = {}
+        self.signals: List[str] = []
+
+    @property
+    def stateless(self) -> bool:
+        # Every item is emitted as soon as it is processed.
+        return True
+
+    def setup(self, item: Dict) -> Iterator:
+        self.signals.append('setup')
+        yield from super().setup(item)
+
+    def process(self, item: Dict) -> Iterator:
+        if item['user'] == 'error':
+            raise RuntimeError('Failure')
+        count = self.counts.get(item['user'], 0) + 1
+        self.counts[item['user']] = count
+        yield {'user': item['user'], 'count': count, 'index': item['index']}
+
+    def teardown(self, item: Dict) -> Iterator:
+        self.signals.append('teardown')
+        yield {'user': 'total', 'count': sum(self.counts.values())}
+        yield from super().teardown(item)
+
+
+def test_run() -> None:
+    stage = PartitionedStage(SessionStage, key='user', lanes=3, queue_size=4)
+    acknowledged = []
+    barrier = Barrier(acknowledged.append)
+    items = [
+        {'user': f'user{i % 5}', 'index': i} for i in range(50)
+    ]
+    result = list(stage.run(
+        [Start(), *items[:25], barrier, *items[25:], Stop()]))
+
+    assert result[0] == Start() and result[-1] == Stop()
+    assert sum(isinstance(item, Barrier) for item in result) == 3
+    for item in result:
+        if isinstance(item, Barrier):
+            item.acknowledge()
+    assert acknowledged == [barrier]
+    totals = [item for item in result[1:-1] if item.get('user') == 'total']
+    assert sum(item['count'] for item in totals) == 50
+    for user in range(5):
+        rows = [item for item in result[1:-1]
+                if item.get('user') == f'user{user}']
+        assert [row['count'] for row in rows] == list(range(1, 11))
+        assert [row['index'] for row in rows] == list(range(user, 50, 5))
+    assert all(
+        lane.signals == ['setup', 'teardown'] for lane in stage.lane_stages)
+    assert sum(lane['items'] for lane in stage.lane_stats) == 50
+    assert 1.0 <= stage.skew <= 3.0
+
+
+def test_failure() -> None:
+    stage = PartitionedStage(SessionStage, key='user', lanes=2)
+    items = [{'user': 'error', 'index': 0}]
+    with pytest.raises(RuntimeError):
+        list(stage.run([Start(), *items, Stop()]))
@@ -0,0 +1,104 @@
+from typing import Dict, List
+
+import pytest
+
+from ..consumer import Consumer
+from ..pipeline import Pipeline
+from .. import plan as plan_module
+from ..plan import ExecutionPlan, clear_plans
+from ..serial_producer import SerialProducer
+from ..task import Task
+from .data import Stage2
+
+BUILDS: List[str] = []
+ITEMS: List[Dict] = []
+
+
+class ListConsumer(Consumer):
+    def __init__(self) -> None:
+        BUILDS.append('consumer')
+
+    def process(self, item: Dict) -> None:
+        ITEMS.append(item)
+
+
+class PlanTask(Task):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.length = kwargs.get('length')
+
+    @property
+    def producer(self) -> SerialProducer:
+        return SerialProducer([{'key': i} for i in range(self.length)])
+
+    @property
+    def pipeline(self) -> Pipeline:
+        BUILDS.append('pipeline')
+        return Pipeline(Stage2())
+
+    @property
+    def consumer(self) -> Consumer:
+        return ListConsumer()
+
+
+def test_reuse_plan() -> None:
+    clear_plans()
+    BUILDS.clear()
+    ITEMS.clear()
+    for length in (2, 3):
+        PlanTask.process_task(length=length, reuse_plan=True)
+    task = PlanTask(length=4, reuse_plan=True, instrument=True)
+    task.main()
+
+    assert BUILDS == ['pipeline', 'consumer', 'pipeline', 'consumer']
+    assert len(ITEMS) == 9
+    assert task.report['consumers']['ListConsumer']['items_in'] == 4
+    # A reused plan reports the run of every task separately.
+    task = PlanTask(length=5, reuse_plan=True, instrument=True)
+    task.main()
+    assert len(BUILDS) == 4
+    assert task.report['consumers']['ListConsumer']['items_in'] == 5
+
+    PlanTask.process_task(length=1)
+    assert len(BUILDS) == 6
+    clear_plans()
+
+
+class SizedTask(PlanTask):
+    plan_options = ('batch_size',)
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.batch_size = kwargs.get('batch_size')
+
+    @property
+    def pipeline(self) -> Pipeline:
+        BUILDS.append('pipeline')
+        return Pipeline(Stage2(batch_size=self.batch_size))
+
+
+def test_plan_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    clear_plans()
+    BUILDS.clear()
+    ITEMS.clear()
+    for batch_size in (1, 2, 1):
+        SizedTask.process_task(
+            length=1, batch_size=batch_size, reuse_plan=True)
+    assert BUILDS.count('pipeline') == 2
+
+    # The plan of batch_size 2 is the least recently used one.
+    monkeypatch.setattr(plan_module, 'MAX_PLANS', 2)
+    for batch_size in (3, 1, 2):
+        SizedTask.process_task(
+            length=1, batch_size=batch_size, reuse_plan=True)
+    assert BUILDS.count('pipeline') == 4
+    assert len(plan_module._plans) == 2
+    clear_plans()
+
+
+def test_plan() -> None:
+    plan = ExecutionPlan(Pipeline(Stage2()), ListConsumer())
+    with pytest.raises(AttributeError):
+        plan.consumer = ListConsumer()
+    with plan._lock, pytest.raises(RuntimeError):
+        plan.run(SerialProducer([]))
@@ -0,0 +1,112 @@
+import pickle
+from typing import Dict, List
+
+from ..columnar import ColumnBatch
+from ..common import Start, Stop
+from ..consumer import Consumer
+from ..csv_producer import CsvProducer
+from ..filter import Filter, VectorFilter
+from ..optimizer import optimize, split_source_filter
+from ..pipeline import Pipeline
+from ..plan import ExecutionPlan
+from ..predicates import col
+from .data import Stage1
+
+PREDICATE = (col('key1') > 2) & col('key2').isin({1, 3, 5, 7, 9}) | (
+    col('key4') == 'z')
+
+
+class StatelessStage1(Stage1):
+    @property
+    def stateless(self) -> bool:
+        return True
+
+
+def get_items(length: int) -> List[Dict]:
+    return [
+        {'key1': i, 'key2': i % 10, 'key4': 'z' if i == 1 else 'x'}
+        for i in range(length)
+    ]
+
+
+def expected(items: List[Dict]) -> List[Dict]:
+    return [
+        item for item in items
+        if item['key1'] > 2 and item['key2'] % 2 or item['key4'] == 'z'
+    ]
+
+
+class ListConsumer(Consumer):
+    def __init__(self) -> None:
+        super().__init__()
+        self.items: List[Dict] = []
+
+    def process(self, item: Dict) -> None:
+        self.items.append(item)
+
+
+def test_compile() -> None:
+    items = get_items(20)
+    match = PREDICATE.compile()
+    assert [item for item in items if match(item)] == expected(items)
+    assert PREDICATE.columns == ['key1', 'key2', 'key4']
+    assert not (col('key1') < 3).compile()({'key1': None})
+    assert (col('key1').is_null() & ~(col('key2') >= 1)).compile()(
+        {'key2': 0})
+    greater = (col('key1') > col('key2')) | col('key4').isin({'z'})
+    assert [greater.compile()(row) for row in (
+        {'key1': 2, 'key2': 1}, {'key1': 2, 'key2': None}, {'key4': 'z'},
+    )] == [True, False, True]
+
+    batch = ColumnBatch.from_rows(items)
+    mask = pickle.loads(pickle.dumps(PREDICATE)).compile_columns()(batch)
+    assert batch.compress(mask).to_rows() == expected(items)
+    rows = [[item['key4'], item['key1']] for item in items]
+    match = PREDICATE.compile_positions(['key4', 'key1'])
+    assert [row[1] for row in rows if match(row)] == [1]
+
+
+def test_filter() -> None:
+    items = get_items(50)
+    for stage in (
+        Filter(where=PREDICATE),
+        Filter(where=PREDICATE, batch_size=8),
+        VectorFilter(where=PREDICATE, batch_size=8),
+    ):
+        pipeline = Pipeline(stage, logged_columns=['key4'])
+        assert list(pipeline.run([Start(), *items, Stop()])) == [
+            Start(), *expected(items), Stop()]
+
+
+def test_push_down() -> None:
+    pipeline = Pipeline(Filter(['key1', 'key2', 'key4'])).add_stage(
+        StatelessStage1(), logged_columns=['key1', 'key4'],
+    ).add_stage(
+        Filter(['key3', 'key4'], where=(col('key1') > 2) | (
+            col('key4') == 'z')),
+    )
+    optimized = optimize(pipeline)
+    assert optimized.stages[0]['stage'].where is not None
+    assert pipeline.stages[2]['stage'].where is not None
+    items = get_items(10)
+    assert list(optimized.run([Start(), *items, Stop()])) == list(
+        pipeline.run([Start(), *items, Stop()]))
+
+    predicate, remaining = split_source_filter(optimized)
+    assert predicate.columns == ['key1', 'key4']
+    assert len(remaining.stages) == len(optimized.stages) - 1
+
+
+def test_producer_push_down(tmp_path) -> None:
+    path = tmp_path / 'data.csv'
+    path.write_text('key1,key2,key4\n' + ''.join(
+        f'{i},{i % 10},x\n' for i in range(100)))
+    pipeline = Pipeline(
+        Filter(where=col('key2') == '3'),
+    ).add_stage(Filter(['key1']))
+    consumer = ListConsumer()
+    plan = ExecutionPlan(pipeline, consumer, optimize=True)
+
+    assert plan.predicate is not None
+    plan.run(CsvProducer(str(path), chunk_size=64))
+    assert consumer.items == [{'key1': str(i)} for i in range(3, 100, 10)]
@@ -0,0 +1,65 @@
+import os
+from typing import Dict, Iterator, List
+
+import pytest
+
+from ..common import Start, Stop
+from ..process_pool_stage import ProcessPoolStage
+from ..stage import Stage
+
+
+class SquareStage(Stage):
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+
+    @property
+    def input_columns(self) -> List[str]:
+        return ['value']
+
+    def log(self, event: str) -> None:
+        with open(self.path, 'a') as file:
+            file.write(f'{event} {os.getpid()}\n')
+
+    def setup(self, item: Dict) -> Iterator:
+        self.log(f'setup:{item.get("run")}')
+        yield from super().setup(item)
+
+    def process(self, item: Dict) -> Iterator:
+        yield {'square': item['value'] ** 2, 'pid': os.getpid()}
+
+    def teardown(self, item: Dict) -> Iterator:
+        self.log('teardown')
+        yield from super().teardown(item)
+
+
+class SummaryStage(SquareStage):
+    def teardown(self, item: Dict) -> Iterator:
+        yield {'summary': True}
+        yield from super().teardown(item)
+
+
+def test_run(tmp_path) -> None:
+    path = str(tmp_path / 'events')
+    stage = ProcessPoolStage(SquareStage(path), workers=2, chunk_size=3)
+    stream = [
+        Start(run=1), *({'value': i, 'tag': i} for i in range(20)), Stop()]
+    result = list(stage.run(stream, logged_columns=['tag']))
+
+    assert result[0] == Start(run=1) and result[-1] == Stop()
+    assert [(item['square'], item['tag']) for item in result[1:-1]] == [
+        (i ** 2, i) for i in range(20)
+    ]
+    assert all(item['pid'] != os.getpid() for item in result[1:-1])
+    with open(path) as file:
+        events = [line.split() for line in file]
+    setups = sorted(pid for event, pid in events if event == 'setup:1')
+    teardowns = sorted(pid for event, pid in events if event == 'teardown')
+    assert setups == teardowns
+    assert 1 <= len(setups) <= 2
+
+
+def test_emitting_teardown(tmp_path) -> None:
+    stage = ProcessPoolStage(SummaryStage(str(tmp_path / 'events')))
+    with pytest.raises(ValueError):
+        list(stage.run([Start(), {'value': 1}, Stop()]))
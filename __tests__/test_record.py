@@ -0,0 +1,58 @@
+import json
+import pickle
+from typing import Dict, Iterator, List
+
+from ..common import Start, Stop
+from ..json_lines_consumer import JsonLinesConsumer
+from ..pipeline import Pipeline
+from ..record import Record, compile_record_projection, record_type
+from ..stage import Stage
+
+
+class SumStage(Stage):
+    @property
+    def input_columns(self) -> List[str]:
+        return ['operand1', 'operand2']
+
+    @property
+    def output_columns(self) -> List[str]:
+        return ['sum']
+
+    def process(self, item: Dict) -> Iterator:
+        yield {'sum': item['operand1'] + item['operand2']}
+
+
+def test_record() -> None:
+    record = record_type(['a', 'b']).from_dict({'a': 1, 'b': 2, 'c': 3})
+    projected = record.project(['b'])
+    extended = record.extend({'c': 3})
+
+    assert record['a'] == 1 and record.get('c') is None and 'b' in record
+    assert record == {'a': 1, 'b': 2} and {**record} == {'a': 1, 'b': 2}
+    assert list(record.keys()) == ['a', 'b'] and len(record) == 2
+    assert projected == {'b': 2} and type(projected) is record_type(['b'])
+    assert extended == {'a': 1, 'b': 2, 'c': 3}
+    assert record.extend({'a': 0}) == {'a': 0, 'b': 2}
+    assert type(record) is record_type(('a', 'b'))
+    assert pickle.loads(pickle.dumps(extended)) == extended
+    assert compile_record_projection(['b'])({'a': 1, 'b': 2}) == {'b': 2}
+    assert record.project(['b', 'a']) == {'b': 2, 'a': 1}
+    assert compile_record_projection(['b', 'a'])(record) == {'b': 2, 'a': 1}
+    assert compile_record_projection(['a', 'b'])({'a': 1, 'b': 2}) == record
+
+
+def test_pipeline(tmp_path) -> None:
+    path = str(tmp_path / 'out.jsonl')
+    pipeline = Pipeline(
+        stage=SumStage(records=True),
+        logged_columns=['tag'],
+    )
+    items = [{'operand1': i, 'operand2': 1, 'tag': 'x'} for i in range(3)]
+    result = list(pipeline.run([Start(), *items, Stop()]))
+    consumer = JsonLinesConsumer(path)
+    consumer.consume(result)
+
+    assert all(isinstance(item, Record) for item in result[1:-1])
+    assert result[1:-1] == [{'sum': i + 1, 'tag': 'x'} for i in range(3)]
+    with open(path) as file:
+        assert [json.loads(line) for line in file] == result[1:-1]
@@ -0,0 +1,68 @@
+import multiprocessing
+import pickle
+
+import pytest
+
+from ..record_codec import RecordCodec
+from ..shm_ring import SharedRing
+
+CODEC = RecordCodec([
+    ('id', int), ('price', float), ('name', str, 8), ('flag', bool),
+    ('raw', bytes, 4),
+])
+
+
+def write(ring: SharedRing, length: int) -> None:
+    ring.put_many({'id': i, 'name': f'n{i}'} for i in range(length))
+    ring.close()
+    ring.detach()
+
+
+def test_codec() -> None:
+    item = {'id': 3, 'price': 1.5, 'name': 'héllo', 'flag': True,
+            'raw': b'ab'}
+    record = CODEC.encode(item)
+    assert len(record) == CODEC.size
+    assert CODEC.decode(record) == item
+    assert pickle.loads(pickle.dumps(CODEC)).decode(record) == item
+
+    view = CODEC.view(record)
+    assert view['name'] == 'héllo' and view.get('missing') is None
+    assert view == item and view.to_dict() == item
+
+    assert CODEC.decode(CODEC.encode({'id': 1, 'flag': None})) == {
+        'id': 1, 'price': None, 'name': None, 'flag': None, 'raw': None}
+    with pytest.raises(ValueError):
+        CODEC.encode({'name': 'x' * 9})
+
+    numbers = RecordCodec([('id', int), ('flag', bool)])
+    assert numbers.decode(numbers.encode({'id': 2, 'flag': False})) == {
+        'id': 2, 'flag': False}
+    single = pickle.loads(pickle.dumps(RecordCodec([('id', int)])))
+    assert single.decode(single.encode({})) == {'id': None}
+
+
+def test_ring() -> None:
+    ring = SharedRing(CODEC, capacity=3)
+    try:
+        ring.put_many([{'id': 1}, {'id': 2}])
+        assert [record['id'] for record in ring.get()] == [1, 2]
+        ring.release()
+        ring.put_many([{'id': 3}, {'id': 4}, {'id': 5}])
+        assert [record['id'] for record in ring.get(max_count=2)] == [3, 4]
+        ring.close()
+        assert [record.to_dict()['id'] for record in ring] == [5]
+    finally:
+        ring.detach()
+
+
+def test_ring_processes() -> None:
+    ring = SharedRing(CODEC, capacity=16)
+    process = multiprocessing.Process(target=write, args=(ring, 1000))
+    process.start()
+    try:
+        result = [(record['id'], record['name']) for record in ring]
+    finally:
+        process.join()
+        ring.detach()
+    assert result == [(i, f'n{i}') for i in range(1000)]
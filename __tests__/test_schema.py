@@ -0,0 +1,60 @@
+from typing import Dict, Set
+
+import pytest
+
+from ..consumer import Consumer
+from ..filter import Filter
+from ..hybrid_consumer import HybridConsumer
+from ..pipeline import Pipeline
+from ..schema import SchemaError
+from ..serial_producer import SerialProducer
+from .data import Stage1, Stage2
+
+
+class RequiringConsumer(Consumer):
+    def __init__(self, *columns: str) -> None:
+        self.columns = set(columns)
+        self.items = []
+
+    @property
+    def required_columns(self) -> Set:
+        return self.columns
+
+    def process(self, item: Dict) -> None:
+        self.items.append(item)
+
+
+def test_pipeline_wiring() -> None:
+    with pytest.raises(SchemaError, match='key2'):
+        Pipeline(Filter(['key1'])).add_stage(Stage1())
+
+    pipeline = Pipeline(
+        Filter(['key1']), logged_columns=['key2'],
+    ).add_stage(Stage1(), logged_columns=['key4']).add_stage(Stage2())
+    assert pipeline.validate({'key1', 'key2', 'key4'}) is None
+    with pytest.raises(SchemaError, match='key4'):
+        Pipeline(Filter()).add_stage(Filter(['key4'])).validate({'key1'})
+    assert Pipeline(Filter()).validate({'key1'}) == {'key1'}
+
+
+def test_consumer_validation() -> None:
+    consumer = RequiringConsumer('key1')
+    with pytest.raises(SchemaError):
+        consumer.validate({'key2'})
+
+    consumer.consume(SerialProducer([{'key1': 1}]).stream)
+    with pytest.raises(ValueError):
+        consumer.consume(SerialProducer([{'key2': 1}]).stream)
+
+    consumer.validate({'key1'})
+    assert consumer.schema_validated
+    consumer.consume(SerialProducer([{'key2': 1}]).stream)
+    assert consumer.items == [{'key1': 1}, {'key2': 1}]
+
+
+def test_hybrid_consumer_wiring() -> None:
+    with pytest.raises(SchemaError, match='key3'):
+        HybridConsumer(
+            [RequiringConsumer('key1'), RequiringConsumer('key3')],
+            pipeline=Pipeline(Filter(['key1'])),
+        )
@@ -0,0 +1,89 @@
+from typing import Any, Dict, List
+
+from ..common import Start, Stop
+from ..consumer import Consumer
+from ..filter import Filter
+from ..pipeline import Pipeline
+from ..predicates import col
+from ..serial_producer import SerialProducer
+from ..sharded_task import ShardedTask
+from .data import Stage2
+
+
+class SumConsumer(Consumer):
+    def __init__(self) -> None:
+        super().__init__()
+        self.keys: List[int] = []
+        self.signals: List[str] = []
+
+    def setup(self, item: Start) -> None:
+        self.signals.append('start')
+
+    def process(self, item: Dict) -> None:
+        self.keys.append(item['key'])
+
+    def teardown(self, item: Stop) -> None:
+        self.signals.append('stop')
+
+
+class SumTask(ShardedTask):
+    @property
+    def producer(self) -> SerialProducer:
+        return SerialProducer([{'key': i % 5} for i in range(40)])
+
+    @property
+    def pipeline(self) -> Pipeline:
+        return Pipeline(Stage2(batch_size=4))
+
+    @property
+    def consumer(self) -> Consumer:
+        return SumConsumer()
+
+    def get_shard_result(self, consumer: SumConsumer) -> Any:
+        return consumer.signals, sorted(consumer.keys)
+
+    def combine(self, results: List[Any]) -> None:
+        self.results = results
+
+
+class FilteredSumTask(SumTask):
+    @property
+    def pipeline(self) -> Pipeline:
+        return Pipeline(Filter(where=col('key') < 2)).add_stage(
+            Stage2(batch_size=4))
+
+
+def test_shards() -> None:
+    producer = SerialProducer([{'key': i % 5} for i in range(40)])
+    shards = producer.shards(3)
+    assert sorted(
+        item['key'] for shard in shards for item in shard.to_stream()
+    ) == sorted(i % 5 for i in range(40))
+
+    keyed = [
+        {item['key'] for item in shard.to_stream()}
+        for shard in producer.shards(3, key='key')
+    ]
+    assert sum(len(keys) for keys in keyed) == 5
+
+
+def test_run() -> None:
+    task = SumTask(workers=3, shard_key='key', instrument=True)
+    task.main()
+
+    assert not task.errors and len(task.results) == 3
+    assert all(signals == ['start', 'stop'] for signals, _ in task.results)
+    keys = [key for _, shard_keys in task.results for key in shard_keys]
+    assert sorted(keys) == sorted(i % 5 for i in range(40))
+    assert task.report['consumers']['SumConsumer']['items_in'] == 40
+
+
+def test_run_optimized() -> None:
+    task = FilteredSumTask(workers=2, optimize=True, instrument=True)
+    task.main()
+
+    assert not task.errors
+    keys = [key for _, shard_keys in task.results for key in shard_keys]
+    assert sorted(keys) == sorted(i % 5 for i in range(40) if i % 5 < 2)
+    # The filter is pushed down to the producers of the shards.
+    assert set(task.report['stages']) == {'Stage2'}
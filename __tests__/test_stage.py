@@ -0,0 +1,88 @@
+from typing import Dict, Iterable, Iterator, List
+
+import pytest
+
+from ..base_stage import compile_projection
+from ..common import Batch, Start, Stop
+from ..pipeline import Pipeline
+from ..serial_producer import SerialProducer
+from .data import Stage1, Stage2
+
+
+class BatchStage(Stage1):
+    def __init__(self) -> None:
+        super().__init__(batch_size=2)
+        self.batches: List[int] = []
+
+    def process_batch(self, items: List[Dict]) -> Iterator[Iterable[Dict]]:
+        self.batches.append(len(items))
+        return super().process_batch(items)
+
+
+def get_items(length: int) -> List[Dict]:
+    return [{'key1': i, 'key2': i, 'key4': 'x'} for i in range(length)]
+
+
+def test_run_batches() -> None:
+    stage = BatchStage()
+    result = list(stage.run(
+        SerialProducer(get_items(5)).stream,
+        logged_columns=['key4'],
+    ))
+
+    assert result == [
+        Start(),
+        *[{'key3': 2 * i, 'key4': 'x'} for i in range(5)],
+        Stop(),
+    ]
+    assert stage.batches == [2, 2, 1]
+
+
+def test_pipeline_passes_batches() -> None:
+    first, second = BatchStage(), BatchStage()
+    pipeline = Pipeline(
+        stage=first,
+        logged_columns=['key1', 'key2'],
+    ).add_stage(
+        stage=second,
+    ).add_stage(
+        stage=Stage2(),
+    )
+    stream = list(first.run(
+        SerialProducer(get_items(3)).stream,
+        logged_columns=['key1', 'key2'],
+        emit_batches=True,
+    ))
+    result = list(pipeline.run(SerialProducer(get_items(3)).stream))
+
+    assert [type(item) for item in stream] == [Start, Batch, Batch, Stop]
+    assert result == [
+        Start(),
+        *[{'key3': 2 * i} for i in range(3)],
+        Stop(),
+    ]
+    assert second.batches == [2, 1]
+
+
+def test_no_copy() -> None:
+    item = {'key1': 1, 'key2': 2}
+    copied = list(Stage2().run([Start(), item, Stop()]))
+    passed = list(Stage2(no_copy=True).run([Start(), item, Stop()]))
+    logged = list(Stage2(no_copy=True).run(
+        [Start(), item, Stop()], logged_columns=['key3']))
+
+    assert copied[1] == item and copied[1] is not item
+    assert passed[1] is item
+    assert logged[1] == {'key1': 1, 'key2': 2, 'key3': None}
+
+
+def test_compile_projection() -> None:
+    data = {'a': 1, 'b': 2, ('c', 0): 3}
+
+    assert compile_projection([]) is None
+    assert compile_projection(['a'])(data) == {'a': 1}
+    assert compile_projection(['b', ('c', 0)])(data) == {'b': 2, ('c', 0): 3}
+    assert compile_projection(['a', 'd'], missing_ok=True)(data) == {
+        'a': 1, 'd': None}
+    with pytest.raises(KeyError):
+        compile_projection(['a', 'd'])(data)
@@ -0,0 +1,80 @@
+import threading
+from typing import Dict, Iterator, List
+
+import pytest
+
+from ..common import Start, Stop
+from ..serial_producer import SerialProducer
+from ..stage import Stage
+from ..threaded_pipeline import ThreadedPipeline
+from .data import Stage1, Stage2
+
+
+class OverlapStage(Stage):
+    def __init__(self, event: threading.Event, wait: bool) -> None:
+        super().__init__()
+        self.event = event
+        self.wait = wait
+        self.overlapped = None
+        self.threads: List[int] = []
+
+    def process(self, item: Dict) -> Iterator:
+        self.threads.append(threading.get_ident())
+        position = item['key3'] // 2
+        # The waiting stage holds its first item until the other stage
+        # reaches its second item, which only happens if they run
+        # concurrently.
+        if self.wait and position == 0:
+            self.overlapped = self.event.wait(timeout=5)
+        elif not self.wait and position == 1:
+            self.event.set()
+        yield item
+
+
+class FailingStage(Stage):
+    def process(self, item: Dict) -> Iterator:
+        raise KeyError(item['key3'])
+
+
+def get_stream(length: int) -> Iterator:
+    return SerialProducer(
+        {'key1': i, 'key2': i, 'key4': i} for i in range(length)).stream
+
+
+def test_run() -> None:
+    event = threading.Event()
+    slow_stages = [OverlapStage(event, False), OverlapStage(event, True)]
+    pipeline = ThreadedPipeline(
+        stage=Stage1(),
+        logged_columns=['key4'],
+        queue_size=2,
+    ).add_stage(
+        stage=slow_stages[0],
+        queue_size=1,
+    ).add_stage(
+        stage=slow_stages[1],
+    ).add_stage(
+        stage=Stage2(),
+    )
+    result = list(pipeline.run(get_stream(10)))
+
+    assert result == [
+        Start(),
+        *({'key3': 2 * i, 'key4': i} for i in range(10)),
+        Stop(),
+    ]
+    assert slow_stages[1].overlapped
+    assert set(slow_stages[0].threads) != set(slow_stages[1].threads)
+
+
+def test_failure() -> None:
+    pipeline = ThreadedPipeline(
+        stage=Stage1(),
+    ).add_stage(
+        stage=FailingStage(),
+    ).add_stage(
+        stage=Stage2(),
+    )
+
+    with pytest.raises(KeyError):
+        list(pipeline.run(get_stream(10)))
@@ -0,0 +1,140 @@
+import array
+from operator import add, mul
+from typing import Dict, Iterator, List
+
+from ..columnar import ColumnBatch, to_array
+from ..common import Start, Stop
+from ..pipeline import Pipeline
+from ..serial_producer import SerialProducer
+from ..stage import Stage
+from ..vector_stage import VectorStage
+
+
+class SumVectorStage(VectorStage):
+    def __init__(self) -> None:
+        super().__init__(batch_size=4)
+        self.batches: List[ColumnBatch] = []
+
+    @property
+    def input_columns(self) -> List[str]:
+        return ['operand1', 'operand2']
+
+    def process_columns(self, batch: ColumnBatch) -> ColumnBatch:
+        self.batches.append(batch)
+        return ColumnBatch({
+            'sum': to_array(list(map(
+                add, batch['operand1'], batch['operand2']))),
+        })
+
+
+class MultiplyVectorStage(SumVectorStage):
+    @property
+    def input_columns(self) -> List[str]:
+        return ['sum', 'operand1']
+
+    def process_columns(self, batch: ColumnBatch) -> ColumnBatch:
+        self.batches.append(batch)
+        return ColumnBatch({
+            'multiply': to_array(list(map(
+                mul, batch['sum'], batch['operand1']))),
+        })
+
+
+class SumStage(Stage):
+    @property
+    def input_columns(self) -> List[str]:
+        return ['operand1', 'operand2']
+
+    def process(self, item: Dict) -> Iterator:
+        yield {'sum': item['operand1'] + item['operand2']}
+
+
+class IncrementStage(Stage):
+    def process(self, item: Dict) -> Iterator:
+        yield {'sum': item['sum'] + 1, 'operand1': item['operand1']}
+
+
+def get_items(length: int) -> List[Dict]:
+    return [
+        {'operand1': i, 'operand2': i + 1, 'tag': 'x'} for i in range(length)
+    ]
+
+
+def test_column_batch() -> None:
+    batch = ColumnBatch.from_rows(get_items(3))
+    projected = batch.select(['operand1'])
+
+    assert batch.num_rows == 3 and list(projected) == ['operand1']
+    assert projected['operand1'] is batch['operand1']
+    assert batch['tag'] == ['x', 'x', 'x']
+    assert batch.to_rows() == get_items(3)
+    assert to_array([1.5, 2]) == [1.5, 2]
+    rows = ColumnBatch.from_rows([{'flag': True}, {'flag': False}]).to_rows()
+    assert [type(row['flag']) for row in rows] == [bool, bool]
+    if isinstance(batch['operand1'], array.array):
+        assert batch['operand1'].typecode == 'q'
+
+
+def test_pipeline() -> None:
+    first, second = SumVectorStage(), MultiplyVectorStage()
+    pipeline = Pipeline(
+        stage=first,
+        logged_columns=['operand1', 'tag'],
+    ).add_stage(
+        stage=IncrementStage(),
+        logged_columns=['tag'],
+    ).add_stage(
+        stage=second,
+        logged_columns=['tag'],
+    )
+    result = list(pipeline.run(SerialProducer(get_items(10)).stream))
+
+    assert result == [
+        Start(),
+        *[
+            {'multiply': (2 * i + 2) * i, 'tag': 'x'} for i in range(10)
+        ],
+        Stop(),
+    ]
+    assert [batch.num_rows for batch in first.batches] == [4, 4, 2]
+    assert [batch.num_rows for batch in second.batches] == [4, 4, 2]
+
+
+def test_emit_columns() -> None:
+    first, second = SumVectorStage(), MultiplyVectorStage()
+    pipeline = Pipeline(
+        stage=first,
+        logged_columns=['operand1'],
+    ).add_stage(
+        stage=second,
+    )
+    result = list(pipeline.run(
+        SerialProducer(get_items(6)).stream,
+        emit_columns=True,
+    ))
+
+    assert [type(item) for item in result] == [
+        Start, ColumnBatch, ColumnBatch, Stop]
+    # Logged columns are carried over by reference.
+    assert second.batches[0]['operand1'] is first.batches[0]['operand1']
+    assert list(result[1]['multiply']) == [(2 * i + 1) * i for i in range(4)]
+
+
+def test_logged_values() -> None:
+    # Columnar mode logs the same values as row mode.
+    items = [
+        {'operand1': i, 'operand2': 1, 'value': i / 2 if i % 2 else i}
+        for i in range(6)
+    ]
+    items[3]['tag'] = 'y'
+    del items[4]['value']
+    results = [
+        list(Pipeline(
+            stage=stage, logged_columns=['value', 'tag', 'missing'],
+        ).run(SerialProducer(items).stream))
+        for stage in (SumStage(), SumVectorStage())
+    ]
+    assert results[0] == results[1]
+    assert [type(item['value']) for item in results[1][1:-1]] == [
+        int, float, int, float, type(None), float]
+    assert results[1][4]['tag'] == 'y' and results[1][1]['missing'] is None
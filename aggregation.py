@@ -0,0 +1,317 @@
+import math
+from typing import (
+    Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union,
+)
+
+_MASK = (1 << 64) - 1
+
+
+class Accumulator:
+    """
+    A base class for incremental aggregates, which are updated one value at
+    a time and hold a constant amount of memory, whatever the number of
+    values.
+    """
+    def add(self, value: object) -> None:
+        """
+        Adds a value to the aggregate. This method must be implemented by
+        subclasses.
+
+        :param value: The value to be added.
+        """
+        raise NotImplementedError
+
+    def result(self) -> object:
+        """
+        Computes the current value of the aggregate. This method must be
+        implemented by subclasses.
+
+        :return: The value of the aggregate.
+        """
+        raise NotImplementedError
+
+
+class Count(Accumulator):
+    """
+    Counts the values.
+    """
+    def __init__(self) -> None:
+        self.count = 0
+
+    def add(self, value: object) -> None:
+        self.count += 1
+
+    def result(self) -> int:
+        return self.count
+
+
+class Sum(Accumulator):
+    """
+    Sums the values.
+    """
+    def __init__(self) -> None:
+        self.total = 0
+
+    def add(self, value: float) -> None:
+        self.total += value
+
+    def result(self) -> float:
+        return self.total
+
+
+class Min(Accumulator):
+    """
+    Keeps the smallest value, or None if there is none.
+    """
+    def __init__(self) -> None:
+        self.value = None
+
+    def add(self, value: object) -> None:
+        if self.value is None or value < self.value:
+            self.value = value
+
+    def result(self) -> object:
+        return self.value
+
+
+class Max(Accumulator):
+    """
+    Keeps the largest value, or None if there is none.
+    """
+    def __init__(self) -> None:
+        self.value = None
+
+    def add(self, value: object) -> None:
+        if self.value is None or value > self.value:
+            self.value = value
+
+    def result(self) -> object:
+        return self.value
+
+
+class Mean(Accumulator):
+    """
+    Averages the values, or returns None if there is none.
+    """
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+
+    def result(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+
+class Distinct(Accumulator):
+    """
+    Estimates the number of distinct values with a HyperLogLog sketch of
+    2 ** precision one-byte registers. The standard error of the estimate
+    is about 1.04 / sqrt(2 ** precision), 1.6% with the default precision.
+    Values are hashed with the built-in hash function, so estimates are
+    only comparable within a process.
+    """
+    def __init__(self, precision: int = 12) -> None:
+        """
+        Initializes an empty sketch.
+
+        :param precision: Optional; the number of bits selecting a register,
+                          between 4 and 16.
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError(f'Invalid precision {precision}.')
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: object) -> None:
+        hashed = _mix(hash(value))
+        index = hashed >> (64 - self.precision)
+        remaining = (hashed << self.precision) & _MASK
+        rank = min(65 - remaining.bit_length(), 65 - self.precision)
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def result(self) -> int:
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(
+            2.0 ** -register for register in self.registers)
+        if estimate <= 2.5 * size:
+            zeros = self.registers.count(0)
+            if zeros:
+                estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+
+class Quantile(Accumulator):
+    """
+    Estimates a quantile of the values with the P-square algorithm, which
+    keeps five markers instead of the values. The quantile is exact as long
+    as no more than five values have been added.
+    """
+    def __init__(self, quantile: float = 0.5) -> None:
+        """
+        Initializes an empty estimator.
+
+        :param quantile: Optional; the quantile to estimate, between 0 and 1.
+        """
+        if not 0 <= quantile <= 1:
+            raise ValueError(f'Invalid quantile {quantile}.')
+        self.quantile = quantile
+        self.heights: List[float] = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [
+            1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+        self.increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+    def add(self, value: float) -> None:
+        heights = self.heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+        positions, desired = self.positions, self.desired
+        for index in range(cell + 1, 5):
+            positions[index] += 1
+        for index in range(5):
+            desired[index] += self.increments[index]
+        for index in range(1, 4):
+            delta = desired[index] - positions[index]
+            if (
+                delta >= 1 and positions[index + 1] - positions[index] > 1
+                or delta <= -1 and positions[index - 1] - positions[index] < -1
+            ):
+                step = 1 if delta > 0 else -1
+                height = self._parabolic(index, step)
+                if not heights[index - 1] < height < heights[index + 1]:
+                    height = self._linear(index, step)
+                heights[index] = height
+                positions[index] += step
+
+    def result(self) -> Optional[float]:
+        heights = self.heights
+        if not heights:
+            return None
+        if len(heights) < 5 or self.positions[4] == 5:
+            rank = self.quantile * (len(heights) - 1)
+            low = math.floor(rank)
+            high = min(low + 1, len(heights) - 1)
+            return heights[low] + (heights[high] - heights[low]) * (
+                rank - low)
+        return heights[2]
+
+    def _parabolic(self, index: int, step: int) -> float:
+        heights, positions = self.heights, self.positions
+        previous, current, following = positions[index - 1:index + 2]
+        return heights[index] + step / (following - previous) * (
+            (current - previous + step)
+            * (heights[index + 1] - heights[index]) / (following - current)
+            + (following - current - step)
+            * (heights[index] - heights[index - 1]) / (current - previous)
+        )
+
+    def _linear(self, index: int, step: int) -> float:
+        heights, positions = self.heights, self.positions
+        return heights[index] + step * (
+            heights[index + step] - heights[index]
+        ) / (positions[index + step] - positions[index])
+
+
+Aggregations = Dict[
+    str, Tuple[Optional[str], Callable[[], Accumulator]]]
+
+
+class Aggregator:
+    """
+    Compiles the aggregations of a stage, given as a dictionary mapping
+    every output column to the input column to be aggregated and the
+    factory of its accumulator, such as `{'total': ('amount', Sum),
+    'p95': ('latency', lambda: Quantile(0.95)), 'items': (None, Count)}`.
+    A None input column aggregates the items themselves. None values are
+    skipped, as in SQL.
+    """
+    def __init__(self, aggregations: Aggregations) -> None:
+        """
+        Initializes the Aggregator with the aggregations.
+
+        :param aggregations: The aggregations, by output column.
+        """
+        self.aggregations = aggregations
+        self.names = list(aggregations)
+        self.columns = [column for column, _ in aggregations.values()]
+        self.factories = [factory for _, factory in aggregations.values()]
+
+    @property
+    def input_columns(self) -> List[str]:
+        return [column for column in self.columns if column is not None]
+
+    def create(self) -> List[Accumulator]:
+        """
+        Creates a new set of accumulators, for a new group.
+
+        :return: The accumulators, in the order of the aggregations.
+        """
+        return [factory() for factory in self.factories]
+
+    def add(self, accumulators: Sequence[Accumulator], item: Dict) -> None:
+        """
+        Adds an item to a set of accumulators.
+
+        :param accumulators: The accumulators of the group of the item.
+        :param item: The item to be aggregated.
+        """
+        for column, accumulator in zip(self.columns, accumulators):
+            value = item if column is None else item.get(column)
+            if value is not None:
+                accumulator.add(value)
+
+    def result(self, accumulators: Iterable[Accumulator]) -> Dict:
+        """
+        Builds the aggregated columns of a group.
+
+        :param accumulators: The accumulators of the group.
+        :return: The aggregated values, by output column.
+        """
+        return {
+            name: accumulator.result()
+            for name, accumulator in zip(self.names, accumulators)
+        }
+
+
+def get_key_getter(
+    key: Union[str, List[str], None],
+) -> Tuple[List[str], Callable[[Dict], object]]:
+    """
+    Compiles the function extracting the group key of an item.
+
+    :param key: The column, or columns, of the key, if any.
+    :return: The key columns, and the function returning the key of an
+             item, as a tuple of values.
+    """
+    columns = [key] if isinstance(key, str) else list(key or [])
+    if not columns:
+        return columns, lambda item: ()
+    if len(columns) == 1:
+        column, = columns
+        return columns, lambda item: (item.get(column),)
+    return columns, lambda item: tuple(item.get(column) for column in columns)
+
+
+def _mix(value: int) -> int:
+    # The finalizer of SplitMix64 spreads hashes such as those of integers.
+    value = (value + 0x9E3779B97F4A7C15) & _MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK
+    return value ^ (value >> 31)
@@ -0,0 +1,150 @@
+import asyncio
+import queue
+from typing import AsyncIterable, Dict, Optional, Set
+
+from .common import Barrier, Start, Stop
+from .consumer import Consumer
+from .schema import check_columns
+
+
+class AsyncConsumer:
+    """
+    A base class representing a consumer in an asynchronous data processing
+    pipeline, for instance one writing to asynchronous clients. It follows
+    the same Start and Stop protocol as Consumer.
+    """
+    schema_validated = False
+
+    @property
+    def required_columns(self) -> Set:
+        """
+        Specifies the set of columns required by this consumer for
+        processing items.
+
+        :return: A set of required column names.
+        """
+        return set()
+
+    def validate(self, columns: Optional[Set[str]]) -> None:
+        """
+        Checks that the required columns of this consumer are produced
+        upstream, see Consumer.validate.
+
+        :param columns: The columns of the consumed items, or None if
+                        unknown.
+        """
+        check_columns(
+            f'Consumer {self.__class__.__name__}',
+            self.required_columns,
+            columns,
+        )
+        self.schema_validated = columns is not None
+
+    async def setup(self, item: Dict) -> None:
+        """
+        Sets up resources or configurations needed before beginning to
+        consume items.
+
+        :param item: Initial setup data or configurations.
+        """
+        pass
+
+    async def process(self, item: Dict) -> None:
+        """
+        Processes a single item. This method must be implemented by subclasses.
+
+        :param item: The item to be processed.
+        """
+        raise NotImplementedError
+
+    async def teardown(self, item: Dict) -> None:
+        """
+        Cleans up resources or configurations after all items have been
+        consumed.
+
+        :param item: Final teardown data or configurations.
+        """
+        pass
+
+    async def consume(self, source: AsyncIterable[Dict]) -> None:
+        """
+        Consumes items from the provided asynchronous source, processing
+        each in turn.
+
+        :param source: An asynchronous iterable source of items to consume.
+        """
+        required_columns = (
+            None if self.schema_validated else self.required_columns)
+        async for item in source:
+            if isinstance(item, Start):
+                await self.setup(item)
+            elif isinstance(item, Stop):
+                await self.teardown(item)
+            elif isinstance(item, Barrier):
+                item.acknowledge()
+            else:
+                if required_columns and not required_columns <= item.keys():
+                    raise ValueError(
+                        f'Invalid data {item}. '
+                        f'Required columns: {required_columns}.'
+                    )
+                await self.process(item)
+
+
+class SyncConsumerAdapter(AsyncConsumer):
+    """
+    An adapter exposing a synchronous Consumer as an AsyncConsumer. The
+    wrapped consumer runs its own consume loop in a worker thread through
+    asyncio.to_thread, and is fed through a bounded queue.
+    """
+    _END = object()
+
+    def __init__(self, consumer: Consumer, queue_size: int = 1000) -> None:
+        """
+        Initializes the adapter with the consumer to be wrapped.
+
+        :param consumer: The synchronous consumer.
+        :param queue_size: Optional; the capacity of the queue feeding the
+                           consumer thread.
+        """
+        self.consumer = consumer
+        self.queue_size = queue_size
+
+    def validate(self, columns: Optional[Set[str]]) -> None:
+        self.consumer.validate(columns)
+
+    async def consume(self, source: AsyncIterable[Dict]) -> None:
+        items = queue.Queue(maxsize=self.queue_size)
+        worker = asyncio.ensure_future(asyncio.to_thread(
+            self.consumer.consume, iter(items.get, self._END)))
+        try:
+            async for item in source:
+                if not await self._put(items, item, worker):
+                    break
+        finally:
+            await self._put(items, self._END, worker)
+            await worker
+
+    @staticmethod
+    async def _put(
+        items: queue.Queue,
+        item: Dict,
+        worker: asyncio.Future,
+    ) -> bool:
+        """
+        Puts an item in the queue without blocking the event loop, giving up
+        if the consumer thread has stopped.
+
+        :return: True if the item has been queued.
+        """
+        while not worker.done():
+            try:
+                items.put_nowait(item)
+                return True
+            except queue.Full:
+                try:
+                    await asyncio.to_thread(items.put, item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+        return False
@@ -0,0 +1,107 @@
+from typing import (
+    AsyncIterable, AsyncIterator, Dict, List, Optional, Set,
+)
+
+from .async_stage import AsyncStage, SyncStageAdapter
+from .base_stage import BaseStage
+from .pipeline import Pipeline
+from .schema import validate_stages
+
+
+class AsyncPipeline(BaseStage):
+    """
+    A sequence of asynchronous processing stages. Synchronous stages added
+    to the pipeline are wrapped in a SyncStageAdapter, and the stages of a
+    synchronous Pipeline are adapted one by one.
+    """
+    def __init__(
+        self,
+        stage: BaseStage,
+        logged_columns: List[str] = None,
+        name: str = None,
+    ) -> None:
+        """
+        Initializes the AsyncPipeline with a single starting stage.
+
+        :param stage: The first processing stage to be added to the pipeline.
+        :param logged_columns: Optional columns to be logged during processing.
+        :param name: Optional name for the pipeline.
+        """
+        super().__init__(name or f'AsyncPipeline:{stage.name}')
+        self.stages = []
+        self._add(stage, logged_columns or [])
+
+    @property
+    def stateless(self) -> bool:
+        return all(
+            stage_info['stage'].stateless for stage_info in self.stages)
+
+    def validate(self, columns: Optional[Set[str]]) -> Optional[Set[str]]:
+        return validate_stages(self.stages, columns)
+
+    def setup(self, item: Dict) -> AsyncIterator:
+        pass
+
+    def process(self, item: Dict) -> AsyncIterator:
+        pass
+
+    def teardown(self, item: Dict) -> AsyncIterator:
+        pass
+
+    async def run(
+        self,
+        source: AsyncIterable = None,
+        **kwargs,
+    ) -> AsyncIterator:
+        if source is None:
+            return
+        outer_logged_columns = kwargs.get('logged_columns') or []
+        for stage_info in self.stages:
+            logged_columns = stage_info['logged_columns']
+            if outer_logged_columns:
+                logged_columns = list(dict.fromkeys(
+                    [*logged_columns, *outer_logged_columns]))
+            source = stage_info['stage'].run(
+                source,
+                logged_columns=logged_columns,
+            )
+        async for item in source:
+            yield item
+
+    def add_stage(
+        self,
+        stage: BaseStage,
+        logged_columns: List[str] = None,
+        name: str = None,
+    ) -> 'AsyncPipeline':
+        """
+        Adds a new stage to the pipeline for processing items in sequence.
+
+        :param stage: The stage to be added, synchronous or asynchronous.
+        :param logged_columns: Optional columns to be logged by this stage.
+        :param name: Optional name for the stage.
+        :return: The pipeline instance to allow for method chaining.
+        """
+        stage.validate(self.validate(None))
+        name = name or stage.name
+        self.name = f'{self.name}:{name}'
+        self._add(stage, logged_columns or [])
+        return self
+
+    def _add(self, stage: BaseStage, logged_columns: List[str]) -> None:
+        if isinstance(stage, Pipeline):
+            for stage_info in stage.stages:
+                self._add(
+                    stage_info['stage'],
+                    stage_info['logged_columns'] + [
+                        column for column in logged_columns
+                        if column not in stage_info['logged_columns']
+                    ],
+                )
+            return
+        if not isinstance(stage, (AsyncStage, AsyncPipeline)):
+            stage = SyncStageAdapter(stage)
+        self.stages.append({
+            'stage': stage,
+            'logged_columns': logged_columns,
+        })
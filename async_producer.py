@@ -0,0 +1,81 @@
+import asyncio
+from itertools import islice
+from typing import AsyncIterator, Dict, List, Optional
+
+from .common import Start, Stop
+from .producer import Producer
+
+
+class AsyncProducer:
+    """
+    A base class for producing items asynchronously, for instance from
+    sockets or queues, to be processed in an asynchronous data pipeline.
+    Like Producer, the stream starts with a Start signal and ends with a
+    Stop signal.
+    """
+    @property
+    def produced_columns(self) -> Optional[List[str]]:
+        """
+        Declares the columns of the produced items, see Producer.
+
+        :return: List of produced column names, or None if unknown.
+        """
+        return None
+
+    @property
+    async def stream(self) -> AsyncIterator[Dict]:
+        """
+        An asynchronous generator that produces a stream of items to be
+        processed, starting with a Start signal and ending with a Stop
+        signal.
+
+        :return: An asynchronous iterator generating a sequence of data
+                 items.
+        """
+        yield Start()
+        async for item in self.to_stream():
+            yield item
+        yield Stop()
+
+    async def to_stream(self) -> AsyncIterator[Dict]:
+        """
+        Generates the data items to be included in the stream. This method
+        must be implemented by subclasses as an asynchronous generator.
+
+        :return: An asynchronous iterator generating the stream data items.
+        """
+        raise NotImplementedError
+        yield
+
+
+class SyncProducerAdapter(AsyncProducer):
+    """
+    An adapter exposing a synchronous Producer as an AsyncProducer. The
+    synchronous stream is read in chunks in a worker thread through
+    asyncio.to_thread, so that blocking reads never stall the event loop.
+    """
+    def __init__(self, producer: Producer, chunk_size: int = 100) -> None:
+        """
+        Initializes the adapter with the producer to be wrapped.
+
+        :param producer: The synchronous producer.
+        :param chunk_size: Optional; the number of items read per thread
+                           hop.
+        """
+        self.producer = producer
+        self.chunk_size = chunk_size
+
+    @property
+    def produced_columns(self) -> Optional[List[str]]:
+        return self.producer.produced_columns
+
+    @property
+    async def stream(self) -> AsyncIterator[Dict]:
+        iterator = iter(self.producer.stream)
+        while True:
+            chunk = await asyncio.to_thread(
+                list, islice(iterator, self.chunk_size))
+            for item in chunk:
+                yield item
+            if len(chunk) < self.chunk_size:
+                break
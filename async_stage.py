@@ -0,0 +1,258 @@
+import asyncio
+import threading
+from collections import deque
+from typing import (
+    AsyncIterable, AsyncIterator, Dict, Iterator, List, Optional, Set,
+)
+
+from .base_stage import BaseStage, compile_projection
+from .common import Barrier, Start, Stop
+
+
+class AsyncStage(BaseStage):
+    """
+    A processing stage of an asynchronous data pipeline. The setup, process
+    and teardown methods are asynchronous generators, and up to
+    `concurrency` items may be processed at once, bounded by an
+    asyncio.Semaphore. Processed items are emitted in input order.
+    """
+    def __init__(
+        self,
+        name: str = None,
+        concurrency: int = 1,
+        no_copy: bool = False,
+        records: bool = False,
+    ) -> None:
+        """
+        Initializes the AsyncStage with an optional name and concurrency.
+
+        :param name: Optional; the name of the stage.
+        :param concurrency: Optional; the maximum number of items processed
+                            concurrently.
+        :param no_copy: Optional; if True, output items are passed through
+                        without being copied when neither output columns
+                        nor logged columns are configured.
+        :param records: Optional; if True, the declared input and output
+                        columns are projected into compact Record objects
+                        instead of dictionaries, see record.Record.
+        """
+        super().__init__(name, no_copy=no_copy, records=records)
+        self.concurrency = concurrency
+
+    async def setup(self, item: Dict) -> AsyncIterator:
+        """
+        Sets up any necessary resources or state before starting the
+        processing of data items. By default, this method emits a Start
+        signal to indicate the beginning of a stage's processing.
+
+        :param item: A dictionary potentially containing the initial
+                     configuration.
+        :return: An asynchronous iterator that should yield a Start signal.
+        """
+        yield Start()
+
+    async def process(self, item: Dict) -> AsyncIterator:
+        """
+        Processes a single item. This method is intended to be overridden by
+        subclasses with an asynchronous generator.
+
+        :param item: The item to be processed, as a dictionary.
+        :return: An asynchronous iterator over processed items.
+        """
+        raise NotImplementedError
+        yield
+
+    async def teardown(self, item: Dict) -> AsyncIterator:
+        """
+        Cleans up any resources or state after the processing of data items
+        has completed. By default, this method emits a Stop signal to
+        indicate the end of a stage's processing.
+
+        :param item: A dictionary potentially containing the final
+                     configuration.
+        :return: An asynchronous iterator that should yield a Stop signal.
+        """
+        yield Stop()
+
+    async def run(
+        self,
+        source: AsyncIterable = None,
+        **kwargs,
+    ) -> AsyncIterator:
+        """
+        Executes the stage on an asynchronous source, handling the Start and
+        Stop signals like Stage.run. In-flight items are drained before the
+        teardown runs.
+
+        :param source: An asynchronous iterable of source data items.
+        :param kwargs: Additional keyword arguments, including the logged
+                       columns.
+        :return: An asynchronous iterator over all processed data items.
+        """
+        if source is None:
+            return
+        get_logged = compile_projection(
+            kwargs.get('logged_columns'), missing_ok=True)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending = deque()
+        try:
+            async for in_data in source:
+                logged = get_logged(in_data) if get_logged else None
+                if isinstance(in_data, (Start, Stop, Barrier)):
+                    async for out_data in self._drain(pending, 0):
+                        yield out_data
+                    if isinstance(in_data, Barrier):
+                        if self.stateless:
+                            yield in_data
+                        continue
+                    if isinstance(in_data, Start):
+                        self.compile_projections()
+                        outputs = self.setup(in_data)
+                    else:
+                        outputs = self.teardown(in_data)
+                    async for out_data in outputs:
+                        yield self.get_output_item(
+                            out_data, logged_data=logged)
+                elif self.concurrency == 1:
+                    async for out_data in self.process(
+                        self.get_input_item(in_data)
+                    ):
+                        yield self.get_output_item(
+                            out_data, logged_data=logged)
+                else:
+                    await semaphore.acquire()
+                    task = asyncio.ensure_future(self._process(
+                        self.get_input_item(in_data), semaphore))
+                    pending.append((task, logged))
+                    async for out_data in self._drain(
+                        pending, 2 * self.concurrency
+                    ):
+                        yield out_data
+            async for out_data in self._drain(pending, 0):
+                yield out_data
+        finally:
+            for task, _ in pending:
+                task.cancel()
+
+    async def _process(
+        self,
+        item: Dict,
+        semaphore: asyncio.Semaphore,
+    ) -> List[Dict]:
+        try:
+            return [out_data async for out_data in self.process(item)]
+        finally:
+            semaphore.release()
+
+    async def _drain(self, pending: deque, limit: int) -> AsyncIterator:
+        """
+        Emits the processed items in input order, waiting until no more
+        than `limit` items remain pending.
+        """
+        while pending and (len(pending) > limit or pending[0][0].done()):
+            task, logged = pending.popleft()
+            for out_data in await task:
+                yield self.get_output_item(out_data, logged_data=logged)
+
+
+class SyncStageAdapter(AsyncStage):
+    """
+    An adapter running a synchronous stage inside an asynchronous pipeline.
+    The run method of the wrapped stage, with its batching, parallelism,
+    predicates and signal handling, is driven in a worker thread through
+    asyncio.to_thread: the thread pulls the input items from the
+    asynchronous source on the event loop, and hands the output items back
+    through a bounded queue. The wrapped stage is only ever called from
+    that single thread.
+    """
+    _END = object()
+
+    def __init__(self, stage: BaseStage, queue_size: int = 1000) -> None:
+        """
+        Initializes the adapter with the stage to be wrapped.
+
+        :param stage: The synchronous stage.
+        :param queue_size: Optional; the capacity of the queue of the output
+                           items of the stage thread.
+        """
+        super().__init__(stage.name)
+        self.stage = stage
+        self.queue_size = queue_size
+
+    @property
+    def input_columns(self) -> List[str]:
+        return self.stage.input_columns
+
+    @property
+    def output_columns(self) -> List[str]:
+        return self.stage.output_columns
+
+    @property
+    def stateless(self) -> bool:
+        return self.stage.stateless
+
+    @property
+    def aggregating(self) -> bool:
+        return self.stage.aggregating
+
+    def validate(self, columns: Optional[Set[str]]) -> Optional[Set[str]]:
+        return self.stage.validate(columns)
+
+    async def run(
+        self,
+        source: AsyncIterable = None,
+        **kwargs,
+    ) -> AsyncIterator:
+        """
+        Executes the wrapped stage on an asynchronous source.
+
+        :param source: An asynchronous iterable of source data items.
+        :param kwargs: Additional keyword arguments, passed over to the run
+                       method of the wrapped stage.
+        :return: An asynchronous iterator over all processed data items.
+        """
+        if source is None:
+            return
+        loop = asyncio.get_running_loop()
+        items = source.__aiter__()
+        outputs = asyncio.Queue(maxsize=self.queue_size)
+        stopped = threading.Event()
+
+        async def get_next() -> Dict:
+            return await items.__anext__()
+
+        def pull() -> Iterator:
+            # Runs in the stage thread, fetching every item on the loop.
+            while not stopped.is_set():
+                try:
+                    yield asyncio.run_coroutine_threadsafe(
+                        get_next(), loop).result()
+                except StopAsyncIteration:
+                    return
+
+        def drive() -> None:
+            try:
+                for out_data in self.stage.run(pull(), **kwargs):
+                    if stopped.is_set():
+                        break
+                    asyncio.run_coroutine_threadsafe(
+                        outputs.put(out_data), loop).result()
+            finally:
+                asyncio.run_coroutine_threadsafe(
+                    outputs.put(self._END), loop).result()
+
+        worker = asyncio.ensure_future(asyncio.to_thread(drive))
+        out_data = None
+        try:
+            while True:
+                out_data = await outputs.get()
+                if out_data is self._END:
+                    break
+                yield out_data
+        finally:
+            if out_data is not self._END:
+                # Unblocks the stage thread until it puts the end marker.
+                stopped.set()
+                while await outputs.get() is not self._END:
+                    pass
+            await worker
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import traceback
+import warnings
+
+from .async_consumer import AsyncConsumer, SyncConsumerAdapter
+from .async_pipeline import AsyncPipeline
+from .async_producer import AsyncProducer, SyncProducerAdapter
+from .task import Task
+
+
+class AsyncTask(Task):
+    """
+    A task driving an asynchronous graph of producer, pipeline and consumer
+    on an event loop. Synchronous producers, pipelines and consumers
+    returned by the properties are adapted automatically. Instrumentation
+    only covers the synchronous stages of the pipeline.
+    """
+    async def run(self) -> None:
+        """
+        Streams the items of the producer through the pipeline into the
+        consumer.
+        """
+        producer = self.get_producer()
+        if not isinstance(producer, AsyncProducer):
+            producer = SyncProducerAdapter(producer)
+        pipeline = self.pipeline
+        if self.metrics:
+            self.metrics.instrument(pipeline)
+        if not isinstance(pipeline, AsyncPipeline):
+            pipeline = AsyncPipeline(pipeline)
+        consumer = self.consumer
+        if not isinstance(consumer, AsyncConsumer):
+            consumer = SyncConsumerAdapter(consumer)
+        consumer.validate(pipeline.validate(producer.produced_columns))
+        await consumer.consume(pipeline.run(producer.stream))
+
+    def main(self) -> None:
+        try:
+            warnings.warn(f'{self.name} started ...')
+            logging.info(f'{self.name} started ...')
+            self.setup()
+            if self.metrics:
+                self.metrics.start()
+            asyncio.run(self.run())
+            if self.checkpoint:
+                self.checkpoint.remove()
+        except Exception as ex:
+            warnings.warn(f'{self.name} failed: {traceback.format_exc()}')
+            logging.warning(f'{self.name} failed ...')
+            logging.exception(str(ex))
+        finally:
+            if self.metrics:
+                self.metrics.stop()
+            self.teardown()
+            warnings.warn(f'{self.name} stopped ...')
+            logging.info(f'{self.name} stopped ...')
@@ -1,6 +1,37 @@
-from typing import Dict, Iterable, Iterator, List
+from operator import itemgetter
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple,
+)
 
-from .common import Start, Stop
+from .common import Barrier, Batch, Start, Stop
+from .record import Record, compile_record_projection
+from .schema import check_columns
+
+
+def compile_projection(
+    columns: Iterable,
+    missing_ok: bool = False,
+) -> Optional[Callable[[Dict], Dict]]:
+    """
+    Compiles a column projection into a function that fetches the projected
+    values with a single itemgetter call, which avoids looking the columns
+    up one by one in Python for every item.
+
+    :param columns: The column names to be projected.
+    :param missing_ok: Optional; if True, missing columns are projected as
+                       None instead of raising a KeyError.
+    :return: The projection function, or None if no columns are given.
+    """
+    columns = tuple(columns or ())
+    if not columns:
+        return None
+    if missing_ok:
+        return lambda data: dict(zip(columns, map(data.get, columns)))
+    if len(columns) == 1:
+        column, = columns
+        return lambda data: {column: data[column]}
+    getter = itemgetter(*columns)
+    return lambda data: dict(zip(columns, getter(data)))
 
 
 class BaseStage:
@@ -14,14 +45,25 @@ class BaseStage:
     def __init__(
         self,
         name: str = None,
+        no_copy: bool = False,
+        records: bool = False,
     ) -> None:
         """
         Initializes the BaseStage with an optional name. If no name is
         provided, the class name is used as the default name.
 
         :param name: Optional; the name of the stage.
+        :param no_copy: Optional; if True, output items are passed through
+                        without being copied when neither output columns
+                        nor logged columns are configured.
+        :param records: Optional; if True, the declared input and output
+                        columns are projected into compact Record objects
+                        instead of dictionaries, see record.Record.
         """
         self.name = name or self.__class__.__name__
+        self.no_copy = no_copy
+        self.records = records
+        self._projections = None
 
     @property
     def input_columns(self) -> List[str]:
@@ -41,6 +83,99 @@ class BaseStage:
         """
         return []
 
+    @property
+    def produced_columns(self) -> List[str]:
+        """
+        Declares the columns of the items produced by this stage, before the
+        logged columns are added. It defaults to the output columns.
+
+        :return: List of produced column names, or an empty list if unknown.
+        """
+        return self.output_columns
+
+    def validate(self, columns: Optional[Set[str]]) -> Optional[Set[str]]:
+        """
+        Checks that the input columns of this stage are produced upstream,
+        and infers the columns of its output items. It is meant to run once,
+        when the graph is built, rather than for every item.
+
+        :param columns: The columns of the input items, or None if unknown.
+        :return: The columns of the output items, or None if unknown.
+        """
+        check_columns(f'Stage {self.name}', self.input_columns, columns)
+        produced_columns = self.produced_columns
+        return set(produced_columns) if produced_columns else None
+
+    @property
+    def batch_size(self) -> Optional[int]:
+        """
+        Defines the number of data items grouped into a single batch when
+        the stage runs in batch mode.
+
+        :return: The batch size, or None if items are processed one by one.
+        """
+        return None
+
+    @property
+    def stateless(self) -> bool:
+        """
+        Tells whether every output item of the stage only depends on its
+        input item. Stateful stages, such as aggregations, hold items back,
+        so they drop Barrier signals instead of forwarding them: the items
+        preceding a barrier are not fully handled once it has passed. A
+        stage is stateful unless it declares otherwise, so that a stage
+        buffering items in its instance state never lets a checkpoint
+        through, and predicates are not moved across it.
+
+        :return: True if the outputs of every item are emitted as soon as
+                 it is processed, False otherwise.
+        """
+        return False
+
+    @property
+    def aggregating(self) -> bool:
+        """
+        Tells whether the output items of the stage are built from many
+        input items, such as groups, windows or sorted runs, rather than
+        from the item or signal they are emitted for. The logged data of
+        the input items is not merged into the output items of an
+        aggregating stage, and its logged columns are not added to its
+        output columns.
+
+        :return: True if the output items do not match the input items.
+        """
+        return False
+
+    @property
+    def columnar(self) -> bool:
+        """
+        Tells whether the stage processes whole columns at once, see
+        VectorStage.
+
+        :return: True if the stage consumes ColumnBatch objects.
+        """
+        return False
+
+    def compile_projections(self) -> Tuple[Optional[Callable], ...]:
+        """
+        Compiles the input and output column projections of the stage. It is
+        called whenever a Start signal arrives, so that the column properties
+        are evaluated once per run rather than once per item.
+
+        :return: The compiled input and output projections.
+        """
+        if self.records:
+            self._projections = tuple(
+                compile_record_projection(columns) if columns else None
+                for columns in (self.input_columns, self.output_columns)
+            )
+            return self._projections
+        self._projections = (
+            compile_projection(self.input_columns),
+            compile_projection(self.output_columns),
+        )
+        return self._projections
+
     def get_input_item(self, data: Dict):
         """
         Retrieves the input item based on defined input columns from the
@@ -50,30 +185,98 @@ class BaseStage:
         :return: Filtered data dictionary based on input columns or original
                  data if no input columns are defined.
         """
-        if isinstance(data, Start) or isinstance(data, Stop):
-            return data
-        if self.input_columns:
-            return {k: data[k] for k in self.input_columns}
-        else:
+        if isinstance(data, (Start, Stop, Barrier)):
             return data
+        projection = (self._projections or self.compile_projections())[0]
+        return projection(data) if projection else data
 
     def get_output_item(self, data: Dict, **kwargs):
         """
         Produces the output item based on defined output columns and
-        additional logged data.
+        additional logged data. In no-copy mode, the data is passed through
+        as is when there is neither an output projection nor logged data.
 
         :param data: Input data dictionary to be processed.
         :param kwargs: Additional keyword arguments, including logged data.
         :return: Processed output data with logged information appended.
         """
-        if isinstance(data, Start) or isinstance(data, Stop):
+        if isinstance(data, (Start, Stop, Barrier)):
             return data
-        logged_data = kwargs.get('logged_data') or {}
-        if self.output_columns:
-            out_item = {k: data[k] for k in self.output_columns}
-        else:
-            out_item = data
-        return {**out_item, **logged_data}
+        logged_data = kwargs.get('logged_data')
+        projection = (self._projections or self.compile_projections())[1]
+        if self.records:
+            out_item = projection(data) if projection else data
+            if isinstance(out_item, Record):
+                if logged_data:
+                    return out_item.extend(logged_data)
+                return out_item
+        elif projection:
+            out_item = projection(data)
+            if logged_data:
+                out_item.update(logged_data)
+            return out_item
+        if logged_data:
+            return {**data, **logged_data}
+        return data if self.no_copy else {**data}
+
+    def get_input_batch(self, data: List[Dict]) -> Batch:
+        """
+        Retrieves the input items of a whole batch based on defined input
+        columns.
+
+        :param data: A list of input data dictionaries.
+        :return: A batch of filtered data dictionaries.
+        """
+        projection = (self._projections or self.compile_projections())[0]
+        if projection:
+            return Batch(map(projection, data))
+        return Batch(data)
+
+    def get_output_batch(
+        self,
+        data: Iterable[Iterable[Dict]],
+        logged_data: List[Dict] = None,
+    ) -> Batch:
+        """
+        Produces the output items of a whole batch based on defined output
+        columns and the logged data of the corresponding input items.
+
+        :param data: An iterable yielding, for every input item, an iterable
+                     of its output items.
+        :param logged_data: Optional; the logged data of every input item,
+                            in the same order as the input items.
+        :return: A flat batch of output items.
+        """
+        projection = (self._projections or self.compile_projections())[1]
+        batch = Batch()
+        if logged_data is None:
+            for outputs in data:
+                if projection:
+                    batch.extend(map(projection, outputs))
+                elif self.no_copy:
+                    batch.extend(outputs)
+                elif self.records:
+                    batch.extend(
+                        out_data if isinstance(out_data, Record)
+                        else {**out_data} for out_data in outputs
+                    )
+                else:
+                    batch.extend({**out_data} for out_data in outputs)
+            return batch
+        for outputs, logged in zip(data, logged_data):
+            for out_data in outputs:
+                if projection:
+                    out_item = projection(out_data)
+                    if self.records:
+                        out_item = out_item.extend(logged)
+                    else:
+                        out_item.update(logged)
+                elif self.records and isinstance(out_data, Record):
+                    out_item = out_data.extend(logged)
+                else:
+                    out_item = {**out_data, **logged}
+                batch.append(out_item)
+        return batch
 
     def setup(self, item: Dict) -> Iterator:
         """
@@ -0,0 +1,95 @@
+"""
+Measures the throughput of the file producers against naive readers
+parsing one line at a time, on generated JSON Lines, CSV and fixed-width
+files.
+
+Usage: python3 -m workflow.benchmarks.bench_file_producers --length 1000000
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, Iterator
+
+from workflow.csv_producer import CsvProducer
+from workflow.fixed_width_producer import FixedWidthProducer
+from workflow.json_lines_producer import JsonLinesProducer
+
+COLUMNS = [f'col{j}' for j in range(5)]
+WIDTH = 10
+
+
+def write_files(directory: str, length: int) -> Dict[str, str]:
+    paths = {
+        kind: os.path.join(directory, f'data.{kind}')
+        for kind in ('jsonl', 'csv', 'txt')
+    }
+    with open(paths['jsonl'], 'w') as json_file, \
+            open(paths['csv'], 'w', newline='') as csv_file, \
+            open(paths['txt'], 'w') as text_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(COLUMNS)
+        for i in range(length):
+            values = [f'v{i + j}' for j in range(len(COLUMNS))]
+            json_file.write(json.dumps(dict(zip(COLUMNS, values))) + '\n')
+            writer.writerow(values)
+            text_file.write(
+                ''.join(value.ljust(WIDTH) for value in values) + '\n')
+    return paths
+
+
+def naive_json_lines(path: str) -> Iterator[Dict]:
+    for line in open(path):
+        yield json.loads(line)
+
+
+def naive_csv(path: str) -> Iterator[Dict]:
+    yield from csv.DictReader(open(path, newline=''))
+
+
+def naive_fixed_width(path: str) -> Iterator[Dict]:
+    for line in open(path):
+        yield {
+            name: line[j * WIDTH:(j + 1) * WIDTH].strip()
+            for j, name in enumerate(COLUMNS)
+        }
+
+
+def measure(name: str, length: int, get_stream: Callable) -> None:
+    start = time.perf_counter()
+    count = sum(1 for _ in get_stream())
+    elapsed = time.perf_counter() - start
+    assert count == length, (name, count)
+    print(f'{name:<24} {elapsed:8.3f} s {length / elapsed:12,.0f} items/s')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--length', type=int, default=1000000)
+    length = parser.parse_args().length
+    fixed_columns = [
+        (name, j * WIDTH, (j + 1) * WIDTH) for j, name in enumerate(COLUMNS)
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(directory, length)
+        cases = [
+            ('json lines', naive_json_lines, 'jsonl',
+             lambda path, **kwargs: JsonLinesProducer(path, **kwargs)),
+            ('csv', naive_csv, 'csv',
+             lambda path, **kwargs: CsvProducer(path, **kwargs)),
+            ('fixed width', naive_fixed_width, 'txt',
+             lambda path, **kwargs: FixedWidthProducer(
+                 path, fixed_columns, **kwargs)),
+        ]
+        for name, naive, kind, get_producer in cases:
+            path = paths[kind]
+            measure(f'naive {name}', length, lambda: naive(path))
+            measure(name, length, get_producer(path).to_stream)
+            measure(f'{name} (mmap)', length,
+                    get_producer(path, use_mmap=True).to_stream)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Measures the dictionaries allocated by column projection and logged-column
+merging for every item flowing through a 5-stage Pipeline.
+
+Every stage keeps a reference to the dictionaries built by get_input_item,
+get_output_item and the logged-column projection, so that they can be
+counted exactly and measured with tracemalloc. The legacy variant
+reproduces the per-item projection used before projections were compiled.
+
+Usage: python3 -m workflow.benchmarks.bench_projection --length 100000
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Dict, Iterator, List
+
+from workflow.common import Start, Stop
+from workflow.pipeline import Pipeline
+from workflow.serial_producer import SerialProducer
+from workflow.stage import Stage
+
+STAGES = 5
+
+
+def get_stream(length: int) -> Iterator[Dict]:
+    for i in range(length):
+        yield {f'col{j}': i + j for j in range(10)}
+
+
+class CountingStage(Stage):
+    def __init__(self, index: int, project: bool, **kwargs) -> None:
+        super().__init__(name=f'Stage{index}', **kwargs)
+        self.project = project
+        self.kept: List[Dict] = []
+
+    @property
+    def input_columns(self) -> List[str]:
+        return ['col0', 'col1'] if self.project else []
+
+    @property
+    def output_columns(self) -> List[str]:
+        return ['col0', 'col1'] if self.project else []
+
+    def get_input_item(self, data: Dict):
+        item = super().get_input_item(data)
+        if item is not data:
+            self.kept.append(item)
+        return item
+
+    def get_output_item(self, data: Dict, **kwargs):
+        item = super().get_output_item(data, **kwargs)
+        if item is not data:
+            self.kept.append(item)
+        if kwargs.get('logged_data'):
+            self.kept.append(kwargs['logged_data'])
+        return item
+
+    def process(self, item: Dict) -> Iterator:
+        yield item
+
+
+class LegacyStage(CountingStage):
+    def get_input_item(self, data: Dict):
+        if isinstance(data, (Start, Stop)):
+            return data
+        if self.input_columns:
+            item = {k: data[k] for k in self.input_columns}
+            self.kept.append(item)
+            return item
+        return data
+
+    def get_output_item(self, data: Dict, **kwargs):
+        if isinstance(data, (Start, Stop)):
+            return data
+        logged_data = kwargs.get('logged_data') or {}
+        if self.output_columns:
+            out_item = {k: data[k] for k in self.output_columns}
+            self.kept.append(out_item)
+        else:
+            out_item = data
+        item = {**out_item, **logged_data}
+        self.kept.extend((item, logged_data))
+        return item
+
+
+def build(stage_class: type, project: bool, logged: bool, **kwargs):
+    logged_columns = ['col2', 'col3'] if logged else None
+    stages = [
+        stage_class(index, project, **kwargs) for index in range(STAGES)
+    ]
+    pipeline = Pipeline(stage=stages[0], logged_columns=logged_columns)
+    for stage in stages[1:]:
+        pipeline.add_stage(stage=stage, logged_columns=logged_columns)
+    return pipeline, stages
+
+
+def measure(label: str, length: int, stage_class: type, **kwargs) -> None:
+    pipeline, stages = build(stage_class, **kwargs)
+    items = list(get_stream(length))
+    tracemalloc.start()
+    for _ in pipeline.run(SerialProducer(items).stream):
+        pass
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    dicts = sum(len(stage.kept) for stage in stages)
+
+    pipeline, stages = build(stage_class, **kwargs)
+    start = time.perf_counter()
+    for _ in pipeline.run(SerialProducer(items).stream):
+        pass
+    elapsed = time.perf_counter() - start
+    print(
+        f'{label:<36} {dicts / length:>10.1f} '
+        f'{traced / length:>12.0f} {elapsed / length * 1e6:>10.2f}'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--length', type=int, default=100000)
+    length = parser.parse_args().length
+    print(f'{STAGES}-stage Pipeline, {length} items')
+    print(f'{"mode":<36} {"dicts/item":>10} {"bytes/item":>12} '
+          f'{"us/item":>10}')
+    measure('legacy, projected + logged', length, LegacyStage,
+            project=True, logged=True)
+    measure('compiled, projected + logged', length, CountingStage,
+            project=True, logged=True)
+    measure('legacy, pass-through', length, LegacyStage,
+            project=False, logged=False)
+    measure('compiled, pass-through', length, CountingStage,
+            project=False, logged=False)
+    measure('compiled, pass-through, no-copy', length, CountingStage,
+            project=False, logged=False, no_copy=True)
+
+
+if __name__ == '__main__':
+    main()
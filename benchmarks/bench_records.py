@@ -0,0 +1,96 @@
+"""
+Compares plain dictionaries with Record objects for 10-, 50- and
+200-column items.
+
+Memory: the bytes allocated per item held in memory, as measured by
+tracemalloc, for items built by the output projection of a stage (a
+dictionary, or a Record of the declared output columns).
+
+Throughput: the time per item through a 3-stage Pipeline whose stages
+declare all the columns as input and output columns and carry one logged
+column, with `records=False` and `records=True`.
+
+Usage: python3 -m workflow.benchmarks.bench_records --length 100000
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Dict, Iterator, List
+
+from workflow.common import Start, Stop
+from workflow.pipeline import Pipeline
+from workflow.stage import Stage
+
+STAGES = 3
+
+
+def get_items(length: int, width: int) -> List[Dict]:
+    return [
+        {'tag': i, **{f'col{j}': i + j for j in range(width)}}
+        for i in range(length)
+    ]
+
+
+class ProjectingStage(Stage):
+    def __init__(self, width: int, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.columns = [f'col{j}' for j in range(width)]
+
+    @property
+    def input_columns(self) -> List[str]:
+        return self.columns
+
+    @property
+    def output_columns(self) -> List[str]:
+        return self.columns
+
+    def process(self, item: Dict) -> Iterator:
+        yield item
+
+
+def measure_memory(items: List[Dict], records: bool) -> float:
+    stage = ProjectingStage(len(items[0]) - 1, records=records)
+    stage.compile_projections()
+    tracemalloc.start()
+    kept = [stage.get_output_item(item) for item in items]
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (traced - kept.__sizeof__()) / len(kept)
+
+
+def measure_time(items: List[Dict], records: bool) -> float:
+    width = len(items[0]) - 1
+    pipeline = Pipeline(
+        stage=ProjectingStage(width, records=records),
+        logged_columns=['tag'],
+    )
+    for _ in range(STAGES - 1):
+        pipeline.add_stage(
+            stage=ProjectingStage(width, records=records),
+            logged_columns=['tag'],
+        )
+    start = time.perf_counter()
+    for _ in pipeline.run([Start(), *items, Stop()]):
+        pass
+    return (time.perf_counter() - start) / len(items)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--length', type=int, default=100000)
+    length = parser.parse_args().length
+    print(f'{length} items, {STAGES}-stage Pipeline')
+    print(f'{"columns":>8} {"mode":<8} {"bytes/item":>12} {"us/item":>10}')
+    for width in (10, 50, 200):
+        items = get_items(length, width)
+        for records in (False, True):
+            memory = measure_memory(items, records)
+            elapsed = measure_time(items, records)
+            print(
+                f'{width:>8} {"record" if records else "dict":<8} '
+                f'{memory:>12.0f} {elapsed * 1e6:>10.2f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Compares the transports of items from a writer process to a reader
+process.
+
+- queue: every item is pickled through a multiprocessing.Queue.
+- queue-batch: lists of 1000 items are pickled through a
+  multiprocessing.Queue.
+- ring: the items are encoded into a SharedRing, and the reader reads one
+  value of every BinaryRecord.
+- ring-dict: the same, but the reader decodes every record into a
+  dictionary.
+
+The items have 8 columns: 4 integers, 2 floats and 2 short strings. The
+time is measured by the reader, from the start of the writer process to
+the last item.
+
+Usage: python3 -m workflow.benchmarks.bench_shm_ring --length 1000000
+"""
+import argparse
+import multiprocessing
+import time
+from itertools import islice
+from typing import Dict, Iterator
+
+from workflow.record_codec import RecordCodec
+from workflow.shm_ring import SharedRing
+
+CODEC = RecordCodec([
+    ('id', int), ('user', int), ('count', int), ('flags', int),
+    ('price', float), ('ratio', float),
+    ('name', str, 16), ('country', str, 2),
+])
+CHUNK = 1000
+
+
+def get_items(length: int) -> Iterator[Dict]:
+    for i in range(length):
+        yield {
+            'id': i, 'user': i % 1000, 'count': i * 3, 'flags': i & 7,
+            'price': i * 0.5, 'ratio': 1 / (i + 1),
+            'name': f'item{i}', 'country': 'FR',
+        }
+
+
+def write_queue(queue: multiprocessing.Queue, length: int) -> None:
+    for item in get_items(length):
+        queue.put(item)
+    queue.put(None)
+
+
+def write_queue_batches(queue: multiprocessing.Queue, length: int) -> None:
+    items = get_items(length)
+    while True:
+        chunk = list(islice(items, CHUNK))
+        if not chunk:
+            break
+        queue.put(chunk)
+    queue.put(None)
+
+
+def write_ring(ring: SharedRing, length: int) -> None:
+    ring.put_many(get_items(length))
+    ring.close()
+    ring.detach()
+
+
+def run_queue(length: int, batches: bool) -> float:
+    queue = multiprocessing.Queue(maxsize=1000)
+    target = write_queue_batches if batches else write_queue
+    start = time.perf_counter()
+    process = multiprocessing.Process(target=target, args=(queue, length))
+    process.start()
+    count = 0
+    while True:
+        data = queue.get()
+        if data is None:
+            break
+        count += len(data) if batches else 1
+    elapsed = time.perf_counter() - start
+    process.join()
+    assert count == length
+    return elapsed
+
+
+def run_ring(length: int, decode: bool) -> float:
+    ring = SharedRing(CODEC, capacity=64 * CHUNK)
+    start = time.perf_counter()
+    process = multiprocessing.Process(target=write_ring, args=(ring, length))
+    process.start()
+    count = 0
+    if decode:
+        for record in ring:
+            count += record.to_dict()['id'] >= 0
+    else:
+        for record in ring:
+            count += record['id'] >= 0
+    elapsed = time.perf_counter() - start
+    del record
+    process.join()
+    ring.detach()
+    assert count == length
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--length', type=int, default=1000000)
+    length = parser.parse_args().length
+    print(f'{length} items, {CODEC.size} bytes per record')
+    print(f'{"transport":<12} {"seconds":>8} {"us/item":>8}')
+    for name, run in (
+        ('queue', lambda: run_queue(length, False)),
+        ('queue-batch', lambda: run_queue(length, True)),
+        ('ring', lambda: run_ring(length, False)),
+        ('ring-dict', lambda: run_ring(length, True)),
+    ):
+        elapsed = run()
+        print(f'{name:<12} {elapsed:>8.2f} {elapsed / length * 1e6:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+import sys
+import time
+from typing import Dict, Iterable, List
+
+from .common import Barrier, Start, Stop
+from .consumer import Consumer
+
+
+class BufferedConsumer(Consumer):
+    """
+    A base class for sinks writing items in bulk. Items are collected into
+    a buffer, which is handed over to the flush method whenever it holds
+    `max_items` items, reaches `max_bytes` bytes, or holds an item older
+    than `max_latency` seconds, and once more on teardown. The required
+    columns are checked once per buffer rather than once per item, unless
+    the consumer has been validated.
+    """
+    def __init__(
+        self,
+        max_items: int = 1000,
+        max_bytes: int = None,
+        max_latency: float = None,
+    ) -> None:
+        """
+        Initializes the BufferedConsumer with the bounds of its buffer.
+
+        :param max_items: Optional; the maximum number of buffered items.
+        :param max_bytes: Optional; the maximum estimated size of the
+                          buffered items, see get_size.
+        :param max_latency: Optional; the maximum age in seconds of a
+                            buffered item. The age is checked whenever an
+                            item arrives.
+        """
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_latency = max_latency
+        self.buffer: List[Dict] = []
+        self.buffer_size = 0
+        self.buffer_started_at = None
+
+    def get_size(self, item: Dict) -> int:
+        """
+        Estimates the size of an item, for the `max_bytes` bound. Sinks
+        encoding their items may override it with an exact size.
+
+        :param item: The item to be measured.
+        :return: The estimated size of the item, in bytes.
+        """
+        return sys.getsizeof(item) + sum(map(sys.getsizeof, item.values()))
+
+    def flush(self, batch: List[Dict]) -> None:
+        """
+        Writes a batch of items. This method must be implemented by
+        subclasses.
+
+        :param batch: The buffered items, in arrival order.
+        """
+        raise NotImplementedError
+
+    def sync(self) -> None:
+        """
+        Makes the flushed items durable before a Barrier is acknowledged,
+        so that a checkpoint never covers items still held in memory. Sinks
+        writing through their own buffers, such as files, must override it.
+        """
+        pass
+
+    def flush_buffer(self) -> None:
+        """
+        Validates the buffered items and hands them over to flush.
+        """
+        if not self.buffer:
+            return
+        batch = self.buffer
+        self.buffer = []
+        self.buffer_size = 0
+        self.buffer_started_at = None
+        self.validate_batch(batch)
+        self.flush(batch)
+
+    def validate_batch(self, batch: List[Dict]) -> None:
+        """
+        Checks that every item of a batch has the required columns.
+
+        :param batch: The items to be checked.
+        """
+        if self.schema_validated:
+            return
+        required_columns = self.required_columns
+        if not required_columns:
+            return
+        for item in batch:
+            if not required_columns <= item.keys():
+                raise ValueError(
+                    f'Invalid data {item}. '
+                    f'Required columns: {required_columns}.'
+                )
+
+    def process(self, item: Dict) -> None:
+        self.buffer.append(item)
+        if self.max_bytes:
+            self.buffer_size += self.get_size(item)
+        if self.max_latency:
+            now = time.monotonic()
+            if self.buffer_started_at is None:
+                self.buffer_started_at = now
+            elif now - self.buffer_started_at >= self.max_latency:
+                self.flush_buffer()
+                return
+        if (
+            len(self.buffer) >= self.max_items
+            or self.max_bytes and self.buffer_size >= self.max_bytes
+        ):
+            self.flush_buffer()
+
+    def teardown(self, item: Dict) -> None:
+        self.flush_buffer()
+
+    def consume(self, source: Iterable[Dict]) -> None:
+        """
+        Consumes items from the provided source, buffering them and flushing
+        the buffer whenever one of its bounds is reached, on Stop, and
+        before acknowledging a Barrier, see sync.
+
+        :param source: An iterable source of items to consume.
+        """
+        for item in source:
+            if isinstance(item, Start):
+                self.setup(item)
+            elif isinstance(item, Stop):
+                self.teardown(item)
+            elif isinstance(item, Barrier):
+                self.flush_buffer()
+                self.sync()
+                item.acknowledge()
+            else:
+                self.process(item)
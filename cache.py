@@ -0,0 +1,385 @@
+import pickle
+import shelve
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List
+
+MISSING = object()
+
+
+def get_size(value: object) -> int:
+    """
+    Estimates the memory held by a cached value: the value itself and, for
+    lists of dictionaries such as the outputs of a stage, its items, their
+    keys and their values.
+
+    :param value: The cached value.
+    :return: The estimated size, in bytes.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            size += sys.getsizeof(item)
+            if isinstance(item, dict):
+                for key, data in item.items():
+                    size += sys.getsizeof(key) + sys.getsizeof(data)
+    return size
+
+
+class ShelveBackend:
+    """
+    A persistent cache backend storing the entries in a shelve database on
+    the local disk. The database is opened on first use.
+    """
+    def __init__(self, path: str) -> None:
+        """
+        Initializes the backend with the path of the database.
+
+        :param path: The path of the shelve database.
+        """
+        self.path = path
+        self._shelf = None
+
+    def get(self, key: Hashable) -> object:
+        entry = self._open().get(repr(key))
+        if entry is None:
+            return MISSING
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            return MISSING
+        return value
+
+    def put(self, key: Hashable, value: object, expires_at: float) -> None:
+        self._open()[repr(key)] = (value, expires_at)
+
+    def close(self) -> None:
+        if self._shelf is not None:
+            self._shelf.close()
+            self._shelf = None
+
+    def _open(self) -> shelve.Shelf:
+        if self._shelf is None:
+            self._shelf = shelve.open(self.path)
+        return self._shelf
+
+    def __getstate__(self) -> Dict:
+        return {'path': self.path, '_shelf': None}
+
+
+class SqliteBackend:
+    """
+    A persistent cache backend storing the pickled entries in a SQLite
+    table on the local disk. Writes are committed every `commit_every`
+    entries and when the backend is closed.
+    """
+    def __init__(
+        self,
+        path: str,
+        table: str = 'cache',
+        commit_every: int = 1000,
+    ) -> None:
+        """
+        Initializes the backend with the path of the database.
+
+        :param path: The path of the database file.
+        :param table: Optional; the name of the table, created if needed.
+        :param commit_every: Optional; the number of entries written per
+                             transaction.
+        """
+        self.path = path
+        self.table = table
+        self.commit_every = commit_every
+        self._connection = None
+        self._uncommitted = 0
+
+    def get(self, key: Hashable) -> object:
+        row = self._open().execute(
+            f'SELECT value, expires_at FROM "{self.table}" WHERE key = ?',
+            (pickle.dumps(key),),
+        ).fetchone()
+        if row is None:
+            return MISSING
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            return MISSING
+        return pickle.loads(value)
+
+    def put(self, key: Hashable, value: object, expires_at: float) -> None:
+        self._open().execute(
+            f'INSERT OR REPLACE INTO "{self.table}" VALUES (?, ?, ?)',
+            (
+                pickle.dumps(key),
+                pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+                expires_at,
+            ),
+        )
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_every:
+            self._connection.commit()
+            self._uncommitted = 0
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.commit()
+            self._connection.close()
+            self._connection = None
+            self._uncommitted = 0
+
+    def _open(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path)
+            self._connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{self.table}" '
+                f'(key BLOB PRIMARY KEY, value BLOB, expires_at REAL)'
+            )
+        return self._connection
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state.update(_connection=None, _uncommitted=0)
+        return state
+
+
+class Cache:
+    """
+    A base class for in-memory caches bounded by a number of entries and/or
+    an estimated memory size, with hit and miss counters. Subclasses define
+    the eviction policy. An optional persistent backend keeps every entry on
+    the local disk, so that a warm cache survives between runs: entries
+    missing from memory are looked up in the backend.
+    """
+    def __init__(
+        self,
+        max_entries: int = None,
+        max_bytes: int = None,
+        backend=None,
+    ) -> None:
+        """
+        Initializes an empty cache.
+
+        :param max_entries: Optional; the maximum number of entries held in
+                            memory.
+        :param max_bytes: Optional; the maximum estimated size of the
+                          entries held in memory, see get_size.
+        :param backend: Optional; a persistent backend, such as a
+                        ShelveBackend or a SqliteBackend.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self.entries = {}
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Reports the hit and miss counters and the occupancy of the cache.
+
+        :return: A dictionary of statistics.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self),
+            'size': self.size,
+        }
+
+    def get(self, key: Hashable) -> object:
+        """
+        Looks up a value.
+
+        :param key: The key of the value.
+        :return: The cached value, or MISSING.
+        """
+        value = self._get(key)
+        if value is MISSING and self.backend is not None:
+            value = self.backend.get(key)
+            if value is not MISSING:
+                self._store(key, value)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: object) -> None:
+        """
+        Stores a value, evicting entries if the cache is full.
+
+        :param key: The key of the value.
+        :param value: The value to be cached.
+        """
+        self._store(key, value)
+        if self.backend is not None:
+            self.backend.put(key, value, self.get_expiry())
+
+    def get_expiry(self) -> float:
+        """
+        Computes the expiry time of an entry stored now.
+
+        :return: The expiry time, as a timestamp, or None if entries never
+                 expire.
+        """
+        return None
+
+    def close(self) -> None:
+        """
+        Closes the persistent backend, if any. The entries held in memory
+        are kept.
+        """
+        if self.backend is not None:
+            self.backend.close()
+
+    def _store(self, key: Hashable, value: object) -> None:
+        size = get_size(value) if self.max_bytes else 0
+        if key not in self.entries:
+            # Make room first, so that the new entry is never evicted.
+            while self.entries and (
+                self.max_entries and len(self) >= self.max_entries
+                or self.max_bytes and self.size + size > self.max_bytes
+            ):
+                self._evict()
+        self._put(key, value, size)
+
+    def _get(self, key: Hashable) -> object:
+        raise NotImplementedError
+
+    def _put(self, key: Hashable, value: object, size: int) -> None:
+        raise NotImplementedError
+
+    def _evict(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class LRUCache(Cache):
+    """
+    A cache evicting the least recently used entry first.
+    """
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.entries = OrderedDict()
+
+    def _get(self, key: Hashable) -> object:
+        entry = self.entries.get(key)
+        if entry is None:
+            return MISSING
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def _put(self, key: Hashable, value: object, size: int) -> None:
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= previous[1]
+        self.entries[key] = (value, size)
+        self.size += size
+
+    def _evict(self) -> None:
+        _, (_, size) = self.entries.popitem(last=False)
+        self.size -= size
+
+
+class LFUCache(Cache):
+    """
+    A cache evicting the least frequently used entry first, and the least
+    recently used one among equally frequent entries.
+    """
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.entries: Dict[Hashable, List] = {}
+        self._buckets: Dict[int, OrderedDict] = {}
+        self._min_count = 0
+
+    def _get(self, key: Hashable) -> object:
+        entry = self.entries.get(key)
+        if entry is None:
+            return MISSING
+        self._touch(key, entry)
+        return entry[0]
+
+    def _put(self, key: Hashable, value: object, size: int) -> None:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.size += size - entry[1]
+            entry[0], entry[1] = value, size
+            self._touch(key, entry)
+            return
+        self.entries[key] = [value, size, 1]
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_count = 1
+        self.size += size
+
+    def _evict(self) -> None:
+        bucket = self._buckets[self._min_count]
+        key, _ = bucket.popitem(last=False)
+        if not bucket:
+            del self._buckets[self._min_count]
+        self.size -= self.entries.pop(key)[1]
+        self._min_count = min(self._buckets, default=0)
+
+    def _touch(self, key: Hashable, entry: List) -> None:
+        count = entry[2]
+        bucket = self._buckets[count]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[count]
+            if self._min_count == count:
+                self._min_count = count + 1
+        entry[2] = count + 1
+        self._buckets.setdefault(count + 1, OrderedDict())[key] = None
+
+
+class TTLCache(Cache):
+    """
+    A cache whose entries expire `ttl` seconds after being stored. When the
+    cache is full, the entries closest to expiry are evicted first.
+    """
+    def __init__(self, ttl: float, **kwargs) -> None:
+        """
+        Initializes an empty cache.
+
+        :param ttl: The time to live of the entries, in seconds.
+        :param kwargs: Additional keyword arguments, see Cache.
+        """
+        super().__init__(**kwargs)
+        self.ttl = ttl
+        self.entries = OrderedDict()
+
+    def get_expiry(self) -> float:
+        return time.time() + self.ttl
+
+    def _get(self, key: Hashable) -> object:
+        entry = self.entries.get(key)
+        if entry is None:
+            return MISSING
+        if entry[2] <= time.time():
+            self._expire()
+            return MISSING
+        return entry[0]
+
+    def _put(self, key: Hashable, value: object, size: int) -> None:
+        self._expire()
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= previous[1]
+        self.entries[key] = (value, size, self.get_expiry())
+        self.size += size
+
+    def _evict(self) -> None:
+        _, (_, size, _) = self.entries.popitem(last=False)
+        self.size -= size
+
+    def _expire(self) -> None:
+        now = time.time()
+        while self.entries:
+            key, (_, size, expires_at) = next(iter(self.entries.items()))
+            if expires_at > now:
+                return
+            del self.entries[key]
+            self.size -= size
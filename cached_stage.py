@@ -0,0 +1,96 @@
+from operator import itemgetter
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Set
+
+from .base_stage import BaseStage
+from .cache import MISSING, Cache, LRUCache
+from .stage import Stage
+
+
+class CachedStage(Stage):
+    """
+    A wrapper memoizing a stage which is a pure function of its input
+    columns. The outputs of process are cached under the projected input
+    item and replayed on a hit, through the output projection of the
+    wrapped stage, and merged with the logged data of the current item as
+    usual. Input items whose values are not hashable are processed without
+    being cached.
+    """
+    def __init__(
+        self,
+        stage: BaseStage,
+        cache: Cache = None,
+        name: str = None,
+    ) -> None:
+        """
+        Initializes the CachedStage with the stage to be wrapped and its
+        cache.
+
+        :param stage: The stage to be memoized.
+        :param cache: Optional; the cache, such as an LRUCache, an LFUCache
+                      or a TTLCache, possibly with a persistent backend.
+                      Defaults to an LRUCache of 10000 entries.
+        :param name: Optional; the name of the stage.
+        """
+        super().__init__(name or f'Cached:{stage.name}')
+        self.stage = stage
+        self.cache = cache if cache is not None else LRUCache(
+            max_entries=10000)
+        self._get_key = None
+
+    @property
+    def input_columns(self) -> List[str]:
+        return self.stage.input_columns
+
+    @property
+    def output_columns(self) -> List[str]:
+        return self.stage.output_columns
+
+    @property
+    def stateless(self) -> bool:
+        return True
+
+    def validate(self, columns: Optional[Set[str]]) -> Optional[Set[str]]:
+        return self.stage.validate(columns)
+
+    @property
+    def hits(self) -> int:
+        return self.cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self.cache.misses
+
+    def get_key(self) -> Callable[[Dict], Hashable]:
+        """
+        Builds the function computing the cache key of a projected input
+        item: the tuple of the values of the input columns, or of all the
+        columns if no input columns are declared.
+
+        :return: The key function.
+        """
+        input_columns = self.input_columns
+        if not input_columns:
+            return lambda item: tuple(sorted(item.items()))
+        if len(input_columns) == 1:
+            return itemgetter(input_columns[0])
+        return itemgetter(*input_columns)
+
+    def setup(self, item: Dict) -> Iterator:
+        self._get_key = self.get_key()
+        yield from self.stage.setup(item)
+
+    def process(self, item: Dict) -> Iterator:
+        try:
+            key = self._get_key(item)
+            outputs = self.cache.get(key)
+        except TypeError:
+            yield from self.stage.process(item)
+            return
+        if outputs is MISSING:
+            outputs = list(self.stage.process(item))
+            self.cache.put(key, outputs)
+        yield from outputs
+
+    def teardown(self, item: Dict) -> Iterator:
+        yield from self.stage.teardown(item)
+        self.cache.close()
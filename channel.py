@@ -0,0 +1,189 @@
+import pickle
+import struct
+import tempfile
+import threading
+from collections import deque
+from typing import Dict, Iterator, List
+
+from .common import Barrier
+
+BLOCK = 'block'
+DROP = 'drop'
+SPILL = 'spill'
+
+_LENGTH = struct.Struct('<I')
+
+
+class _BarrierReference:
+    """
+    Stands for a spilled Barrier, which stays in memory so that its
+    acknowledgements reach its callback.
+    """
+    def __init__(self, key: int) -> None:
+        self.key = key
+
+
+class Channel:
+    """
+    A bounded, thread-safe queue connecting a writer thread to a reader
+    thread. When the channel is full, the writer either blocks, drops the
+    item, or spills it to a temporary file on disk, depending on the policy
+    of the channel. Spilled items are read back in order once the items
+    held in memory have been consumed. Iterating over the channel yields
+    its items until the writer closes it.
+    """
+    def __init__(
+        self,
+        capacity: int = 1000,
+        policy: str = BLOCK,
+        spill_dir: str = None,
+    ) -> None:
+        """
+        Initializes the Channel with its capacity and its policy.
+
+        :param capacity: Optional; the maximum number of items held in
+                         memory.
+        :param policy: Optional; what to do with an item put in a full
+                       channel: 'block', 'drop' or 'spill'.
+        :param spill_dir: Optional; the directory of the spill file.
+        """
+        if policy not in (BLOCK, DROP, SPILL):
+            raise ValueError(f'Invalid policy {policy}.')
+        self.capacity = capacity
+        self.policy = policy
+        self.spill_dir = spill_dir
+        self.dropped = 0
+        self.spilled = 0
+        self.max_depth = 0
+        self._items = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._cancelled = False
+        self._spill_file = None
+        self._spill_count = 0
+        self._spilled_barriers: Dict[int, Barrier] = {}
+        self._read_position = 0
+        self._write_position = 0
+
+    @property
+    def depth(self) -> int:
+        """
+        The number of items waiting in the channel, in memory or on disk.
+        """
+        return len(self._items) + self._spill_count
+
+    def put(self, item: object, force: bool = False) -> bool:
+        """
+        Puts an item in the channel, applying the policy of the channel if
+        it is full.
+
+        :param item: The item to be put.
+        :param force: Optional; if True, the item is never dropped, and the
+                      writer blocks instead.
+        :return: True if the item has been accepted.
+        """
+        with self._condition:
+            if self._cancelled:
+                return False
+            if self._spill_count or len(self._items) >= self.capacity:
+                if self.policy == SPILL:
+                    self._spill(item)
+                    self._condition.notify_all()
+                    return True
+                if self.policy == DROP and not force:
+                    self.dropped += 1
+                    return False
+                while len(self._items) >= self.capacity:
+                    if self._cancelled:
+                        return False
+                    self._condition.wait()
+            self._items.append(item)
+            self.max_depth = max(self.max_depth, self.depth)
+            self._condition.notify_all()
+            return True
+
+    def close(self) -> None:
+        """
+        Signals that no more items will be put in the channel.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def cancel(self) -> None:
+        """
+        Signals that the reader has stopped, so that the writer never blocks
+        on the channel again.
+        """
+        with self._condition:
+            self._cancelled = True
+            self._items.clear()
+            self._condition.notify_all()
+
+    def __iter__(self) -> Iterator:
+        while True:
+            with self._condition:
+                while not self._items and not self._spill_count:
+                    if self._closed:
+                        if self._spill_file is not None:
+                            self._spill_file.close()
+                            self._spill_file = None
+                        return
+                    self._condition.wait()
+                if self._items:
+                    item = self._items.popleft()
+                    self._condition.notify_all()
+                else:
+                    item = self._unspill()
+            yield item
+
+    def _spill(self, item: object) -> None:
+        if self._spill_file is None:
+            self._spill_file = tempfile.TemporaryFile(dir=self.spill_dir)
+        if isinstance(item, Barrier):
+            self._spilled_barriers[id(item)] = item
+            item = _BarrierReference(id(item))
+        data = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+        self._spill_file.seek(self._write_position)
+        self._spill_file.write(_LENGTH.pack(len(data)))
+        self._spill_file.write(data)
+        self._write_position = self._spill_file.tell()
+        self._spill_count += 1
+        self.spilled += 1
+        self.max_depth = max(self.max_depth, self.depth)
+
+    def _unspill(self) -> object:
+        self._spill_file.seek(self._read_position)
+        length, = _LENGTH.unpack(self._spill_file.read(_LENGTH.size))
+        item = pickle.loads(self._spill_file.read(length))
+        if isinstance(item, _BarrierReference):
+            item = self._spilled_barriers.pop(item.key)
+        self._read_position = self._spill_file.tell()
+        self._spill_count -= 1
+        if not self._spill_count:
+            self._spill_file.seek(0)
+            self._spill_file.truncate()
+            self._read_position = self._write_position = 0
+        return item
+
+
+def consume_channel(
+    consumer,
+    channel: Channel,
+    errors: List[Exception],
+) -> None:
+    """
+    Runs a consumer on the items of a channel, typically in a thread of its
+    own. Any exception raised by the consumer is appended to the errors,
+    and the channel is cancelled so that its writer never blocks on it.
+
+    :param consumer: The consumer, which consumes the whole channel.
+    :param channel: The channel feeding the consumer.
+    :param errors: The list collecting the exceptions.
+    """
+    try:
+        consumer.consume(channel)
+    except Exception as ex:
+        errors.append(ex)
+    finally:
+        channel.cancel()
@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator
+
+from .common import Barrier, Start, Stop
+from .predicates import Predicate
+from .producer import Producer
+
+
+class Checkpoint:
+    """
+    A local state file recording the position of a producer up to which
+    every item has been fully handled by the consumer, so that a failed run
+    can be resumed from there. The producer stream is interleaved with
+    Barrier signals every `every_items` items and/or `every_seconds`
+    seconds, carrying the offset of the producer, and the offset is
+    persisted once the consumer has acknowledged its barrier. The state
+    file is replaced atomically.
+    """
+    def __init__(
+        self,
+        path: str,
+        every_items: int = None,
+        every_seconds: float = None,
+    ) -> None:
+        """
+        Initializes the Checkpoint with its state file and interval.
+
+        :param path: The path of the state file.
+        :param every_items: Optional; the number of items between two
+                            checkpoints.
+        :param every_seconds: Optional; the number of seconds between two
+                              checkpoints. If neither interval is set, a
+                              checkpoint is taken every 10000 items.
+        """
+        self.path = path
+        self.every_items = every_items
+        self.every_seconds = every_seconds
+        if not every_items and not every_seconds:
+            self.every_items = 10000
+        self.saved = 0
+        self._lock = threading.Lock()
+
+    def load(self) -> Any:
+        """
+        Reads the last persisted offset.
+
+        :return: The offset, or None if there is no state file.
+        """
+        try:
+            with open(self.path) as file:
+                return json.load(file)['offset']
+        except FileNotFoundError:
+            return None
+
+    def save(self, offset: Any) -> None:
+        """
+        Persists an offset atomically: the state is written to a temporary
+        file, synced to disk, and renamed over the state file.
+
+        :param offset: The offset of the producer, which must be JSON
+                       serializable.
+        """
+        state = json.dumps({'offset': offset, 'saved_at': time.time()})
+        temporary_path = f'{self.path}.tmp'
+        with self._lock:
+            with open(temporary_path, 'w') as file:
+                file.write(state)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_path, self.path)
+            self._sync_directory()
+            self.saved += 1
+
+    def remove(self) -> None:
+        """
+        Removes the state file, once a run has completed.
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def track(self, producer: Producer) -> 'TrackedProducer':
+        """
+        Wraps a producer so that its stream carries the barriers of this
+        checkpoint.
+
+        :param producer: The producer, which must support offsets.
+        :return: The wrapped producer.
+        """
+        return TrackedProducer(producer, self)
+
+    def _acknowledged(self, barrier: Barrier) -> None:
+        self.save(barrier['offset'])
+
+    def _sync_directory(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            descriptor = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(descriptor)
+        except OSError:
+            pass
+        finally:
+            os.close(descriptor)
+
+
+class TrackedProducer(Producer):
+    """
+    A producer interleaving the stream of another producer with the
+    barriers of a checkpoint.
+    """
+    def __init__(self, producer: Producer, checkpoint: Checkpoint) -> None:
+        """
+        Initializes the TrackedProducer with the producer to be wrapped.
+
+        :param producer: The producer, which must support offsets.
+        :param checkpoint: The checkpoint persisting the offsets.
+        """
+        self.producer = producer
+        self.checkpoint = checkpoint
+
+    @property
+    def produced_columns(self):
+        return self.producer.produced_columns
+
+    @property
+    def offset(self) -> Any:
+        return self.producer.offset
+
+    def seek(self, offset: Any) -> None:
+        self.producer.seek(offset)
+
+    def where(self, predicate: Predicate) -> 'TrackedProducer':
+        """
+        Restricts the stream of the wrapped producer to the items matching
+        a predicate, see Producer.where, so that the barriers carry the
+        offsets of the filtered producer.
+
+        :param predicate: The predicate the items must match.
+        :return: A producer of the matching items, with the barriers of
+                 this checkpoint.
+        """
+        return TrackedProducer(
+            self.producer.where(predicate), self.checkpoint)
+
+    @property
+    def stream(self) -> Iterator[Dict]:
+        return self._track(self.producer.stream)
+
+    def to_stream(self) -> Iterator[Dict]:
+        return self._track(self.producer.to_stream())
+
+    def _track(self, items: Iterable[Dict]) -> Iterator[Dict]:
+        producer = self.producer
+        every_items = self.checkpoint.every_items
+        every_seconds = self.checkpoint.every_seconds
+        callback = self.checkpoint._acknowledged
+        count = 0
+        last_barrier = time.monotonic()
+        for item in items:
+            yield item
+            if isinstance(item, (Start, Stop)):
+                continue
+            count += 1
+            if every_items and count >= every_items or every_seconds and (
+                time.monotonic() - last_barrier >= every_seconds
+            ):
+                count = 0
+                last_barrier = time.monotonic()
+                offset = producer.offset
+                if offset is not None:
+                    yield Barrier(callback=callback, offset=offset)
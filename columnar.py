@@ -0,0 +1,144 @@
+import array
+from itertools import chain, compress
+from typing import Dict, Iterable, List, Sequence
+
+from .common import Batch
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Booleans are kept as lists, since an array.array turns them into
+# integers.
+_TYPECODES = {int: 'q', float: 'd'}
+
+
+def to_array(values: Sequence) -> Sequence:
+    """
+    Packs the values of a column into a contiguous array when they are all
+    numbers of the same type: a NumPy array if NumPy is installed, an
+    array.array otherwise. Any other column, such as a column mixing
+    integers and floats, is kept as a list, so that converting the batch
+    back into items gives the original values.
+
+    :param values: The values of the column.
+    :return: The column.
+    """
+    types = set(map(type, values))
+    if len(types) != 1:
+        return list(values)
+    kind = types.pop()
+    if numpy is not None:
+        if kind in (bool, int, float):
+            packed = numpy.asarray(values)
+            # Integers too large for 64 bits are kept as Python objects.
+            if packed.dtype.kind in 'biuf':
+                return packed
+        return list(values)
+    typecode = _TYPECODES.get(kind)
+    if typecode is not None:
+        try:
+            return array.array(typecode, values)
+        except OverflowError:
+            pass
+    return list(values)
+
+
+class ColumnBatch(dict):
+    """
+    A group of data items travelling through a data processing pipeline as
+    a single element, stored column by column: a mapping from every column
+    name to a sequence of values, such as a NumPy array, an array.array or
+    a list, all of the same length. Vectorized stages work on whole columns
+    at once, and projecting columns only selects them, without copying any
+    value. Like a Batch, it never contains Start, Stop or Barrier signals.
+    """
+    def __init__(
+        self,
+        columns: Dict[str, Sequence] = None,
+        num_rows: int = None,
+    ) -> None:
+        """
+        Initializes the ColumnBatch with its columns.
+
+        :param columns: Optional; the columns, by name.
+        :param num_rows: Optional; the number of items, which defaults to
+                         the length of the columns.
+        """
+        super().__init__(columns or {})
+        if num_rows is None:
+            num_rows = len(next(iter(self.values()))) if self else 0
+        self.num_rows = num_rows
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: List[Dict],
+        columns: Iterable[str] = None,
+    ) -> 'ColumnBatch':
+        """
+        Builds a batch from data items.
+
+        :param rows: The data items.
+        :param columns: Optional; the columns to be kept, which default to
+                        the columns of all the items. Missing values are
+                        set to None.
+        :return: The batch.
+        """
+        if columns is None:
+            columns = dict.fromkeys(chain.from_iterable(rows))
+        return cls({
+            column: to_array([row.get(column) for row in rows])
+            for column in columns
+        }, num_rows=len(rows))
+
+    def to_rows(self) -> Batch:
+        """
+        Converts the batch back into data items.
+
+        :return: A batch of data items, holding plain Python values.
+        """
+        if not self:
+            return Batch({} for _ in range(self.num_rows))
+        names = tuple(self)
+        values = [
+            column.tolist() if hasattr(column, 'tolist') else column
+            for column in self.values()
+        ]
+        return Batch(dict(zip(names, row)) for row in zip(*values))
+
+    def select(self, columns: Iterable[str]) -> 'ColumnBatch':
+        """
+        Projects the batch on some of its columns, without copying them.
+
+        :param columns: The column names to be kept.
+        :return: A batch sharing the selected columns with this one.
+        """
+        return ColumnBatch(
+            {column: self[column] for column in columns},
+            num_rows=self.num_rows,
+        )
+
+    def compress(self, mask: Sequence[bool]) -> 'ColumnBatch':
+        """
+        Keeps the items of the batch selected by a mask, such as the one
+        computed by a compiled predicate, see Predicate.compile_columns.
+        Every column keeps its type.
+
+        :param mask: A boolean per item, True for the items to be kept.
+        :return: A batch of the selected items.
+        """
+        num_rows = sum(map(bool, mask))
+        if num_rows == self.num_rows:
+            return self
+        columns = {}
+        for column, values in self.items():
+            if numpy is not None and isinstance(values, numpy.ndarray):
+                columns[column] = values[numpy.asarray(mask, dtype=bool)]
+            elif isinstance(values, array.array):
+                columns[column] = array.array(
+                    values.typecode, compress(values, mask))
+            else:
+                columns[column] = list(compress(values, mask))
+        return ColumnBatch(columns, num_rows=num_rows)
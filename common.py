@@ -1,3 +1,7 @@
+import threading
+from typing import Callable
+
+
 class Error(dict):
     """
     A custom error object that extends the dictionary type, allowing for errors
@@ -53,3 +57,59 @@ class Stop(dict):
                        metadata.
         """
         super().__init__(**kwargs)
+
+
+class Barrier(dict):
+    """
+    A signaling object that follows all the items produced before it
+    through a data processing pipeline. Stages forward it once they have
+    emitted everything derived from those items, and consumers acknowledge
+    it once they have handled them. When every consumer it reached has
+    acknowledged it, its callback runs, which allows for checkpoints.
+    Stages holding items back until the end of the stream, such as
+    aggregations, drop it instead, so that it never completes.
+    """
+    def __init__(self, callback: Callable = None, **kwargs) -> None:
+        """
+        Initializes the Barrier with the callback to run on completion and
+        any additional metadata as keyword arguments.
+
+        :param callback: Optional; a function called with the barrier once
+                         it has been acknowledged.
+        :param kwargs: Optional keyword arguments for carrying additional
+                       metadata, such as the position of the producer.
+        """
+        super().__init__(**kwargs)
+        self._callback = callback
+        self._pending = 1
+        self._lock = threading.Lock()
+
+    def expect(self, count: int) -> None:
+        """
+        Declares that the barrier is forwarded to `count` consumers instead
+        of one, each of which acknowledges it.
+
+        :param count: The number of consumers the barrier is forwarded to.
+        """
+        with self._lock:
+            self._pending += count - 1
+            completed = self._pending == 0
+        if completed and self._callback:
+            self._callback(self)
+
+    def acknowledge(self) -> None:
+        """
+        Acknowledges that all the items preceding the barrier have been
+        handled by a consumer.
+        """
+        self.expect(0)
+
+
+class Batch(list):
+    """
+    A group of data items travelling through a data processing pipeline as
+    a single element. Batches are produced and consumed by stages running in
+    batch mode, which allows the per-item overhead of the pipeline to be
+    paid once per group of items. A batch never contains Start, Stop or
+    Barrier signals.
+    """
@@ -1,6 +1,7 @@
-from typing import Dict, Iterable, Set
+from typing import Dict, Iterable, Optional, Set
 
-from .common import Start, Stop
+from .common import Barrier, Start, Stop
+from .schema import check_columns
 
 
 class Consumer:
@@ -8,7 +9,11 @@ class Consumer:
     A base class representing a consumer in a data processing pipeline. This
     class is designed to consume items from a data source, process them,
     and possibly forward them to the next stage or store the results.
+    Once the consumer has been validated against the columns produced
+    upstream, the items are no longer checked one by one.
     """
+    schema_validated = False
+
     @property
     def required_columns(self) -> Set:
         """
@@ -19,6 +24,22 @@ class Consumer:
         """
         return set()
 
+    def validate(self, columns: Optional[Set[str]]) -> None:
+        """
+        Checks that the required columns of this consumer are produced
+        upstream. It is meant to run once, before any data flows.
+
+        :param columns: The columns of the consumed items, or None if
+                        unknown, in which case the items are checked one by
+                        one while being consumed.
+        """
+        check_columns(
+            f'Consumer {self.__class__.__name__}',
+            self.required_columns,
+            columns,
+        )
+        self.schema_validated = columns is not None
+
     def setup(self, item: Dict) -> None:
         """
         Sets up resources or configurations needed before beginning to
@@ -51,18 +72,19 @@ class Consumer:
 
         :param source: An iterable source of items to consume.
         """
+        required_columns = (
+            None if self.schema_validated else self.required_columns)
         for item in source:
             if isinstance(item, Start):
                 self.setup(item)
             elif isinstance(item, Stop):
                 self.teardown(item)
+            elif isinstance(item, Barrier):
+                item.acknowledge()
             else:
-                if (
-                    self.required_columns
-                    and not self.required_columns.issubset(set(item.keys()))
-                ):
+                if required_columns and not required_columns <= item.keys():
                     raise ValueError(
                         f'Invalid data {item}. '
-                        f'Required columns: {self.required_columns}.'
+                        f'Required columns: {required_columns}.'
                     )
                 self.process(item)
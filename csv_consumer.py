@@ -0,0 +1,66 @@
+import csv
+from operator import itemgetter
+from typing import Dict, List, Set
+
+from .buffered_consumer import BufferedConsumer
+
+
+class CsvConsumer(BufferedConsumer):
+    """
+    A sink writing the given columns of items to a CSV file, one buffer per
+    write call.
+    """
+    def __init__(
+        self,
+        path: str,
+        columns: List[str],
+        header: bool = True,
+        delimiter: str = ',',
+        encoding: str = 'utf-8',
+        **kwargs,
+    ) -> None:
+        """
+        Initializes the CsvConsumer with the file to be written.
+
+        :param path: The path of the file.
+        :param columns: The columns to be written, in order.
+        :param header: Optional; if True, a header line is written first.
+        :param delimiter: Optional; the field delimiter.
+        :param encoding: Optional; the encoding of the file.
+        :param kwargs: Additional keyword arguments, see BufferedConsumer.
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self.columns = columns
+        self.header = header
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.file = None
+        self.writer = None
+        if len(columns) == 1:
+            column, = columns
+            self._get_row = lambda item: (item[column],)
+        else:
+            self._get_row = itemgetter(*columns)
+
+    @property
+    def required_columns(self) -> Set:
+        return set(self.columns)
+
+    def setup(self, item: Dict) -> None:
+        self.file = open(
+            self.path, 'w', encoding=self.encoding, newline='')
+        self.writer = csv.writer(self.file, delimiter=self.delimiter)
+        if self.header:
+            self.writer.writerow(self.columns)
+
+    def flush(self, batch: List[Dict]) -> None:
+        self.writer.writerows(map(self._get_row, batch))
+
+    def sync(self) -> None:
+        self.file.flush()
+
+    def teardown(self, item: Dict) -> None:
+        super().teardown(item)
+        self.file.close()
+        self.file = self.writer = None
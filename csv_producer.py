@@ -0,0 +1,72 @@
+import csv
+from typing import Dict, Iterator, List
+
+from .file_producer import FileProducer
+
+
+class CsvProducer(FileProducer):
+    """
+    A producer reading a CSV file whose records are on a single line each,
+    that is without line breaks inside quoted values. The column names are
+    read from the header line of the file unless they are given, and the
+    header line is skipped by whichever producer reads the start of the
+    file. Every record holds all the columns, those missing at the end of
+    a short row being None, and blank lines are skipped.
+    """
+    def __init__(
+        self,
+        path: str,
+        columns: List[str] = None,
+        delimiter: str = ',',
+        **kwargs,
+    ) -> None:
+        """
+        Initializes the CsvProducer with the file to be read.
+
+        :param path: The path of the file.
+        :param columns: Optional; the column names, if the file has no
+                        header line.
+        :param delimiter: Optional; the field delimiter.
+        :param kwargs: Additional keyword arguments, see FileProducer.
+        """
+        super().__init__(path, **kwargs)
+        self.columns = columns
+        self.has_header = columns is None
+        self.delimiter = delimiter
+
+    @property
+    def produced_columns(self) -> List[str]:
+        return self.get_columns()
+
+    def get_columns(self) -> List[str]:
+        if self.columns is None:
+            with open(self.path, encoding=self.encoding, newline='') as file:
+                self.columns = next(
+                    csv.reader(file, delimiter=self.delimiter), [])
+        return self.columns
+
+    def parse_lines(self, lines: List[bytes]) -> List[Dict]:
+        columns = self.get_columns()
+        text = b'\n'.join(lines).decode(self.encoding)
+        rows = csv.reader(text.split('\n'), delimiter=self.delimiter)
+        if self.predicate is not None:
+            # The rows are filtered before being turned into records.
+            rows = filter(self.predicate.compile_positions(columns), rows)
+        width = len(columns)
+        records = []
+        for row in rows:
+            if len(row) < width:
+                if not row:
+                    continue
+                row += [None] * (width - len(row))
+            records.append(dict(zip(columns, row)))
+        return records
+
+    def read_lines(self) -> Iterator[List[bytes]]:
+        lines = super().read_lines()
+        for chunk in lines:
+            if self.has_header and self.chunk_offset == 0:
+                chunk = chunk[1:]
+            yield chunk
+            break
+        yield from lines
@@ -0,0 +1,179 @@
+import heapq
+import pickle
+import struct
+import tempfile
+from operator import itemgetter
+from typing import IO, Callable, Dict, Iterator, List, Union
+
+from .cache import get_size
+from .common import Stop
+from .stage import Stage
+
+_LENGTH = struct.Struct('<I')
+
+
+class ExternalSortStage(Stage):
+    """
+    A stage sorting the whole stream on key columns, whatever its size.
+    Items are buffered in memory up to a budget of items and/or estimated
+    bytes, see cache.get_size. Whenever the budget is exceeded, the buffer
+    is sorted and spilled to a temporary file as a run of pickled chunks of
+    items, where the column names of a chunk are only written once, and
+    the runs are merged whenever there are max_runs of them. When the Stop
+    signal arrives, the runs and the remaining buffer are merged
+    and streamed in order. The sort is stable, and the items are emitted
+    right before the Stop signal, as they were received: the logged
+    data of the Stop signal is not merged into them.
+    """
+    def __init__(
+        self,
+        key: Union[str, List[str]],
+        reverse: bool = False,
+        max_items: int = 100000,
+        max_bytes: int = None,
+        max_runs: int = 64,
+        chunk_size: int = 1000,
+        spill_dir: str = None,
+        name: str = None,
+    ) -> None:
+        """
+        Initializes the ExternalSortStage with its sort key and memory
+        budget.
+
+        :param key: The column, or columns, the items are sorted on.
+        :param reverse: Optional; if True, the items are sorted in
+                        descending order.
+        :param max_items: Optional; the maximum number of items buffered in
+                          memory.
+        :param max_bytes: Optional; the maximum estimated size of the items
+                          buffered in memory.
+        :param max_runs: Optional; the maximum number of runs open at once.
+                         The runs are merged into a single larger run
+                         whenever there are max_runs of them, to bound the
+                         number of open files.
+        :param chunk_size: Optional; the number of items pickled together
+                           in a run.
+        :param spill_dir: Optional; the directory of the run files.
+        :param name: Optional; the name of the stage.
+        """
+        super().__init__(name)
+        self.key = [key] if isinstance(key, str) else list(key)
+        self.reverse = reverse
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.max_runs = max(max_runs, 2)
+        self.chunk_size = chunk_size
+        self.spill_dir = spill_dir
+        self.spilled_runs = 0
+        self._buffer: List[Dict] = []
+        self._size = 0
+        self._runs: List[IO[bytes]] = []
+
+    @property
+    def stateless(self) -> bool:
+        return False
+
+    @property
+    def aggregating(self) -> bool:
+        return True
+
+    def get_sort_key(self) -> Callable[[Dict], object]:
+        """
+        Compiles the function extracting the sort key of an item.
+
+        :return: The key function.
+        """
+        return itemgetter(*self.key)
+
+    def setup(self, item: Dict) -> Iterator:
+        self._close_runs()
+        self._buffer = []
+        self._size = 0
+        self.spilled_runs = 0
+        yield from super().setup(item)
+
+    def process(self, item: Dict) -> Iterator:
+        self._buffer.append(item)
+        if self.max_bytes is not None:
+            self._size += get_size((item,))
+        if (
+            self.max_items and len(self._buffer) >= self.max_items
+            or self.max_bytes is not None and self._size >= self.max_bytes
+        ):
+            self._spill()
+        return iter(())
+
+    def teardown(self, item: Stop) -> Iterator:
+        sort_key = self.get_sort_key()
+        buffer, self._buffer = self._buffer, []
+        self._size = 0
+        buffer.sort(key=sort_key, reverse=self.reverse)
+        try:
+            # The buffer holds the latest items, and is merged last to keep
+            # the sort stable.
+            yield from heapq.merge(
+                *map(self._read_run, self._runs),
+                buffer,
+                key=sort_key,
+                reverse=self.reverse,
+            )
+        finally:
+            self._close_runs()
+        yield from super().teardown(item)
+
+    def _spill(self) -> None:
+        buffer, self._buffer = self._buffer, []
+        self._size = 0
+        buffer.sort(key=self.get_sort_key(), reverse=self.reverse)
+        self._runs.append(self._write_run(buffer))
+        # The runs are merged as soon as there are max_runs of them, so that
+        # the number of open files stays bounded.
+        if len(self._runs) >= self.max_runs:
+            self._merge_runs()
+
+    def _merge_runs(self) -> None:
+        runs = self._runs[:self.max_runs]
+        merged = self._write_run(heapq.merge(
+            *map(self._read_run, runs),
+            key=self.get_sort_key(),
+            reverse=self.reverse,
+        ))
+        for run in runs:
+            run.close()
+        self._runs[:self.max_runs] = [merged]
+
+    def _write_run(self, items: Iterator[Dict]) -> IO[bytes]:
+        run = tempfile.TemporaryFile(dir=self.spill_dir)
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                self._write_chunk(run, chunk)
+                chunk = []
+        if chunk:
+            self._write_chunk(run, chunk)
+        run.flush()
+        self.spilled_runs += 1
+        return run
+
+    @staticmethod
+    def _write_chunk(run: IO[bytes], chunk: List[Dict]) -> None:
+        # The pickle memo writes every column name once per chunk.
+        data = pickle.dumps(chunk, protocol=pickle.HIGHEST_PROTOCOL)
+        run.write(_LENGTH.pack(len(data)))
+        run.write(data)
+
+    @staticmethod
+    def _read_run(run: IO[bytes]) -> Iterator[Dict]:
+        run.seek(0)
+        while True:
+            header = run.read(_LENGTH.size)
+            if not header:
+                return
+            length, = _LENGTH.unpack(header)
+            yield from pickle.loads(run.read(length))
+
+    def _close_runs(self) -> None:
+        for run in self._runs:
+            run.close()
+        self._runs = []
@@ -0,0 +1,221 @@
+import copy
+import mmap
+import os
+from typing import BinaryIO, Dict, Iterator, List, Optional, Union
+
+from .predicates import Predicate
+from .producer import Producer
+
+
+class FileProducer(Producer):
+    """
+    A base class for producers reading line-based records from large files.
+    The file is read in big chunks, or through mmap, and the records are
+    parsed a whole chunk of lines at a time. A producer may read only a
+    byte range of the file, so that several producers read disjoint slices
+    of the same file in parallel: a line belongs to the range it starts in.
+    Its offset is a cursor made of the file offset of the current chunk and
+    the number of records of the chunk already produced. A predicate set
+    with where is evaluated by parse_lines on every chunk, so that the
+    offset only counts the matching records: a run is resumed with the
+    same predicate.
+    """
+    def __init__(
+        self,
+        path: str,
+        start: int = 0,
+        end: int = None,
+        chunk_size: int = 1 << 20,
+        use_mmap: bool = False,
+        encoding: str = 'utf-8',
+    ) -> None:
+        """
+        Initializes the FileProducer with the file to be read.
+
+        :param path: The path of the file.
+        :param start: Optional; the offset of the byte range to be read.
+        :param end: Optional; the end of the byte range to be read, which
+                    defaults to the end of the file.
+        :param chunk_size: Optional; the number of bytes read at once.
+        :param use_mmap: Optional; if True, the file is memory-mapped instead
+                         of being read with read calls.
+        :param encoding: Optional; the encoding of the file.
+        """
+        self.path = path
+        self.start = start
+        self.end = end
+        self.chunk_size = chunk_size
+        self.use_mmap = use_mmap
+        self.encoding = encoding
+        self.predicate: Optional[Predicate] = None
+        self.chunk_offset = None
+        self._chunk_index = 0
+        self._resume = None
+
+    def shards(
+        self,
+        count: int,
+        key: Union[str, List[str]] = None,
+    ) -> List[Producer]:
+        """
+        Splits the byte range of the producer into disjoint, contiguous
+        ranges of about the same size, so that every shard only reads its
+        own slice of the file. Hash partitioning on a key reads the whole
+        file in every shard, see Producer.shards.
+
+        :param count: The number of shards.
+        :param key: Optional; the column, or columns, to hash-partition on.
+        :return: A list of producers, one per shard.
+        """
+        if key:
+            return super().shards(count, key=key)
+        start = self.start
+        end = os.path.getsize(self.path) if self.end is None else self.end
+        shards = []
+        for index in range(count):
+            shard = copy.copy(self)
+            shard.start = start + (end - start) * index // count
+            shard.end = start + (end - start) * (index + 1) // count
+            shards.append(shard)
+        return shards
+
+    def where(self, predicate: Predicate) -> Producer:
+        """
+        Restricts the records of the producer to the ones matching a
+        predicate, which subclasses may evaluate on the raw rows before
+        building the records.
+
+        :param predicate: The predicate the records must match.
+        :return: A copy of the producer, filtering its records.
+        """
+        producer = copy.copy(self)
+        if self.predicate is not None:
+            predicate = self.predicate & predicate
+        producer.predicate = predicate
+        return producer
+
+    def filter_records(self, records: List[Dict]) -> List[Dict]:
+        """
+        Keeps the records matching the predicate of the producer, if any.
+
+        :param records: The parsed records.
+        :return: The matching records.
+        """
+        if self.predicate is None:
+            return records
+        return list(filter(self.predicate.compile(), records))
+
+    def parse_lines(self, lines: List[bytes]) -> List[Dict]:
+        """
+        Parses a chunk of lines into records, keeping the ones matching the
+        predicate of the producer, see filter_records. This method must be
+        implemented by subclasses.
+
+        :param lines: The raw lines, without their line breaks.
+        :return: The parsed records.
+        """
+        raise NotImplementedError
+
+    @property
+    def offset(self) -> Optional[List[int]]:
+        if self.chunk_offset is None:
+            return self._resume
+        return [self.chunk_offset, self._chunk_index]
+
+    def seek(self, offset: List[int]) -> None:
+        self._resume = None if offset is None else list(offset)
+
+    def to_stream(self) -> Iterator[Dict]:
+        skip = self._resume[1] if self._resume else 0
+        for lines in self.read_lines():
+            items = self.parse_lines(lines)
+            self._chunk_index = 0
+            if skip:
+                self._chunk_index = min(skip, len(items))
+                skip -= self._chunk_index
+                items = items[self._chunk_index:]
+            for item in items:
+                self._chunk_index += 1
+                yield item
+
+    def read_lines(self) -> Iterator[List[bytes]]:
+        """
+        Reads the lines starting within the byte range of the producer,
+        a chunk at a time, or from the position the producer has been
+        sought to. Empty lines are skipped, and the file offset of every
+        chunk is kept in `chunk_offset`.
+
+        :return: An iterator over lists of raw lines, without their line
+                 breaks.
+        """
+        with open(self.path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            end = size if self.end is None else min(self.end, size)
+            if self._resume:
+                position = self._resume[0]
+            else:
+                position = self.get_first_line(file)
+            buffer = b''
+            offset = position
+            for chunk in self._read_chunks(file, position, size):
+                buffer += chunk
+                last_line_break = buffer.rfind(b'\n')
+                if last_line_break < 0:
+                    continue
+                block = buffer[:last_line_break]
+                buffer = buffer[last_line_break + 1:]
+                self.chunk_offset = offset
+                if offset + last_line_break + 1 > end:
+                    # Only keep the lines starting before the end of the range.
+                    count = block.count(b'\n', 0, max(end - offset - 1, 0))
+                    lines = block.split(b'\n', count + 1)[:count + 1]
+                    yield [line for line in lines if line]
+                    return
+                yield [line for line in block.split(b'\n') if line]
+                offset += last_line_break + 1
+                if offset >= end:
+                    return
+            if buffer and offset < end:
+                self.chunk_offset = offset
+                yield [buffer]
+
+    def get_first_line(self, file: BinaryIO) -> int:
+        """
+        Finds the offset of the first line starting within the byte range.
+
+        :param file: The file opened in binary mode.
+        :return: The offset of the first line of the range.
+        """
+        if self.start <= 0:
+            return 0
+        file.seek(self.start - 1)
+        position = self.start - 1
+        while True:
+            chunk = file.read(1 << 16)
+            if not chunk:
+                return position
+            line_break = chunk.find(b'\n')
+            if line_break >= 0:
+                return position + line_break + 1
+            position += len(chunk)
+
+    def _read_chunks(
+        self,
+        file: BinaryIO,
+        position: int,
+        size: int,
+    ) -> Iterator[bytes]:
+        if self.use_mmap:
+            if position >= size:
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                while position < size:
+                    yield data[position:position + self.chunk_size]
+                    position += self.chunk_size
+            return
+        file.seek(position)
+        while True:
+            chunk = file.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
@@ -1,18 +1,32 @@
-from typing import Dict, Iterator, List
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple,
+)
 
+from .columnar import ColumnBatch
+from .common import Batch
+from .predicates import Predicate
+from .schema import check_columns
 from .stage import Stage
+from .vector_stage import VectorStage
 
 
 class Filter(Stage):
     """
     A concrete implementation of a Stage that filters data items based on
     certain criteria. It can modify the data stream by selectively passing
-    items through.
+    items through: its output columns project every item, and its `where`
+    predicate, see predicates.Predicate, drops the items which do not match.
+    In batch mode, the predicate runs over the whole batch before any item
+    is projected.
     """
     def __init__(
         self,
         output_columns: List[str] = None,
         name: str = None,
+        batch_size: int = None,
+        no_copy: bool = False,
+        records: bool = False,
+        where: Predicate = None,
     ) -> None:
         """
         Initializes the Filter stage with optional output columns and name.
@@ -20,13 +34,130 @@ class Filter(Stage):
         :param output_columns: A list of column names to output, filtering
                                out other columns.
         :param name: Optional; the name of the filter stage.
+        :param batch_size: Optional; the batch size used in batch mode.
+        :param no_copy: Optional; if True, items are passed through without
+                        being copied when no projection or logging applies.
+        :param records: Optional; if True, the output columns are projected
+                        into compact Record objects, see record.Record.
+        :param where: Optional; the predicate the items must match to be
+                      passed through.
         """
-        super().__init__(name)
+        super().__init__(
+            name, batch_size=batch_size, no_copy=no_copy, records=records)
         self._output_columns = output_columns or []
+        self.where = where
+        self._where: Optional[Callable[[Dict], bool]] = None
 
     @property
     def output_columns(self) -> List[str]:
         return self._output_columns
 
+    @property
+    def stateless(self) -> bool:
+        return True
+
+    def validate(self, columns: Optional[Set[str]]) -> Optional[Set[str]]:
+        # The items are passed through, so the output columns are required.
+        check_columns(f'Stage {self.name}', self.output_columns, columns)
+        if self.where is not None:
+            check_columns(f'Stage {self.name}', self.where.columns, columns)
+        produced_columns = super().validate(columns)
+        if produced_columns is None and columns is not None:
+            return set(columns)
+        return produced_columns
+
+    def compile_projections(self) -> Tuple[Optional[Callable], ...]:
+        self._where = self.where.compile() if self.where is not None else None
+        return super().compile_projections()
+
     def process(self, item: Dict) -> Iterator:
-        yield item
+        if self._where is None or self._where(item):
+            yield item
+
+    def process_batch(self, items: List[Dict]) -> Iterator[Iterable[Dict]]:
+        # The items have been filtered by _run_batch already.
+        for item in items:
+            yield (item,)
+
+    def _run_batch(
+        self,
+        items: Batch,
+        get_logged: Optional[Callable[[Dict], Dict]],
+        emit_batches: bool,
+    ) -> Iterator:
+        if self._projections is None:
+            self.compile_projections()
+        if self._where is not None:
+            items = Batch(filter(self._where, items))
+        if items:
+            yield from super()._run_batch(items, get_logged, emit_batches)
+
+
+class VectorFilter(VectorStage):
+    """
+    A vectorized Filter, processing ColumnBatch objects: its `where`
+    predicate is evaluated column by column over the whole batch, see
+    predicates.Predicate.compile_columns, and the batch, logged columns
+    included, is compressed to the matching items before its output
+    columns are selected.
+    """
+    def __init__(
+        self,
+        output_columns: List[str] = None,
+        name: str = None,
+        batch_size: int = 1024,
+        where: Predicate = None,
+    ) -> None:
+        """
+        Initializes the VectorFilter stage with optional output columns and
+        predicate.
+
+        :param output_columns: A list of column names to output, filtering
+                               out other columns.
+        :param name: Optional; the name of the filter stage.
+        :param batch_size: Optional; the number of items grouped into a
+                           ColumnBatch.
+        :param where: Optional; the predicate the items must match to be
+                      passed through.
+        """
+        super().__init__(name, batch_size=batch_size)
+        self._output_columns = output_columns or []
+        self.where = where
+        self._where: Optional[Callable[[ColumnBatch], List[bool]]] = None
+
+    @property
+    def output_columns(self) -> List[str]:
+        return self._output_columns
+
+    @property
+    def stateless(self) -> bool:
+        return True
+
+    def validate(self, columns: Optional[Set[str]]) -> Optional[Set[str]]:
+        check_columns(f'Stage {self.name}', self.output_columns, columns)
+        if self.where is not None:
+            check_columns(f'Stage {self.name}', self.where.columns, columns)
+        produced_columns = super().validate(columns)
+        if produced_columns is None and columns is not None:
+            return set(columns)
+        return produced_columns
+
+    def compile_projections(self) -> Tuple[Optional[Callable], ...]:
+        self._where = (
+            self.where.compile_columns() if self.where is not None else None)
+        return super().compile_projections()
+
+    def process_columns(self, batch: ColumnBatch) -> ColumnBatch:
+        return batch
+
+    def _run_columns(
+        self,
+        batch: ColumnBatch,
+        logged_columns: List[str],
+        emit: Tuple[bool, bool],
+    ) -> Iterator:
+        if self._projections is None:
+            self.compile_projections()
+        if self._where is not None:
+            batch = batch.compress(self._where(batch))
+        yield from super()._run_columns(batch, logged_columns, emit)
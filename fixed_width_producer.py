@@ -0,0 +1,49 @@
+from typing import Dict, List, Tuple
+
+from .file_producer import FileProducer
+
+
+class FixedWidthProducer(FileProducer):
+    """
+    A producer reading a fixed-width file, every column of which occupies
+    the same character positions on every line. The values are stripped of
+    their padding.
+    """
+    def __init__(
+        self,
+        path: str,
+        columns: List[Tuple[str, int, int]],
+        **kwargs,
+    ) -> None:
+        """
+        Initializes the FixedWidthProducer with the file to be read.
+
+        :param path: The path of the file.
+        :param columns: The columns, as (name, start, end) tuples of
+                        character positions, the end being excluded.
+        :param kwargs: Additional keyword arguments, see FileProducer.
+        """
+        super().__init__(path, **kwargs)
+        self.columns = columns
+        self._names = tuple(name for name, _, _ in columns)
+        self._slices = tuple(
+            slice(int(start), int(end)) for _, start, end in columns)
+
+    @property
+    def produced_columns(self) -> List[str]:
+        return [name for name, _, _ in self.columns]
+
+    def parse_line(self, line: str) -> Dict:
+        """
+        Parses a line with the slices of the columns, computed once.
+
+        :param line: The decoded line.
+        :return: The stripped values, by column.
+        """
+        return dict(zip(
+            self._names, [line[field].strip() for field in self._slices]))
+
+    def parse_lines(self, lines: List[bytes]) -> List[Dict]:
+        text = b'\n'.join(lines).decode(self.encoding)
+        return self.filter_records(
+            list(map(self.parse_line, text.split('\n'))))
@@ -0,0 +1,112 @@
+import time
+from typing import Dict, Iterator, List, Union
+
+from .aggregation import Aggregations, Aggregator, get_key_getter
+from .common import Stop
+from .stage import Stage
+
+
+class GroupByStage(Stage):
+    """
+    A stage aggregating the items of every group of a key with incremental
+    accumulators, see aggregation.Aggregator, so that a group holds a
+    constant amount of memory whatever its number of items. A group is
+    emitted, and then started afresh, once it has aggregated flush_items
+    items or has been open for flush_seconds seconds. The remaining groups
+    are emitted when the Stop signal arrives, in the order they were
+    opened. The logged data of the items is not carried over to the
+    groups, see BaseStage.aggregating.
+    """
+    def __init__(
+        self,
+        key: Union[str, List[str], None],
+        aggregations: Aggregations,
+        flush_items: int = None,
+        flush_seconds: float = None,
+        name: str = None,
+    ) -> None:
+        """
+        Initializes the GroupByStage with its key and aggregations.
+
+        :param key: The column, or columns, of the groups. None aggregates
+                    all the items into a single group.
+        :param aggregations: The aggregations, by output column, see
+                             aggregation.Aggregator.
+        :param flush_items: Optional; the number of items after which a
+                            group is emitted.
+        :param flush_seconds: Optional; the number of seconds after which a
+                              group is emitted. It is checked whenever an
+                              item arrives.
+        :param name: Optional; the name of the stage.
+        """
+        super().__init__(name)
+        self.key_columns, self.get_key = get_key_getter(key)
+        self.aggregator = Aggregator(aggregations)
+        self.flush_items = flush_items
+        self.flush_seconds = flush_seconds
+        self._groups: Dict[tuple, List] = {}
+
+    @property
+    def input_columns(self) -> List[str]:
+        return list(dict.fromkeys(
+            [*self.key_columns, *self.aggregator.input_columns]))
+
+    @property
+    def output_columns(self) -> List[str]:
+        return [*self.key_columns, *self.aggregator.names]
+
+    @property
+    def stateless(self) -> bool:
+        return False
+
+    @property
+    def aggregating(self) -> bool:
+        return True
+
+    def setup(self, item: Dict) -> Iterator:
+        self._groups = {}
+        yield from super().setup(item)
+
+    def process(self, item: Dict) -> Iterator:
+        groups = self._groups
+        key = self.get_key(item)
+        group = groups.get(key)
+        if group is None:
+            # A group is made of its accumulators, its number of items and
+            # the time it was opened.
+            group = groups[key] = [
+                self.aggregator.create(), 0, time.monotonic()]
+        self.aggregator.add(group[0], item)
+        group[1] += 1
+        if self.flush_items and group[1] >= self.flush_items:
+            del groups[key]
+            yield self.get_result(key, group[0])
+        if self.flush_seconds is not None:
+            expiry = time.monotonic() - self.flush_seconds
+            # Groups are kept in the order they were opened.
+            while groups:
+                key = next(iter(groups))
+                group = groups[key]
+                if group[2] > expiry:
+                    break
+                del groups[key]
+                yield self.get_result(key, group[0])
+
+    def teardown(self, item: Stop) -> Iterator:
+        groups, self._groups = self._groups, {}
+        for key, group in groups.items():
+            yield self.get_result(key, group[0])
+        yield from super().teardown(item)
+
+    def get_result(self, key: tuple, accumulators: List) -> Dict:
+        """
+        Builds the output item of a group.
+
+        :param key: The key of the group.
+        :param accumulators: The accumulators of the group.
+        :return: The key columns and the aggregated columns of the group.
+        """
+        return {
+            **dict(zip(self.key_columns, key)),
+            **self.aggregator.result(accumulators),
+        }
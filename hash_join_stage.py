@@ -0,0 +1,262 @@
+import dbm
+import os
+import pickle
+import shutil
+import sqlite3
+import tempfile
+from typing import Dict, Hashable, Iterator, List, Optional, Set, Union
+
+from .aggregation import get_key_getter
+from .producer import Producer
+from .schema import check_columns
+from .stage import Stage
+
+MEMORY = 'memory'
+SQLITE = 'sqlite'
+DBM = 'dbm'
+INNER = 'inner'
+LEFT = 'left'
+
+
+class MemoryIndex:
+    """
+    A join index holding the side rows in a dictionary.
+    """
+    def __init__(self) -> None:
+        self.rows: Dict[Hashable, List[Dict]] = {}
+
+    def add(self, key: tuple, row: Dict) -> None:
+        self.rows.setdefault(key, []).append(row)
+
+    def get(self, key: tuple) -> List[Dict]:
+        return self.rows.get(key, [])
+
+    def close(self) -> None:
+        self.rows = {}
+
+
+class SqliteIndex:
+    """
+    A join index storing the pickled side rows in an indexed SQLite table
+    on the local disk. Rows are inserted in transactions of `commit_every`
+    rows, and the table is indexed once all the rows are inserted.
+    """
+    def __init__(self, path: str, commit_every: int = 10000) -> None:
+        """
+        Initializes the index with the path of its database, which is
+        emptied.
+
+        :param path: The path of the database file.
+        :param commit_every: Optional; the number of rows inserted per
+                             transaction.
+        """
+        self.commit_every = commit_every
+        self._connection = sqlite3.connect(path)
+        self._connection.execute('DROP TABLE IF EXISTS "rows"')
+        self._connection.execute('CREATE TABLE "rows" (key BLOB, row BLOB)')
+        self._pending = []
+        self._indexed = False
+
+    def add(self, key: tuple, row: Dict) -> None:
+        self._pending.append((
+            pickle.dumps(key),
+            pickle.dumps(row, protocol=pickle.HIGHEST_PROTOCOL),
+        ))
+        if len(self._pending) >= self.commit_every:
+            self._flush()
+
+    def get(self, key: tuple) -> List[Dict]:
+        if not self._indexed:
+            self._flush()
+            self._connection.execute('CREATE INDEX "keys" ON "rows" (key)')
+            self._indexed = True
+        return [
+            pickle.loads(row) for row, in self._connection.execute(
+                'SELECT row FROM "rows" WHERE key = ? ORDER BY rowid',
+                (pickle.dumps(key),),
+            )
+        ]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._connection.executemany(
+                'INSERT INTO "rows" VALUES (?, ?)', self._pending)
+            self._pending = []
+        self._connection.commit()
+
+
+class DbmIndex:
+    """
+    A join index storing the pickled side rows of every key in a dbm
+    database on the local disk.
+    """
+    def __init__(self, path: str) -> None:
+        """
+        Initializes the index with the path of its database, which is
+        emptied.
+
+        :param path: The path of the database.
+        """
+        self._db = dbm.open(path, 'n')
+
+    def add(self, key: tuple, row: Dict) -> None:
+        encoded = pickle.dumps(key)
+        rows = self._db.get(encoded)
+        rows = pickle.loads(rows) if rows is not None else []
+        rows.append(row)
+        self._db[encoded] = pickle.dumps(
+            rows, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def get(self, key: tuple) -> List[Dict]:
+        rows = self._db.get(pickle.dumps(key))
+        return pickle.loads(rows) if rows is not None else []
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class HashJoinStage(Stage):
+    """
+    A stage joining the main stream with the rows of a side producer,
+    such as a large reference dataset. The side rows are loaded into an
+    index on their key columns when the Start signal arrives, either in
+    memory or on disk, with SQLite or dbm, when they do not fit in memory.
+    Every main item is then looked up on its input columns, the key, and
+    an output item is emitted for every matching side row, made of the key
+    and the joined columns of the row. An inner join drops the unmatched
+    items, and a left join emits them with None joined columns. Other
+    columns of the main items are carried over through logged columns, as
+    usual.
+    """
+    def __init__(
+        self,
+        side: Producer,
+        key: Union[str, List[str]],
+        columns: List[str] = None,
+        side_key: Union[str, List[str]] = None,
+        how: str = INNER,
+        backend: str = MEMORY,
+        path: str = None,
+        name: str = None,
+    ) -> None:
+        """
+        Initializes the HashJoinStage with its side producer and keys.
+
+        :param side: The producer of the side rows.
+        :param key: The column, or columns, of the key of the main items.
+        :param columns: Optional; the side columns joined to the main
+                        items. Defaults to all the columns of the side rows
+                        other than their key.
+        :param side_key: Optional; the key columns of the side rows, in the
+                         order of the key. Defaults to the key.
+        :param how: Optional; the type of join: 'inner' or 'left'.
+        :param backend: Optional; the index of the side rows: 'memory',
+                        'sqlite' or 'dbm'.
+        :param path: Optional; the path of a disk-backed index. Defaults to
+                     a temporary file, removed when the Stop signal
+                     arrives.
+        :param name: Optional; the name of the stage.
+        :raises ValueError: If the join or the backend is unknown.
+        """
+        super().__init__(name)
+        if how not in (INNER, LEFT):
+            raise ValueError(f'Invalid join {how}.')
+        if backend not in (MEMORY, SQLITE, DBM):
+            raise ValueError(f'Invalid backend {backend}.')
+        self.side = side
+        self.key_columns, self.get_key = get_key_getter(key)
+        self.side_key_columns, self.get_side_key = get_key_getter(
+            self.key_columns if side_key is None else side_key)
+        if len(self.side_key_columns) != len(self.key_columns):
+            raise ValueError('The keys must have as many columns.')
+        self.columns = columns
+        self.how = how
+        self.backend = backend
+        self.path = path
+        self.index = None
+        self._directory: Optional[str] = None
+
+    @property
+    def input_columns(self) -> List[str]:
+        return self.key_columns
+
+    @property
+    def produced_columns(self) -> List[str]:
+        if self.columns is None:
+            return []
+        return list(dict.fromkeys([*self.key_columns, *self.columns]))
+
+    @property
+    def stateless(self) -> bool:
+        return True
+
+    def validate(self, columns: Optional[Set[str]]) -> Optional[Set[str]]:
+        side_columns = self.side.produced_columns
+        check_columns(
+            f'Side of stage {self.name}',
+            [*self.side_key_columns, *(self.columns or [])],
+            set(side_columns) if side_columns else None,
+        )
+        output_columns = super().validate(columns)
+        if self.columns is None and side_columns:
+            return set(self.key_columns) | (
+                set(side_columns) - set(self.side_key_columns))
+        return output_columns
+
+    def create_index(self):
+        """
+        Creates an empty index of side rows for the backend of the stage.
+
+        :return: The index.
+        """
+        if self.backend == MEMORY:
+            return MemoryIndex()
+        path = self.path
+        if path is None:
+            self._directory = tempfile.mkdtemp()
+            path = os.path.join(self._directory, 'index')
+        if self.backend == SQLITE:
+            return SqliteIndex(path)
+        return DbmIndex(path)
+
+    def setup(self, item: Dict) -> Iterator:
+        self._close_index()
+        self.index = self.create_index()
+        columns, side_key_columns = self.columns, set(self.side_key_columns)
+        for row in self.side.to_stream():
+            if columns is None:
+                joined = {
+                    column: value for column, value in row.items()
+                    if column not in side_key_columns
+                }
+            else:
+                joined = {column: row.get(column) for column in columns}
+            self.index.add(self.get_side_key(row), joined)
+        yield from super().setup(item)
+
+    def process(self, item: Dict) -> Iterator:
+        key = self.get_key(item)
+        rows = self.index.get(key)
+        key_item = dict(zip(self.key_columns, key))
+        for row in rows:
+            yield {**key_item, **row}
+        if not rows and self.how == LEFT:
+            yield {
+                **key_item,
+                **{column: None for column in self.columns or []},
+            }
+
+    def teardown(self, item: Dict) -> Iterator:
+        self._close_index()
+        yield from super().teardown(item)
+
+    def _close_index(self) -> None:
+        if self.index is not None:
+            self.index.close()
+            self.index = None
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
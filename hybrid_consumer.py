@@ -1,6 +1,9 @@
-from typing import Dict, Iterable, List
+import threading
+from typing import Dict, Iterable, List, Optional, Set
 
 from .base_stage import BaseStage
+from .channel import BLOCK, Channel, consume_channel
+from .common import Barrier, Start, Stop
 from .consumer import Consumer
 from .pipeline import Pipeline
 
@@ -15,6 +18,10 @@ class HybridConsumer(Consumer):
         self,
         consumers: List[Consumer],
         pipeline: Pipeline = None,
+        fan_out: bool = False,
+        queue_size: int = 1000,
+        full_policy: str = BLOCK,
+        spill_dir: str = None,
     ) -> None:
         """
         Initializes the HybridConsumer with a list of consumers and an
@@ -24,9 +31,39 @@ class HybridConsumer(Consumer):
                           consumption.
         :param pipeline: Optional; a Pipeline instance to pre-process items
                          before consumption.
+        :param fan_out: Optional; if True, every consumer runs in its own
+                        thread and consumes one continuous stream fed
+                        through its own bounded queue.
+        :param queue_size: Optional; the capacity of every queue in fan-out
+                           mode.
+        :param full_policy: Optional; what to do with an item when a queue
+                            is full in fan-out mode: 'block', 'drop' or
+                            'spill' to disk. Start and Stop signals are
+                            never dropped.
+        :param spill_dir: Optional; the directory of the spill files.
         """
         self.consumers = consumers
         self.pipeline = pipeline
+        self.fan_out = fan_out
+        self.queue_size = queue_size
+        self.full_policy = full_policy
+        self.spill_dir = spill_dir
+        self.channels: List[Channel] = []
+        self.validate(None)
+
+    def validate(self, columns: Optional[Set[str]]) -> None:
+        """
+        Validates the internal pipeline, if any, and then every consumer
+        against the columns coming out of it.
+
+        :param columns: The columns of the consumed items, or None if
+                        unknown.
+        """
+        if self.pipeline:
+            columns = self.pipeline.validate(columns)
+        for consumer in self.consumers:
+            consumer.validate(columns)
+        self.schema_validated = columns is not None
 
     def setup(self, item: Dict) -> None:
         pass
@@ -49,13 +86,75 @@ class HybridConsumer(Consumer):
         consumption phase. This allows for pre-processing steps like
         filtering, transformation, or aggregation to be applied.
 
+        In fan-out mode, every consumer consumes the whole stream in its own
+        thread, so that a slow consumer does not hold up the others beyond
+        the capacity of its queue.
+
         :param source: An iterable source of dictionaries representing the
                        data items to be consumed.
         """
         source = self.pipeline.run(source) if self.pipeline else source
+        if self.fan_out:
+            self._fan_out(source)
+            return
         for item in source:
+            items = (item,)
+            if isinstance(item, Barrier):
+                item.expect(len(self.consumers))
             for consumer in self.consumers:
-                consumer.consume([item])
+                consumer.consume(items)
+
+    @property
+    def queue_stats(self) -> List[Dict]:
+        """
+        Reports the state of the queue of every consumer in fan-out mode.
+
+        :return: For every consumer, its name, the current and maximum depth
+                 of its queue, and the numbers of dropped and spilled items.
+        """
+        return [
+            {
+                'consumer': consumer.__class__.__name__,
+                'depth': channel.depth,
+                'max_depth': channel.max_depth,
+                'dropped': channel.dropped,
+                'spilled': channel.spilled,
+            }
+            for consumer, channel in zip(self.consumers, self.channels)
+        ]
+
+    def _fan_out(self, source: Iterable[Dict]) -> None:
+        self.channels = [
+            Channel(self.queue_size, self.full_policy, self.spill_dir)
+            for _ in self.consumers
+        ]
+        errors = []
+        threads = [
+            threading.Thread(
+                target=consume_channel,
+                args=(consumer, channel, errors),
+                name=f'{self.__class__.__name__}:{index}',
+                daemon=True,
+            )
+            for index, (consumer, channel)
+            in enumerate(zip(self.consumers, self.channels))
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for item in source:
+                force = isinstance(item, (Start, Stop, Barrier))
+                if isinstance(item, Barrier):
+                    item.expect(len(self.channels))
+                for channel in self.channels:
+                    channel.put(item, force=force)
+        finally:
+            for channel in self.channels:
+                channel.close()
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
 
     def add_stage(
         self,
@@ -84,6 +183,7 @@ class HybridConsumer(Consumer):
                 logged_columns=logged_columns,
                 name=name,
             )
+        self.validate(None)
         return self
 
     def add_consumer(self, consumer: Consumer) -> 'HybridConsumer':
@@ -94,4 +194,5 @@ class HybridConsumer(Consumer):
         :return: The HybridConsumer instance to allow for chaining.
         """
         self.consumers.append(consumer)
+        self.validate(None)
         return self
@@ -1,23 +1,53 @@
 import logging
 from argparse import Namespace
+from typing import Dict, Optional
 
-from .consumer import Consumer
-from .pipeline import Pipeline
-from .producer import Producer
+from .checkpoint import Checkpoint
+from .metrics import Metrics
+from .plan import PlanBuilder
 
 
-class Job:
+class Job(PlanBuilder):
     """
     A class representing a complete job encompassing setup, execution,
     and teardown of a data processing task. This could involve setting up
     producers, consumers, and pipelines to process streamed data.
     """
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        instrument: bool = False,
+        log_interval: float = None,
+        checkpoint: Checkpoint = None,
+        reuse_plan: bool = False,
+        optimize: bool = False,
+    ) -> None:
         """
         Initializes the job, parsing any arguments and setting up required
         configurations.
+
+        :param instrument: Optional; if True, the stages and consumers are
+                           instrumented.
+        :param log_interval: Optional; if set, a summary of the metrics is
+                             logged every `log_interval` seconds.
+        :param checkpoint: Optional; the checkpoint of the position of the
+                           producer. The job resumes from it if the parsed
+                           arguments have a true `resume` attribute.
+        :param reuse_plan: Optional; if True, the graph of pipeline and
+                           consumer is built once per plan key, from the
+                           class and the `plan_options` arguments of the
+                           job, and reused by the next jobs, see
+                           PlanBuilder.get_plan.
+        :param optimize: Optional; if True, the pipeline is optimized when
+                         the plan is built, see optimizer.optimize.
         """
         self.args = self.parse_args()
+        self.metrics = (
+            Metrics(log_interval=log_interval) if instrument else None
+        )
+        self.checkpoint = checkpoint
+        self.resume = bool(getattr(self.args, 'resume', False))
+        self.reuse_plan = reuse_plan
+        self.optimize = optimize
 
     def parse_args(self) -> Namespace:
         """
@@ -27,18 +57,6 @@ class Job:
         """
         raise NotImplementedError
 
-    @property
-    def pipeline(self) -> Pipeline:
-        raise NotImplementedError
-
-    @property
-    def consumer(self) -> Consumer:
-        raise NotImplementedError
-
-    @property
-    def producer(self) -> Producer:
-        raise NotImplementedError
-
     def setup(self) -> None:
         """
         Sets up any required resources or initial state before beginning the
@@ -52,6 +70,19 @@ class Job:
         """
         pass
 
+    @property
+    def report(self) -> Optional[Dict]:
+        """
+        The structured report of the instrumentation metrics. It only
+        covers the run of this job, even when its plan is reused.
+
+        :return: The report, or None if the job is not instrumented.
+        """
+        return self.metrics.report() if self.metrics else None
+
+    def get_option(self, name: str) -> object:
+        return getattr(self.args, name, None)
+
     def main(self) -> None:
         """
         The main execution method for the job, which typically involves
@@ -61,11 +92,19 @@ class Job:
         try:
             logging.info('Start')
             self.setup()
-            self.consumer.consume(self.pipeline.run(self.producer.stream))
+            producer = self.get_producer()
+            plan = self.get_plan(producer.produced_columns)
+            if self.metrics:
+                self.metrics.start()
+            plan.run(producer)
+            if self.checkpoint:
+                self.checkpoint.remove()
         except Exception as ex:
             logging.warning('Failed')
             logging.exception(str(ex))
             raise SystemExit(1)
         finally:
+            if self.metrics:
+                self.metrics.stop()
             self.teardown()
             logging.info('Stop')
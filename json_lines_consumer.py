@@ -0,0 +1,52 @@
+import json
+from typing import Dict, List
+
+from .buffered_consumer import BufferedConsumer
+from .record import Record
+
+
+class JsonLinesConsumer(BufferedConsumer):
+    """
+    A sink writing items to a JSON Lines file, one buffer per write call.
+    Records are written as JSON objects.
+    """
+    def __init__(
+        self,
+        path: str,
+        mode: str = 'w',
+        encoding: str = 'utf-8',
+        **kwargs,
+    ) -> None:
+        """
+        Initializes the JsonLinesConsumer with the file to be written.
+
+        :param path: The path of the file.
+        :param mode: Optional; 'w' to overwrite the file, 'a' to append to
+                     it.
+        :param encoding: Optional; the encoding of the file.
+        :param kwargs: Additional keyword arguments, see BufferedConsumer.
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self.mode = mode
+        self.encoding = encoding
+        self.file = None
+        self._encode = json.JSONEncoder().encode
+
+    def setup(self, item: Dict) -> None:
+        self.file = open(self.path, self.mode, encoding=self.encoding)
+
+    def flush(self, batch: List[Dict]) -> None:
+        encode = self._encode
+        self.file.write(''.join([
+            encode(item.to_dict() if isinstance(item, Record) else item)
+            + '\n' for item in batch
+        ]))
+
+    def sync(self) -> None:
+        self.file.flush()
+
+    def teardown(self, item: Dict) -> None:
+        super().teardown(item)
+        self.file.close()
+        self.file = None
@@ -0,0 +1,18 @@
+import json
+from typing import Dict, List
+
+from .file_producer import FileProducer
+
+
+class JsonLinesProducer(FileProducer):
+    """
+    A producer reading a JSON Lines file, one JSON object per line. Every
+    chunk of lines is decoded with a single call to the JSON parser.
+    """
+    def parse_lines(self, lines: List[bytes]) -> List[Dict]:
+        try:
+            records = json.loads(b'[' + b','.join(lines) + b']')
+        except ValueError:
+            # Decode line by line to report the offending line.
+            records = [json.loads(line) for line in lines]
+        return self.filter_records(records)
@@ -0,0 +1,417 @@
+import inspect
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from .base_stage import BaseStage
+from .columnar import ColumnBatch
+from .common import Barrier, Batch, Start, Stop
+from .consumer import Consumer
+
+PHASES = ('setup', 'process', 'teardown')
+
+
+class LatencyHistogram:
+    """
+    A low-overhead histogram of durations with log-linear buckets: every
+    power of two is split into SUB_BUCKETS buckets, and percentiles are
+    reported as the middle of their bucket, which bounds their relative
+    error to 1 / (2 * SUB_BUCKETS) while keeping the memory constant.
+    Histograms can be merged.
+    """
+    SUB_BUCKETS = 16
+
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """
+        Records a duration.
+
+        :param value: The duration in seconds.
+        """
+        mantissa, exponent = math.frexp(max(value, 1e-9))
+        index = exponent * self.SUB_BUCKETS + int(
+            (mantissa - 0.5) * 2 * self.SUB_BUCKETS)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, percent: float) -> float:
+        """
+        Estimates a percentile of the recorded durations.
+
+        :param percent: The percentile, between 0 and 100.
+        :return: The middle of the bucket holding the percentile, or 0 if
+                 nothing has been recorded.
+        """
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                exponent, sub_bucket = divmod(index, self.SUB_BUCKETS)
+                middle = math.ldexp(
+                    0.5 + (sub_bucket + 0.5) / (2 * self.SUB_BUCKETS),
+                    exponent,
+                )
+                return min(middle, self.max)
+        return self.max
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        """
+        Adds the durations recorded by another histogram to this one.
+
+        :param other: The histogram to be merged.
+        """
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def report(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+
+class StageMetrics:
+    """
+    The metrics collected for a single stage or consumer: the numbers of
+    items in and out, the wall and CPU time spent in every phase, and the
+    latency of every processed item.
+    """
+    def __init__(self, name: str) -> None:
+        """
+        Initializes empty metrics.
+
+        :param name: The name of the stage or consumer.
+        """
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.wall_time = dict.fromkeys(PHASES, 0.0)
+        self.cpu_time = dict.fromkeys(PHASES, 0.0)
+        self.latency = LatencyHistogram()
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, wall_time: float, cpu_time: float) -> None:
+        """
+        Records the time spent in a phase for a single item.
+
+        :param phase: One of 'setup', 'process' and 'teardown'.
+        :param wall_time: The wall time spent, in seconds.
+        :param cpu_time: The CPU time spent by the thread, in seconds.
+        """
+        with self._lock:
+            self.wall_time[phase] += wall_time
+            self.cpu_time[phase] += cpu_time
+            if phase == 'process':
+                self.latency.record(wall_time)
+
+    def merge(self, other: 'StageMetrics') -> None:
+        """
+        Adds the metrics of another run of the same stage to these ones.
+
+        :param other: The metrics to be merged.
+        """
+        with self._lock:
+            self.items_in += other.items_in
+            self.items_out += other.items_out
+            for phase in PHASES:
+                self.wall_time[phase] += other.wall_time[phase]
+                self.cpu_time[phase] += other.cpu_time[phase]
+            self.latency.merge(other.latency)
+
+    def report(self) -> Dict:
+        return {
+            'items_in': self.items_in,
+            'items_out': self.items_out,
+            'wall_time': dict(self.wall_time),
+            'cpu_time': dict(self.cpu_time),
+            'latency': self.latency.report(),
+        }
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class Metrics:
+    """
+    An instrumentation layer measuring where time is spent in a graph of
+    stages and consumers. Instrumenting a graph wraps the run, setup,
+    process and teardown methods of its stages and the consume, setup,
+    process and teardown methods of its consumers on the instances
+    themselves, so that a graph which is not instrumented runs without any
+    overhead. Instrumenting a graph already instrumented by other metrics
+    replaces their wrappers, so that its items are only counted once, by
+    the latest metrics. Stages are keyed by their name and consumers by
+    their class name.
+    """
+    def __init__(self, log_interval: float = None) -> None:
+        """
+        Initializes empty metrics.
+
+        :param log_interval: Optional; if set, a summary of the metrics is
+                             logged every `log_interval` seconds while the
+                             metrics are started.
+        """
+        self.log_interval = log_interval
+        self.stages: Dict[str, StageMetrics] = {}
+        self.consumers: Dict[str, StageMetrics] = {}
+        self.wall_time = 0.0
+        self._instrumented = set()
+        self._started_at = None
+        self._stopped = None
+        self._logger = None
+
+    def instrument(self, target: object) -> object:
+        """
+        Instruments a stage, a pipeline, a consumer or a composite consumer,
+        along with all the stages and consumers it contains. Asynchronous
+        methods are left untouched.
+
+        :param target: The object to be instrumented.
+        :return: The same object, to allow for chaining.
+        """
+        if target is None or id(target) in self._instrumented:
+            return target
+        self._instrumented.add(id(target))
+        stages = getattr(target, 'stages', None)
+        if isinstance(target, BaseStage) and stages is not None:
+            for stage_info in stages:
+                self.instrument(stage_info.get('stage'))
+        elif isinstance(target, BaseStage):
+            self._instrument_stage(target)
+        elif isinstance(target, Consumer):
+            self.instrument(getattr(target, 'pipeline', None))
+            children = getattr(target, 'consumers', None)
+            if isinstance(children, dict):
+                children = children.values()
+            if children is not None:
+                for child in children:
+                    self.instrument(child)
+            else:
+                self._instrument_consumer(target)
+        return target
+
+    def start(self) -> None:
+        """
+        Starts measuring the overall wall time, and the periodic logging if
+        enabled.
+        """
+        self._started_at = time.perf_counter()
+        if self.log_interval:
+            self._stopped = threading.Event()
+            self._logger = threading.Thread(
+                target=self._log_periodically,
+                name='Metrics',
+                daemon=True,
+            )
+            self._logger.start()
+
+    def stop(self) -> None:
+        """
+        Stops measuring the overall wall time and the periodic logging.
+        """
+        if self._started_at is not None:
+            self.wall_time += time.perf_counter() - self._started_at
+            self._started_at = None
+        if self._logger:
+            self._stopped.set()
+            self._logger.join()
+            self._logger = self._stopped = None
+
+    def report(self) -> Dict:
+        """
+        Builds a structured report of the collected metrics.
+
+        :return: A dictionary with the overall wall time and, for every stage
+                 and consumer, its item counts, its wall and CPU time per
+                 phase and the percentiles of its per-item latency.
+        """
+        return {
+            'wall_time': self.wall_time,
+            'stages': {
+                name: metrics.report() for name, metrics in self.stages.items()
+            },
+            'consumers': {
+                name: metrics.report()
+                for name, metrics in self.consumers.items()
+            },
+        }
+
+    def merge(self, other: 'Metrics') -> None:
+        """
+        Adds the metrics collected by another instance, for instance in
+        another process, to these ones.
+
+        :param other: The metrics to be merged.
+        """
+        self.wall_time = max(self.wall_time, other.wall_time)
+        for registry, others in (
+            (self.stages, other.stages),
+            (self.consumers, other.consumers),
+        ):
+            for name, metrics in others.items():
+                registry.setdefault(name, StageMetrics(name)).merge(metrics)
+
+    def _register(
+        self,
+        registry: Dict[str, StageMetrics],
+        name: str,
+    ) -> StageMetrics:
+        key, index = name, 1
+        while key in registry:
+            index += 1
+            key = f'{name}#{index}'
+        registry[key] = StageMetrics(key)
+        return registry[key]
+
+    def _instrument_stage(self, stage: BaseStage) -> None:
+        metrics = self._register(self.stages, stage.name)
+        for phase in PHASES:
+            method = _unwrap(getattr(stage, phase))
+            if not inspect.isgeneratorfunction(method):
+                continue
+            setattr(stage, phase, _time_generator(metrics, phase, method))
+        run = _unwrap(stage.run)
+        if inspect.isgeneratorfunction(run):
+            stage.run = _count_run(metrics, run)
+
+    def _instrument_consumer(self, consumer: Consumer) -> None:
+        metrics = self._register(
+            self.consumers, consumer.__class__.__name__)
+        for phase in PHASES:
+            method = _unwrap(getattr(consumer, phase))
+            if inspect.iscoroutinefunction(method):
+                continue
+            setattr(consumer, phase, _time_call(metrics, phase, method))
+        consume = _unwrap(consumer.consume)
+        if not inspect.iscoroutinefunction(consume):
+            consumer.consume = _count_consume(metrics, consume)
+
+    def _log_periodically(self) -> None:
+        while not self._stopped.wait(self.log_interval):
+            for kind, registry in (
+                ('stage', self.stages),
+                ('consumer', self.consumers),
+            ):
+                for name, metrics in list(registry.items()):
+                    latency = metrics.latency
+                    logging.info(
+                        f'{kind} {name}: in={metrics.items_in} '
+                        f'out={metrics.items_out} '
+                        f'p50={latency.percentile(50):.6f}s '
+                        f'p95={latency.percentile(95):.6f}s '
+                        f'p99={latency.percentile(99):.6f}s'
+                    )
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state.update(_started_at=None, _stopped=None, _logger=None)
+        state['_instrumented'] = set()
+        return state
+
+
+def _count(item: Dict) -> int:
+    if isinstance(item, (Start, Stop, Barrier)):
+        return 0
+    if isinstance(item, ColumnBatch):
+        return item.num_rows
+    return len(item) if isinstance(item, Batch) else 1
+
+
+def _unwrap(method: Callable) -> Callable:
+    # The wrappers keep the method they wrap, see _wrapping.
+    return getattr(method, '_wrapped_method', method)
+
+
+def _wrapping(method: Callable, wrapper: Callable) -> Callable:
+    wrapper._wrapped_method = method
+    return wrapper
+
+
+def _time_generator(
+    metrics: StageMetrics,
+    phase: str,
+    method: Callable,
+) -> Callable:
+    def wrapper(item: Dict) -> Iterator:
+        wall_time = cpu_time = 0.0
+        outputs = iter(method(item))
+        while True:
+            wall_start, cpu_start = time.perf_counter(), time.thread_time()
+            try:
+                out_data = next(outputs)
+            except StopIteration:
+                break
+            finally:
+                wall_time += time.perf_counter() - wall_start
+                cpu_time += time.thread_time() - cpu_start
+            yield out_data
+        metrics.add(phase, wall_time, cpu_time)
+    return _wrapping(method, wrapper)
+
+
+def _time_call(
+    metrics: StageMetrics,
+    phase: str,
+    method: Callable,
+) -> Callable:
+    def wrapper(item: Dict) -> Optional[Iterator]:
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            return method(item)
+        finally:
+            metrics.add(
+                phase,
+                time.perf_counter() - wall_start,
+                time.thread_time() - cpu_start,
+            )
+    return _wrapping(method, wrapper)
+
+
+def _count_run(metrics: StageMetrics, run: Callable) -> Callable:
+    def counted(source: Iterable) -> Iterator:
+        for item in source:
+            metrics.items_in += _count(item)
+            yield item
+
+    def wrapper(source: Iterable = None, **kwargs) -> Iterator:
+        for item in run(counted(source or []), **kwargs):
+            metrics.items_out += _count(item)
+            yield item
+    return _wrapping(run, wrapper)
+
+
+def _count_consume(metrics: StageMetrics, consume: Callable) -> Callable:
+    def counted(source: Iterable) -> Iterator:
+        for item in source:
+            metrics.items_in += _count(item)
+            yield item
+
+    def wrapper(source: Iterable) -> None:
+        consume(counted(source))
+    return _wrapping(consume, wrapper)
@@ -1,21 +1,40 @@
-from typing import Callable, Dict, Iterable, List
+import threading
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Set
 
-from workflow.base_stage import BaseStage
-from workflow.consumer import Consumer
-from workflow.pipeline import Pipeline
+from .base_stage import BaseStage
+from .channel import BLOCK, Channel, consume_channel
+from .common import Barrier, Start, Stop
+from .consumer import Consumer
+from .pipeline import Pipeline
+from .routing import Router
+from .schema import check_columns
 
 
 class MultiPathConsumer(Consumer):
     """
     A Consumer capable of directing items to different consumers based on a
-    routing function. This allows for dynamic processing pathways within a
-    data processing workflow.
+    routing function or a declarative routing table. This allows for dynamic
+    processing pathways within a data processing workflow. Data items are
+    grouped into per-route batches before being dispatched, and the items
+    matching no route go to the default consumer, if any, or are counted as
+    unmatched. Start and Stop signals are broadcast to all consumers.
+
+    In stream mode, every consumer runs in its own thread and consumes a
+    single long-lived stream, fed through its own bounded queue, so that it
+    can keep resources such as open files across the whole run.
     """
     def __init__(
         self,
         consumers: Dict[bool | str, Consumer],
-        route: Callable,
-        pipeline: Pipeline = None
+        route: Callable = None,
+        pipeline: Pipeline = None,
+        router: Router = None,
+        default: Consumer = None,
+        batch_size: int = 1000,
+        stream: bool = False,
+        queue_size: int = 1000,
+        full_policy: str = BLOCK,
+        spill_dir: str = None,
     ) -> None:
         """
         Initializes the MultiPathConsumer with a set of consumers, a routing
@@ -27,10 +46,57 @@ class MultiPathConsumer(Consumer):
                       to direct the item to a consumer.
         :param pipeline: Optional; a Pipeline instance for pre-processing
                       items before routing.
+        :param router: Optional; a routing table used instead of the routing
+                       function, see routing.py.
+        :param default: Optional; the consumer of the items matching no
+                        route.
+        :param batch_size: Optional; the maximum number of data items routed
+                           before the per-route batches are dispatched.
+        :param stream: Optional; if True, every consumer runs in its own
+                       thread and consumes one continuous stream.
+        :param queue_size: Optional; the capacity of every queue in stream
+                           mode.
+        :param full_policy: Optional; what to do with an item when a queue
+                            is full in stream mode: 'block', 'drop' or
+                            'spill' to disk. Start and Stop signals are
+                            never dropped.
+        :param spill_dir: Optional; the directory of the spill files.
         """
+        if route is None and router is None:
+            raise ValueError('Either a route or a router is required.')
         self.consumers = consumers
         self.route = route
         self.pipeline = pipeline
+        self.router = router
+        self.default = default
+        self.batch_size = batch_size
+        self.stream = stream
+        self.queue_size = queue_size
+        self.full_policy = full_policy
+        self.spill_dir = spill_dir
+        self.unmatched_count = 0
+        self.channels: Dict[int, Channel] = {}
+        self.validate(None)
+
+    def validate(self, columns: Optional[Set[str]]) -> None:
+        """
+        Validates the internal pipeline, if any, and then every consumer
+        against the columns coming out of it.
+
+        :param columns: The columns of the consumed items, or None if
+                        unknown.
+        """
+        if self.pipeline:
+            columns = self.pipeline.validate(columns)
+        if self.router:
+            check_columns(
+                f'Consumer {self.__class__.__name__}',
+                self.router.columns,
+                columns,
+            )
+        for consumer in self.get_consumers():
+            consumer.validate(columns)
+        self.schema_validated = columns is not None
 
     def setup(self, item: Dict) -> None:
         pass
@@ -58,10 +124,139 @@ class MultiPathConsumer(Consumer):
                        data items to be consumed.
         """
         source = self.pipeline.run(source) if self.pipeline else source
+        route = self.router.route if self.router else self.route
+        if self.stream:
+            self._stream(source, route)
+            return
+        batch_size = self.batch_size or 1
+        batches: Dict[Hashable, List[Dict]] = {}
+        count = 0
         for item in source:
-            route_key = self.route(item)
-            if route_key in self.consumers:
-                self.consumers[route_key].consume([item])
+            if isinstance(item, (Start, Stop, Barrier)):
+                self.dispatch(batches)
+                batches, count = {}, 0
+                self.dispatch_signal(item)
+                continue
+            route_key = route(item)
+            batch = batches.get(route_key)
+            if batch is None:
+                batches[route_key] = [item]
+            else:
+                batch.append(item)
+            count += 1
+            if count >= batch_size:
+                self.dispatch(batches)
+                batches, count = {}, 0
+        self.dispatch(batches)
+
+    def dispatch(self, batches: Dict[Hashable, List[Dict]]) -> None:
+        """
+        Hands every batch over to the consumer of its route, or to the
+        default consumer if the route is unknown.
+
+        :param batches: The batches of data items, by route key.
+        """
+        for route_key, batch in batches.items():
+            consumer = self.consumers.get(route_key, self.default)
+            if consumer is None:
+                self.unmatched_count += len(batch)
+            else:
+                consumer.consume(batch)
+
+    def dispatch_signal(self, item: Dict) -> None:
+        """
+        Broadcasts a Start, Stop or Barrier signal to all the consumers,
+        once each.
+
+        :param item: The signal.
+        """
+        items = (item,)
+        consumers = self.get_consumers()
+        if isinstance(item, Barrier):
+            item.expect(len(consumers))
+        for consumer in consumers:
+            consumer.consume(items)
+
+    @property
+    def queue_stats(self) -> List[Dict]:
+        """
+        Reports the state of the queue of every consumer in stream mode.
+
+        :return: For every consumer, its name, the current and maximum depth
+                 of its queue, and the numbers of dropped and spilled items.
+        """
+        return [
+            {
+                'consumer': consumer.__class__.__name__,
+                'depth': self.channels[id(consumer)].depth,
+                'max_depth': self.channels[id(consumer)].max_depth,
+                'dropped': self.channels[id(consumer)].dropped,
+                'spilled': self.channels[id(consumer)].spilled,
+            }
+            for consumer in self.get_consumers()
+            if id(consumer) in self.channels
+        ]
+
+    def _stream(self, source: Iterable[Dict], route: Callable) -> None:
+        consumers = self.get_consumers()
+        self.channels = {
+            id(consumer): Channel(
+                self.queue_size, self.full_policy, self.spill_dir)
+            for consumer in consumers
+        }
+        channels = {
+            route_key: self.channels[id(consumer)]
+            for route_key, consumer in self.consumers.items()
+        }
+        default = (
+            self.channels[id(self.default)] if self.default is not None
+            else None
+        )
+        errors = []
+        threads = [
+            threading.Thread(
+                target=consume_channel,
+                args=(consumer, self.channels[id(consumer)], errors),
+                name=f'{self.__class__.__name__}:{index}',
+                daemon=True,
+            )
+            for index, consumer in enumerate(consumers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for item in source:
+                if isinstance(item, (Start, Stop, Barrier)):
+                    if isinstance(item, Barrier):
+                        item.expect(len(self.channels))
+                    for channel in self.channels.values():
+                        channel.put(item, force=True)
+                    continue
+                channel = channels.get(route(item), default)
+                if channel is None:
+                    self.unmatched_count += 1
+                else:
+                    channel.put(item)
+        finally:
+            for channel in self.channels.values():
+                channel.close()
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+
+    def get_consumers(self) -> List[Consumer]:
+        """
+        Lists the distinct consumers, including the default consumer.
+
+        :return: A list of Consumer instances.
+        """
+        consumers = {
+            id(consumer): consumer
+            for consumer in [*self.consumers.values(), self.default]
+            if consumer is not None
+        }
+        return list(consumers.values())
 
     def add_stage(
         self,
@@ -90,6 +285,7 @@ class MultiPathConsumer(Consumer):
                 logged_columns=logged_columns,
                 name=name,
             )
+        self.validate(None)
         return self
 
     def add_consumer(
@@ -108,4 +304,5 @@ class MultiPathConsumer(Consumer):
         :return: The MultiPathConsumer instance to allow for chaining.
         """
         self.consumers[route_key] = consumer
+        self.validate(None)
         return self
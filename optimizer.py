@@ -0,0 +1,216 @@
+import copy
+from typing import Dict, List, Optional, Set, Tuple
+
+from .base_stage import BaseStage
+from .filter import Filter
+from .pipeline import Pipeline
+from .predicates import Predicate
+
+
+def optimize(pipeline: Pipeline) -> Pipeline:
+    """
+    Rewrites a pipeline into an equivalent one with fewer stages, so that
+    every item goes through fewer generator hops and dictionary copies:
+    nested pipelines are flattened, Filter predicates are pushed down as
+    early as their columns allow, pass-through Filter stages are removed,
+    and Filter stages whose projection is subsumed by the input projection
+    of the next stage are fused into it. The stages themselves are shared
+    with the original pipeline, which is left untouched, except for the
+    Filter stages both projecting and filtering, which are split.
+
+    :param pipeline: The pipeline to be optimized.
+    :return: A copy of the pipeline with the optimized list of stages.
+    """
+    stages = fuse_filters(drop_pass_through(
+        push_down_filters(flatten(pipeline.stages))))
+    if not stages:
+        # A pipeline keeps at least one stage.
+        stages = [pipeline.stages[0]]
+    optimized = copy.copy(pipeline)
+    optimized.stages = stages
+    return optimized
+
+
+def flatten(
+    stages: List[Dict],
+    logged_columns: List[str] = None,
+) -> List[Dict]:
+    """
+    Inlines the stages of nested pipelines. The logged columns of a nested
+    pipeline are logged by every one of its stages, see Pipeline.run.
+    Subclasses of Pipeline, such as ThreadedPipeline, run their stages in
+    their own way and are kept as they are.
+
+    :param stages: The stage infos of a pipeline.
+    :param logged_columns: Optional; the logged columns of the enclosing
+                           pipeline stage.
+    :return: The flat list of stage infos.
+    """
+    flat = []
+    for stage_info in stages:
+        stage_logged_columns = _merge(
+            stage_info.get('logged_columns'), logged_columns)
+        stage = stage_info.get('stage')
+        if type(stage) is Pipeline:
+            flat.extend(flatten(stage.stages, stage_logged_columns))
+        else:
+            flat.append(
+                {**stage_info, 'logged_columns': stage_logged_columns})
+    return flat
+
+
+def push_down_filters(stages: List[Dict]) -> List[Dict]:
+    """
+    Moves the predicates of the Filter stages before the previous stages,
+    as long as the columns they depend on come out of these stages with
+    their input values: stages which log them, or Filter stages keeping
+    them. Only stateless stages are crossed, as a stateful stage, such as
+    an aggregation, would see other items. A Filter stage with both a
+    predicate and output columns is split into a predicate-only Filter,
+    which moves, and a projection-only Filter, which stays.
+
+    :param stages: The stage infos of a pipeline.
+    :return: The reordered stage infos.
+    """
+    pushed = []
+    for stage_info in stages:
+        stage = stage_info['stage']
+        if type(stage) is not Filter or stage.where is None:
+            pushed.append(stage_info)
+            continue
+        position = len(pushed)
+        if stage.output_columns or stage_info.get('logged_columns'):
+            projection = copy.copy(stage)
+            projection.where = None
+            pushed.append({**stage_info, 'stage': projection})
+            stage_info = {
+                'stage': Filter(name=stage.name, where=stage.where),
+                'logged_columns': [],
+            }
+        columns = set(stage.where.columns)
+        while position and _keeps_columns(pushed[position - 1], columns):
+            position -= 1
+        pushed.insert(position, stage_info)
+    return pushed
+
+
+def split_source_filter(
+    pipeline: Pipeline,
+) -> Tuple[Optional[Predicate], Pipeline]:
+    """
+    Takes the predicates of the Filter stages at the start of a pipeline
+    out of it, so that they can be evaluated by the producer, see
+    Producer.where, before the rejected rows are turned into items. The
+    first stage is kept if it is the only one.
+
+    :param pipeline: The pipeline, usually optimized.
+    :return: The combined predicate, or None, and a copy of the pipeline
+             without the leading predicate-only Filter stages.
+    """
+    stages = list(pipeline.stages)
+    predicate = None
+    while len(stages) > 1 and _is_predicate(stages[0]):
+        where = stages.pop(0)['stage'].where
+        predicate = where if predicate is None else predicate & where
+    if predicate is None:
+        return None, pipeline
+    remaining = copy.copy(pipeline)
+    remaining.stages = stages
+    return predicate, remaining
+
+
+def drop_pass_through(stages: List[Dict]) -> List[Dict]:
+    """
+    Removes the Filter stages which do not project any column, as they
+    only copy every item, unless they log columns which the previous stage
+    does not log, and which may be missing from the items.
+
+    :param stages: The stage infos of a pipeline.
+    :return: The remaining stage infos.
+    """
+    kept = []
+    for stage_info in stages:
+        logged_columns = set(stage_info.get('logged_columns') or ())
+        if (
+            _is_filter(stage_info['stage'])
+            and not stage_info['stage'].output_columns
+            and (not logged_columns or kept and logged_columns <= set(
+                kept[-1].get('logged_columns') or ()))
+        ):
+            continue
+        kept.append(stage_info)
+    return kept
+
+
+def fuse_filters(stages: List[Dict]) -> List[Dict]:
+    """
+    Removes the Filter stages followed by a stage which only reads a subset
+    of their output columns: the input projection of the next stage
+    selects the same columns, so that the Filter only adds a copy. The
+    logged columns of the next stage must be among the columns coming out
+    of the Filter, which the fused stage then reads before the projection.
+
+    :param stages: The stage infos of a pipeline.
+    :return: The remaining stage infos.
+    """
+    fused = []
+    for index, stage_info in enumerate(stages):
+        stage = stage_info['stage']
+        if _is_filter(stage) and index + 1 < len(stages):
+            columns = set(stage.output_columns) | set(
+                stage_info.get('logged_columns') or ())
+            next_info = stages[index + 1]
+            read_columns = _get_read_columns(next_info['stage'])
+            if (
+                stage.output_columns
+                and read_columns
+                and set(read_columns) <= columns
+                and set(next_info.get('logged_columns') or ()) <= columns
+            ):
+                continue
+        fused.append(stage_info)
+    return fused
+
+
+def _is_filter(stage: BaseStage) -> bool:
+    # Subclasses of Filter may process items in their own way.
+    return type(stage) is Filter and stage.where is None
+
+
+def _is_predicate(stage_info: Dict) -> bool:
+    stage = stage_info['stage']
+    return (
+        type(stage) is Filter
+        and stage.where is not None
+        and not stage.output_columns
+        and not stage_info.get('logged_columns')
+    )
+
+
+def _keeps_columns(stage_info: Dict, columns: Set[str]) -> bool:
+    # Tells whether the columns come out of the stage with their input
+    # values, so that a predicate on them can run before the stage.
+    stage = stage_info['stage']
+    if isinstance(stage, Pipeline) or not stage.stateless:
+        return False
+    if columns <= set(stage_info.get('logged_columns') or ()):
+        return True
+    return type(stage) is Filter and (
+        not stage.output_columns or columns <= set(stage.output_columns))
+
+
+def _get_read_columns(stage: BaseStage) -> Optional[List[str]]:
+    if _is_filter(stage):
+        return stage.output_columns
+    if isinstance(stage, Pipeline):
+        return None
+    return stage.input_columns
+
+
+def _merge(
+    columns: Optional[List[str]],
+    others: Optional[List[str]],
+) -> List[str]:
+    if not others:
+        return list(columns or [])
+    return list(dict.fromkeys([*(columns or []), *others]))
@@ -0,0 +1,128 @@
+from collections import deque
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                wait)
+from typing import Dict, Iterable, Iterator, List
+
+from .base_stage import compile_projection
+from .common import Barrier, Start, Stop
+from .stage import Stage
+
+
+class ParallelStage(Stage):
+    """
+    A processing stage that runs process on a bounded thread pool. It suits
+    stages spending most of their time waiting on I/O, such as database or
+    HTTP calls, by keeping several items in flight at once. The process
+    method must therefore be thread-safe.
+    """
+    def __init__(
+        self,
+        name: str = None,
+        workers: int = 4,
+        max_in_flight: int = None,
+        ordered: bool = True,
+        no_copy: bool = False,
+        records: bool = False,
+    ) -> None:
+        """
+        Initializes the ParallelStage with the size of its thread pool and
+        of its in-flight window.
+
+        :param name: Optional; the name of the stage.
+        :param workers: Optional; the number of worker threads.
+        :param max_in_flight: Optional; the maximum number of items being
+                              processed or waiting to be emitted. Defaults to
+                              twice the number of workers.
+        :param ordered: Optional; if True, processed items are emitted in
+                        the order of their input items, otherwise as soon as
+                        they complete.
+        :param no_copy: Optional; if True, output items are passed through
+                        without being copied when neither output columns
+                        nor logged columns are configured.
+        :param records: Optional; if True, the declared input and output
+                        columns are projected into compact Record objects
+                        instead of dictionaries, see record.Record.
+        """
+        super().__init__(name, no_copy=no_copy, records=records)
+        self.workers = workers
+        self.max_in_flight = max_in_flight or 2 * workers
+        self.ordered = ordered
+
+    def run(self, source: Iterable = None, **kwargs) -> Iterator:
+        """
+        Executes the stage, dispatching every data item to the thread pool.
+        The setup runs before any item is dispatched, and the teardown runs
+        only after all in-flight items have been drained. The logged data
+        of every input item travels with its future, so it stays attached
+        to the right output items whatever the completion order.
+
+        :param source: An iterable of source data items for processing.
+        :param kwargs: Additional keyword arguments, including the logged
+                       columns.
+        :return: An iterator over all processed data items.
+        """
+        source = source or []
+        get_logged = compile_projection(
+            kwargs.get('logged_columns'), missing_ok=True)
+        pending = deque() if self.ordered else {}
+        executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix=self.name,
+        )
+        try:
+            for in_data in source:
+                logged = get_logged(in_data) if get_logged else None
+                if isinstance(in_data, Start):
+                    yield from self._drain(pending, 0)
+                    self.compile_projections()
+                    for out_data in self.setup(in_data):
+                        yield self.get_output_item(
+                            out_data, logged_data=logged)
+                elif isinstance(in_data, Stop):
+                    yield from self._drain(pending, 0)
+                    for out_data in self.teardown(in_data):
+                        yield self.get_output_item(
+                            out_data, logged_data=logged)
+                elif isinstance(in_data, Barrier):
+                    yield from self._drain(pending, 0)
+                    if self.stateless:
+                        yield in_data
+                else:
+                    future = executor.submit(
+                        self._process, self.get_input_item(in_data))
+                    if self.ordered:
+                        pending.append((future, logged))
+                    else:
+                        pending[future] = logged
+                    yield from self._drain(pending, self.max_in_flight - 1)
+            yield from self._drain(pending, 0)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _process(self, item: Dict) -> List[Dict]:
+        return list(self.process(item))
+
+    def _drain(self, pending, limit: int) -> Iterator:
+        """
+        Emits completed items and waits until no more than `limit` items
+        remain in flight.
+        """
+        if self.ordered:
+            while pending and (len(pending) > limit or pending[0][0].done()):
+                future, logged = pending.popleft()
+                yield from self._get_outputs(future, logged)
+        else:
+            while pending:
+                done, _ = wait(
+                    pending,
+                    timeout=None if len(pending) > limit else 0,
+                    return_when=FIRST_COMPLETED,
+                )
+                if not done:
+                    break
+                for future in done:
+                    yield from self._get_outputs(future, pending.pop(future))
+
+    def _get_outputs(self, future: Future, logged: Dict) -> Iterator:
+        for out_data in future.result():
+            yield self.get_output_item(out_data, logged_data=logged)
@@ -0,0 +1,248 @@
+import threading
+from operator import itemgetter
+from typing import (
+    Callable, Dict, Iterable, Iterator, List, Optional, Set, Union,
+)
+
+from .base_stage import BaseStage
+from .channel import Channel
+from .common import Barrier, Start, Stop
+from .schema import check_columns
+from .stage import Stage
+
+
+class _Failure:
+    """
+    Carries an exception raised in a lane or feeder thread to the reader.
+    """
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class PartitionedStage(Stage):
+    """
+    A stage running several instances of a stateful stage in parallel
+    lanes, one thread and one stage instance per lane. Items are
+    hash-partitioned on a key, so that all the items of a key go through
+    the same lane, in order, and the outputs of the lanes are merged back
+    into a single stream. Start and Stop signals are broadcast to every
+    lane, so that every instance runs its own setup and teardown, and are
+    emitted downstream once. Barrier signals are broadcast too, and only
+    complete once every lane has forwarded them. The number of items sent
+    to every lane is kept in lane_stats, to detect hot keys.
+    """
+    def __init__(
+        self,
+        stage: Callable[[], BaseStage],
+        key: Union[str, List[str]],
+        lanes: int = 4,
+        queue_size: int = 1000,
+        name: str = None,
+    ) -> None:
+        """
+        Initializes the PartitionedStage with the factory of its lane
+        stages.
+
+        :param stage: A function building a new instance of the stage, such
+                      as its class.
+        :param key: The column, or columns, the items are partitioned on.
+        :param lanes: Optional; the number of lanes.
+        :param queue_size: Optional; the capacity of the channel feeding
+                           every lane, and of the channel merging their
+                           outputs.
+        :param name: Optional; the name of the stage.
+        """
+        self.lane_stages = [stage() for _ in range(lanes)]
+        super().__init__(name or f'Partitioned:{self.lane_stages[0].name}')
+        self.key = [key] if isinstance(key, str) else list(key)
+        self.queue_size = queue_size
+        self.lane_counts = [0] * lanes
+        self._channels: List[Channel] = []
+
+    @property
+    def input_columns(self) -> List[str]:
+        return self.lane_stages[0].input_columns
+
+    @property
+    def output_columns(self) -> List[str]:
+        return self.lane_stages[0].output_columns
+
+    @property
+    def stateless(self) -> bool:
+        return self.lane_stages[0].stateless
+
+    @property
+    def aggregating(self) -> bool:
+        return self.lane_stages[0].aggregating
+
+    @property
+    def lane_stats(self) -> List[Dict[str, int]]:
+        """
+        Reports the number of items sent to every lane, and the maximum
+        number of items which waited in its channel.
+
+        :return: A list of statistics, one per lane.
+        """
+        return [
+            {
+                'items': count,
+                'max_depth': channel.max_depth if channel else 0,
+            }
+            for count, channel in zip(
+                self.lane_counts,
+                self._channels or [None] * len(self.lane_counts),
+            )
+        ]
+
+    @property
+    def skew(self) -> float:
+        """
+        The ratio of the number of items of the busiest lane to the mean
+        number of items per lane: 1.0 when the keys are evenly spread, and
+        up to the number of lanes when a single hot key takes them all.
+
+        :return: The skew, or 0.0 if no item has been partitioned.
+        """
+        total = sum(self.lane_counts)
+        if not total:
+            return 0.0
+        return max(self.lane_counts) * len(self.lane_counts) / total
+
+    def validate(self, columns: Optional[Set[str]]) -> Optional[Set[str]]:
+        check_columns(f'Stage {self.name}', self.key, columns)
+        return self.lane_stages[0].validate(columns)
+
+    def get_lane(self) -> Callable[[Dict], int]:
+        """
+        Compiles the function mapping an item to its lane.
+
+        :return: The partitioning function.
+        """
+        lanes = len(self.lane_stages)
+        get_key = itemgetter(*self.key)
+        return lambda item: hash(get_key(item)) % lanes
+
+    def run(self, source: Iterable = None, **kwargs) -> Iterator:
+        """
+        Starts one thread per lane and one thread partitioning the source,
+        and yields the merged outputs of the lanes. Stopping the iteration
+        early stops all the threads.
+
+        :param source: An iterable of source data items for processing.
+        :param kwargs: Additional keyword arguments, passed to the run
+                       method of every lane stage.
+        :return: An iterator over all processed data items, in input order
+                 within every key.
+        """
+        lanes = len(self.lane_stages)
+        self.lane_counts = [0] * lanes
+        self._channels = [Channel(self.queue_size) for _ in range(lanes)]
+        output = Channel(self.queue_size)
+        state = {'stops': 0, 'done': False, 'condition': threading.Condition()}
+        threads = [
+            threading.Thread(
+                target=self._run_lane,
+                args=(stage, channel, output, state, kwargs),
+                name=f'{self.name}:{index}',
+                daemon=True,
+            )
+            for index, (stage, channel)
+            in enumerate(zip(self.lane_stages, self._channels))
+        ]
+        for thread in threads:
+            thread.start()
+        threading.Thread(
+            target=self._feed,
+            args=(source or [], output, state, threads),
+            name=f'{self.name}:source',
+            daemon=True,
+        ).start()
+        try:
+            for out_data in output:
+                if isinstance(out_data, _Failure):
+                    raise out_data.error
+                yield out_data
+        finally:
+            self._release(state)
+            output.cancel()
+            for channel in self._channels:
+                channel.cancel()
+                channel.close()
+
+    def _feed(
+        self,
+        source: Iterable,
+        output: Channel,
+        state: Dict,
+        threads: List[threading.Thread],
+    ) -> None:
+        """
+        Partitions the source into the lanes. Signals are broadcast, and a
+        Stop is emitted downstream once every lane has run its teardown.
+        """
+        channels, counts = self._channels, self.lane_counts
+        lanes = len(channels)
+        condition = state['condition']
+        try:
+            get_lane = self.get_lane()
+            for in_data in source:
+                if isinstance(in_data, (Start, Stop, Barrier)):
+                    if isinstance(in_data, Start):
+                        output.put(in_data)
+                    elif isinstance(in_data, Barrier):
+                        if not self.stateless:
+                            continue
+                        in_data.expect(lanes)
+                    else:
+                        with condition:
+                            state['stops'] = 0
+                    for channel in channels:
+                        channel.put(in_data)
+                    if isinstance(in_data, Stop):
+                        with condition:
+                            condition.wait_for(
+                                lambda: state['stops'] >= lanes
+                                or state['done']
+                            )
+                        output.put(in_data)
+                    continue
+                lane = get_lane(in_data)
+                counts[lane] += 1
+                channels[lane].put(in_data)
+        except Exception as ex:
+            output.put(_Failure(ex))
+        finally:
+            for channel in channels:
+                channel.close()
+            for thread in threads:
+                thread.join()
+            output.close()
+
+    def _run_lane(
+        self,
+        stage: BaseStage,
+        channel: Channel,
+        output: Channel,
+        state: Dict,
+        kwargs: Dict,
+    ) -> None:
+        condition = state['condition']
+        try:
+            for out_data in stage.run(iter(channel), **kwargs):
+                if isinstance(out_data, Stop):
+                    with condition:
+                        state['stops'] += 1
+                        condition.notify_all()
+                elif not isinstance(out_data, Start):
+                    output.put(out_data)
+        except Exception as ex:
+            output.put(_Failure(ex))
+            channel.cancel()
+            self._release(state)
+
+    @staticmethod
+    def _release(state: Dict) -> None:
+        # Releases the feeder if it waits for a lane which will never stop.
+        with state['condition']:
+            state['done'] = True
+            state['condition'].notify_all()
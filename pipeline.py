@@ -1,6 +1,7 @@
-from typing import Dict, Iterable, Iterator, List
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from .base_stage import BaseStage
+from .schema import validate_stages
 
 
 class Pipeline(BaseStage):
@@ -30,6 +31,29 @@ class Pipeline(BaseStage):
             'logged_columns': logged_columns or [],
         }]
 
+    @property
+    def batch_size(self) -> Optional[int]:
+        return self.stages[0]['stage'].batch_size
+
+    @property
+    def columnar(self) -> bool:
+        return self.stages[0]['stage'].columnar
+
+    @property
+    def stateless(self) -> bool:
+        return all(
+            stage_info['stage'].stateless for stage_info in self.stages)
+
+    def validate(self, columns: Optional[Set[str]]) -> Optional[Set[str]]:
+        """
+        Validates the stages of the pipeline in sequence, see
+        BaseStage.validate.
+
+        :param columns: The columns of the input items, or None if unknown.
+        :return: The columns of the output items, or None if unknown.
+        """
+        return validate_stages(self.stages, columns)
+
     def setup(self, item: Dict) -> Iterator:
         pass
 
@@ -40,15 +64,62 @@ class Pipeline(BaseStage):
         pass
 
     def run(self, source: Iterable = None, **kwargs) -> Iterator:
+        """
+        Chains the stages of the pipeline. Batch-capable stages followed by
+        another batch-capable stage hand their output over as batches, and
+        stages followed by a vectorized stage as ColumnBatch objects if they
+        are vectorized, while any other stage receives the items one by one.
+        Vectorized stages convert items to columns and back where they meet
+        other stages.
+
+        :param source: An iterable of source data items for processing.
+        :param kwargs: Additional keyword arguments. `logged_columns` lists
+                       the columns carried over from input to output items
+                       when the pipeline is nested in another one, and are
+                       logged by every stage. `emit_batches` requests
+                       the last stage to yield batches if it is
+                       batch-capable, and `emit_columns` to yield ColumnBatch
+                       objects if it is vectorized.
+        :return: An iterator over all processed data items.
+        """
         source = source or []
-        for stage_info in self.stages:
-            stage = stage_info.get('stage')
-            if not isinstance(stage, BaseStage):
-                continue
-            logged_columns = stage_info.get('logged_columns') or []
-            source = stage.run(source, logged_columns=logged_columns)
+        for stage_info, run_kwargs in self.get_stage_runs(**kwargs):
+            source = stage_info['stage'].run(source, **run_kwargs)
         yield from source
 
+    def get_stage_runs(self, **kwargs) -> List[Tuple[Dict, Dict]]:
+        """
+        Lists the stages of the pipeline along with the keyword arguments
+        their run method is called with.
+
+        :param kwargs: The keyword arguments the pipeline is run with.
+        :return: A list of (stage info, run keyword arguments) pairs.
+        """
+        stages = [
+            stage_info for stage_info in self.stages
+            if isinstance(stage_info.get('stage'), BaseStage)
+        ]
+        outer_logged_columns = kwargs.get('logged_columns') or []
+        stage_runs = []
+        for index, stage_info in enumerate(stages):
+            if index + 1 < len(stages):
+                next_stage = stages[index + 1]['stage']
+                emit_batches = bool(next_stage.batch_size)
+                emit_columns = next_stage.columnar
+            else:
+                emit_batches = kwargs.get('emit_batches') or False
+                emit_columns = kwargs.get('emit_columns') or False
+            logged_columns = stage_info.get('logged_columns') or []
+            if outer_logged_columns:
+                logged_columns = list(dict.fromkeys(
+                    [*logged_columns, *outer_logged_columns]))
+            stage_runs.append((stage_info, {
+                'logged_columns': logged_columns,
+                'emit_batches': emit_batches,
+                'emit_columns': emit_columns,
+            }))
+        return stage_runs
+
     def add_stage(
         self,
         stage: BaseStage,
@@ -57,13 +128,17 @@ class Pipeline(BaseStage):
     ) -> 'Pipeline':
         """
         Adds a new stage to the pipeline for processing items in sequence.
+        The input columns of the stage are checked against the columns
+        produced by the previous stages, when they are declared. The stage
+        may itself be a pipeline, whose stages then carry the logged columns
+        of the stage over, see run.
 
         :param stage: The stage to be added.
         :param logged_columns: Optional columns to be logged by this stage.
         :param name: Optional name for the stage.
         :return: The pipeline instance to allow for method chaining.
         """
-        # TODO: Doesn't work if isinstace(stage, Pipeline). Correct this!!!
+        stage.validate(self.validate(None))
         name = name or stage.name
         self.name = f'{self.name}:{name}'
         self.stages.append({
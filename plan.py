@@ -0,0 +1,251 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Optional, Sequence
+
+from .checkpoint import Checkpoint
+from .consumer import Consumer
+from .metrics import Metrics
+from .optimizer import optimize as optimize_pipeline, split_source_filter
+from .pipeline import Pipeline
+from .producer import Producer
+from .schema import check_columns
+
+# The maximum number of cached plans, the least recently used plan being
+# evicted first.
+MAX_PLANS = 32
+
+_plans: 'OrderedDict[Hashable, ExecutionPlan]' = OrderedDict()
+_plans_lock = threading.Lock()
+
+
+class ExecutionPlan:
+    """
+    A graph of pipeline and consumer built once, validated and frozen, so
+    that it can run over many producers without being built again: the
+    stage and consumer constructors, such as model loading or connection
+    setup, only run once. Every run goes through its own Start and Stop
+    signals. The graph is validated again only when a producer declares
+    other columns than the previous one. A plan runs one producer at a
+    time, and an instrumented plan accumulates its metrics over its runs.
+    An optimized plan hands the predicates of its leading Filter stages
+    over to the producers, see Producer.where.
+    """
+    __slots__ = (
+        'pipeline', 'consumer', 'metrics', 'predicate', '_columns', '_lock',
+    )
+
+    def __init__(
+        self,
+        pipeline: Pipeline,
+        consumer: Consumer,
+        columns: Iterable[str] = None,
+        metrics: Metrics = None,
+        optimize: bool = False,
+    ) -> None:
+        """
+        Initializes the ExecutionPlan, validating and instrumenting the
+        graph.
+
+        :param pipeline: The pipeline of the graph.
+        :param consumer: The consumer of the graph.
+        :param columns: Optional; the columns declared by the producers the
+                        plan is built for.
+        :param metrics: Optional; the metrics instrumenting the graph.
+        :param optimize: Optional; if True, the pipeline is replaced with an
+                         optimized copy, see optimizer.optimize, and its
+                         leading predicates are pushed down to the
+                         producers, see optimizer.split_source_filter.
+        :raises SchemaError: If the graph is wired inconsistently.
+        """
+        predicate = None
+        if optimize:
+            predicate, pipeline = split_source_filter(
+                optimize_pipeline(pipeline))
+        object.__setattr__(self, 'pipeline', pipeline)
+        object.__setattr__(self, 'predicate', predicate)
+        object.__setattr__(self, 'consumer', consumer)
+        object.__setattr__(self, 'metrics', metrics)
+        object.__setattr__(self, '_lock', threading.Lock())
+        self._validate(columns)
+        if metrics:
+            metrics.instrument(pipeline)
+            metrics.instrument(consumer)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError('An ExecutionPlan is immutable.')
+
+    def run(self, producer: Producer) -> None:
+        """
+        Streams the items of a producer through the pipeline into the
+        consumer.
+
+        :param producer: The producer to be streamed.
+        :raises RuntimeError: If the plan is already running.
+        :raises SchemaError: If the producer does not declare the columns
+                             required by the graph.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError('The ExecutionPlan is already running.')
+        try:
+            columns = producer.produced_columns
+            if (set(columns) if columns else None) != self._columns:
+                self._validate(columns)
+            if self.predicate is not None:
+                producer = producer.where(self.predicate)
+            self.consumer.consume(self.pipeline.run(producer.stream))
+        finally:
+            self._lock.release()
+
+    def _validate(self, columns: Optional[Iterable[str]]) -> None:
+        if self.predicate is not None:
+            check_columns(
+                'Producer predicate', self.predicate.columns,
+                set(columns) if columns else None,
+            )
+        self.consumer.validate(self.pipeline.validate(columns))
+        object.__setattr__(
+            self, '_columns', set(columns) if columns else None)
+
+
+def get_plan(
+    key: Hashable,
+    build: Callable[[], ExecutionPlan],
+) -> ExecutionPlan:
+    """
+    Gets a cached plan, building it on first use. The cache holds at most
+    MAX_PLANS plans, and evicts the least recently used one.
+
+    :param key: The key of the plan in the cache.
+    :param build: The function building the plan.
+    :return: The plan.
+    """
+    with _plans_lock:
+        plan = _plans.get(key)
+        if plan is None:
+            plan = _plans[key] = build()
+            while len(_plans) > MAX_PLANS:
+                _plans.popitem(last=False)
+        else:
+            _plans.move_to_end(key)
+        return plan
+
+
+def clear_plans() -> None:
+    """
+    Empties the cache of plans, so that the next runs build new graphs.
+    """
+    with _plans_lock:
+        _plans.clear()
+
+
+class PlanBuilder:
+    """
+    The building of the execution plan shared by Task and Job. Subclasses
+    provide the producer, pipeline and consumer properties, and the
+    metrics, checkpoint, resume, reuse_plan and optimize attributes.
+    """
+    metrics: Optional[Metrics] = None
+    checkpoint: Optional[Checkpoint] = None
+    resume = False
+    reuse_plan = False
+    optimize = False
+    # The configuration parameters the pipeline and consumer depend on,
+    # see get_plan_key.
+    plan_options: Sequence[str] = ()
+
+    @property
+    def pipeline(self) -> Pipeline:
+        raise NotImplementedError
+
+    @property
+    def consumer(self) -> Consumer:
+        raise NotImplementedError
+
+    @property
+    def producer(self) -> Producer:
+        raise NotImplementedError
+
+    def get_producer(self, producer: Producer = None) -> Producer:
+        """
+        Gets the producer, sought to the last checkpoint when resuming and
+        tracked by the checkpoint if enabled.
+
+        :param producer: Optional; the producer to be used instead of the
+                         producer of the task, such as one of its shards.
+        :return: The producer to be streamed.
+        """
+        producer = self.producer if producer is None else producer
+        if not self.checkpoint:
+            return producer
+        if self.resume:
+            offset = self.checkpoint.load()
+            if offset is not None:
+                name = getattr(self, 'name', None) or type(self).__name__
+                logging.info(f'{name} resumes from {offset}')
+                producer.seek(offset)
+        return self.checkpoint.track(producer)
+
+    def get_plan_key(self) -> Hashable:
+        """
+        Identifies the graph built by the task, for plans to be shared by
+        the tasks building the same graph. It defaults to the class of the
+        task and the values of its `plan_options`, the configuration
+        parameters the pipeline and consumer are built from, while the
+        other parameters, such as the input file, vary from run to run.
+
+        :return: A hashable key.
+        """
+        return self.__class__, repr([
+            (name, self.get_option(name)) for name in self.plan_options])
+
+    def get_option(self, name: str) -> object:
+        """
+        Gets a configuration parameter of the task. This method must be
+        implemented by subclasses.
+
+        :param name: The name of the parameter.
+        :return: The value of the parameter, or None if it is not set.
+        """
+        raise NotImplementedError
+
+    def build_plan(
+        self,
+        columns: Iterable[str] = None,
+        metrics: Metrics = None,
+    ) -> ExecutionPlan:
+        """
+        Builds a new execution plan from the pipeline and consumer.
+
+        :param columns: Optional; the columns declared by the producer.
+        :param metrics: Optional; the metrics instrumenting the plan.
+        :return: The validated, and possibly instrumented, plan.
+        """
+        return ExecutionPlan(
+            self.pipeline,
+            self.consumer,
+            columns,
+            metrics=metrics,
+            optimize=self.optimize,
+        )
+
+    def get_plan(self, columns: Iterable[str] = None) -> ExecutionPlan:
+        """
+        Builds the execution plan from the pipeline and consumer, or gets
+        the cached one if `reuse_plan` is set, see get_plan_key. A reused
+        plan is instrumented again with the metrics of the task, so that
+        every task reports its own run, see metrics.Metrics.instrument.
+
+        :param columns: Optional; the columns declared by the producer.
+        :return: The validated, and possibly instrumented, plan.
+        """
+        if not self.reuse_plan:
+            return self.build_plan(columns, self.metrics)
+        plan = get_plan(
+            (self.get_plan_key(), bool(self.metrics), self.optimize),
+            lambda: self.build_plan(columns, self.metrics),
+        )
+        if self.metrics and plan.metrics is not self.metrics:
+            self.metrics.instrument(plan.pipeline)
+            self.metrics.instrument(plan.consumer)
+        return plan
@@ -0,0 +1,374 @@
+import operator
+from itertools import repeat
+from typing import Any, Callable, Dict, Iterable, List, Sequence
+
+COMPARISONS = ('==', '!=', '<', '<=', '>', '>=')
+
+OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'is': operator.is_,
+    'is not': operator.is_not,
+}
+
+Getters = Dict[str, Callable[[Any], Any]]
+
+
+class Predicate:
+    """
+    A base class for declarative row predicates, built from columns with
+    col, such as `(col('age') >= 18) & col('country').isin({'FR', 'BE'})`.
+    Predicates are combined with `&`, `|` and `~`, and compiled once into a
+    function evaluating a row, a whole ColumnBatch, or a positional row
+    such as a parsed CSV line. As in SQL, ordering comparisons with a None
+    value are False. Compiled functions are cached on the predicate, which
+    stays picklable.
+    """
+    def __and__(self, other: 'Predicate') -> 'Predicate':
+        return And(self, other)
+
+    def __or__(self, other: 'Predicate') -> 'Predicate':
+        return Or(self, other)
+
+    def __invert__(self) -> 'Predicate':
+        return Not(self)
+
+    def __bool__(self) -> bool:
+        raise TypeError('Predicates are combined with &, | and ~.')
+
+    @property
+    def columns(self) -> List[str]:
+        """
+        Lists the columns the predicate depends on.
+
+        :return: The column names, in order of appearance.
+        """
+        return list(dict.fromkeys(self.get_columns()))
+
+    def get_columns(self) -> Iterable[str]:
+        """
+        Iterates over the columns the predicate depends on. This method must
+        be implemented by subclasses.
+
+        :return: An iterator over column names, possibly repeated.
+        """
+        raise NotImplementedError
+
+    def build(self, getters: Getters) -> Callable[[Any], bool]:
+        """
+        Builds the function evaluating the predicate. This method must be
+        implemented by subclasses.
+
+        :param getters: The functions reading the value of every column
+                        from a row.
+        :return: The function returning whether a row matches.
+        """
+        raise NotImplementedError
+
+    def compile(self) -> Callable[[Dict], bool]:
+        """
+        Compiles the predicate into a function evaluating a row, such as a
+        dictionary or a Record.
+
+        :return: The function returning whether a row matches.
+        """
+        return self._compile('row', None)
+
+    def compile_columns(self) -> Callable[[Dict[str, Sequence]], List[bool]]:
+        """
+        Compiles the predicate into a function evaluating all the rows of a
+        ColumnBatch at once, column by column, without building any row.
+
+        :return: The function returning the mask of the matching rows.
+        """
+        return self._compile('columns', None)
+
+    def compile_positions(
+        self,
+        columns: Sequence[str],
+    ) -> Callable[[Sequence], bool]:
+        """
+        Compiles the predicate into a function evaluating a row given as a
+        sequence of values, before it is turned into a dictionary. Values
+        missing at the end of a row are None.
+
+        :param columns: The names of the values of the rows, in order.
+        :return: The function returning whether a row matches.
+        """
+        return self._compile('positions', tuple(columns))
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state.pop('_compiled', None)
+        return state
+
+    def _compile(self, mode: str, positions: tuple) -> Callable:
+        compiled = self.__dict__.setdefault('_compiled', {})
+        function = compiled.get((mode, positions))
+        if function is not None:
+            return function
+        columns = self.columns
+        if mode == 'row':
+            function = self.build({
+                column: operator.methodcaller('get', column)
+                for column in columns
+            })
+        elif mode == 'positions':
+            function = self.build({
+                column: _get_position(positions, column)
+                for column in columns
+            })
+        elif not columns:
+            def function(data: Any) -> List[bool]:
+                return [True] * data.num_rows
+        else:
+            # The rows are the tuples of the zipped columns.
+            evaluate = self.build({
+                column: operator.itemgetter(index)
+                for index, column in enumerate(columns)
+            })
+
+            def function(data: Any) -> List[bool]:
+                return list(map(evaluate, zip(*[
+                    data[column] if column in data
+                    else repeat(None, data.num_rows)
+                    for column in columns
+                ])))
+        compiled[(mode, positions)] = function
+        return function
+
+
+def _get_position(
+    positions: Sequence[str],
+    column: str,
+) -> Callable[[Sequence], Any]:
+    if column not in positions:
+        return lambda data: None
+    index = positions.index(column)
+
+    def get(data: Sequence) -> Any:
+        return data[index] if index < len(data) else None
+    return get
+
+
+class Column:
+    """
+    A column reference, the building block of predicates, see col.
+    """
+    __hash__ = None
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __eq__(self, value: object) -> 'Predicate':
+        return Comparison(self, '==', value)
+
+    def __ne__(self, value: object) -> 'Predicate':
+        return Comparison(self, '!=', value)
+
+    def __lt__(self, value: object) -> 'Predicate':
+        return Comparison(self, '<', value)
+
+    def __le__(self, value: object) -> 'Predicate':
+        return Comparison(self, '<=', value)
+
+    def __gt__(self, value: object) -> 'Predicate':
+        return Comparison(self, '>', value)
+
+    def __ge__(self, value: object) -> 'Predicate':
+        return Comparison(self, '>=', value)
+
+    def isin(self, values: Iterable) -> 'Predicate':
+        """
+        Builds the predicate checking that the column is one of the values.
+
+        :param values: The accepted values, which must be hashable.
+        :return: The predicate.
+        """
+        return Membership(self, values)
+
+    def is_null(self) -> 'Predicate':
+        """
+        Builds the predicate checking that the column is None or missing.
+
+        :return: The predicate.
+        """
+        return Comparison(self, 'is', None)
+
+    def not_null(self) -> 'Predicate':
+        """
+        Builds the predicate checking that the column holds a value.
+
+        :return: The predicate.
+        """
+        return Comparison(self, 'is not', None)
+
+    def __repr__(self) -> str:
+        return f'col({self.name!r})'
+
+
+def col(name: str) -> Column:
+    """
+    References a column in a predicate.
+
+    :param name: The name of the column.
+    :return: The column reference.
+    """
+    return Column(name)
+
+
+class Comparison(Predicate):
+    """
+    Compares a column with a constant, or with another column.
+    """
+    def __init__(self, column: Column, operator: str, value: object) -> None:
+        if operator not in (*COMPARISONS, 'is', 'is not'):
+            raise ValueError(f'Invalid operator {operator}.')
+        self.column = column
+        self.operator = operator
+        self.value = value
+
+    def get_columns(self) -> Iterable[str]:
+        yield self.column.name
+        if isinstance(self.value, Column):
+            yield self.value.name
+
+    def build(self, getters: Getters) -> Callable[[Any], bool]:
+        compare = OPERATORS[self.operator]
+        get = getters[self.column.name]
+        ordering = self.operator not in ('==', '!=', 'is', 'is not')
+        if isinstance(self.value, Column):
+            get_other = getters[self.value.name]
+            if not ordering:
+                return lambda data: compare(get(data), get_other(data))
+
+            def evaluate(data: Any) -> bool:
+                left = get(data)
+                if left is None:
+                    return False
+                right = get_other(data)
+                return right is not None and compare(left, right)
+            return evaluate
+        value = self.value
+        if not ordering:
+            return lambda data: compare(get(data), value)
+
+        def evaluate(data: Any) -> bool:
+            left = get(data)
+            return left is not None and compare(left, value)
+        return evaluate
+
+    def __repr__(self) -> str:
+        return f'({self.column!r} {self.operator} {self.value!r})'
+
+
+class Membership(Predicate):
+    """
+    Checks that a column is one of a set of values.
+    """
+    def __init__(self, column: Column, values: Iterable) -> None:
+        self.column = column
+        self.values = frozenset(values)
+
+    def get_columns(self) -> Iterable[str]:
+        yield self.column.name
+
+    def build(self, getters: Getters) -> Callable[[Any], bool]:
+        get, values = getters[self.column.name], self.values
+        return lambda data: get(data) in values
+
+    def __repr__(self) -> str:
+        return f'{self.column!r}.isin({set(self.values)!r})'
+
+
+class Junction(Predicate):
+    """
+    A base class for the predicates combining several predicates with a
+    boolean operator.
+    """
+    operator = None
+
+    def __init__(self, *predicates: Predicate) -> None:
+        # Nested predicates of the same kind are flattened.
+        self.predicates = []
+        for predicate in predicates:
+            if type(predicate) is type(self):
+                self.predicates.extend(predicate.predicates)
+            else:
+                self.predicates.append(predicate)
+
+    def get_columns(self) -> Iterable[str]:
+        for predicate in self.predicates:
+            yield from predicate.get_columns()
+
+    def build(self, getters: Getters) -> Callable[[Any], bool]:
+        predicates = tuple(
+            predicate.build(getters) for predicate in self.predicates)
+        if len(predicates) == 1:
+            return predicates[0]
+        return self.combine(predicates)
+
+    def combine(
+        self,
+        predicates: Sequence[Callable[[Any], bool]],
+    ) -> Callable[[Any], bool]:
+        """
+        Combines the functions evaluating the predicates. This method must
+        be implemented by subclasses.
+
+        :param predicates: The functions evaluating the predicates.
+        :return: The function evaluating the junction, short-circuiting.
+        """
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return '({})'.format(f' {self.operator} '.join(
+            map(repr, self.predicates)))
+
+
+class And(Junction):
+    """
+    Matches the rows matching all of its predicates.
+    """
+    operator = 'and'
+
+    def combine(
+        self,
+        predicates: Sequence[Callable[[Any], bool]],
+    ) -> Callable[[Any], bool]:
+        return lambda data: all(predicate(data) for predicate in predicates)
+
+
+class Or(Junction):
+    """
+    Matches the rows matching any of its predicates.
+    """
+    operator = 'or'
+
+    def combine(
+        self,
+        predicates: Sequence[Callable[[Any], bool]],
+    ) -> Callable[[Any], bool]:
+        return lambda data: any(predicate(data) for predicate in predicates)
+
+
+class Not(Predicate):
+    """
+    Matches the rows not matching its predicate.
+    """
+    def __init__(self, predicate: Predicate) -> None:
+        self.predicate = predicate
+
+    def get_columns(self) -> Iterable[str]:
+        return self.predicate.get_columns()
+
+    def build(self, getters: Getters) -> Callable[[Any], bool]:
+        evaluate = self.predicate.build(getters)
+        return lambda data: not evaluate(data)
+
+    def __repr__(self) -> str:
+        return f'~{self.predicate!r}'
@@ -0,0 +1,220 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.util import Finalize
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .base_stage import BaseStage, compile_projection
+from .common import Barrier, Start, Stop
+from .stage import Stage
+
+_worker_stage = None
+_worker_errors = None
+
+
+def _init_worker(stage: BaseStage, start: Start, errors) -> None:
+    """
+    Initializes a worker process with its own copy of the wrapped stage and
+    runs the setup of the stage once for the whole life of the worker, with
+    the Start signal of the run. The teardown is registered to run when the
+    worker process exits.
+    """
+    global _worker_stage, _worker_errors
+    _worker_stage = stage
+    _worker_errors = errors
+    stage.compile_projections()
+    _check_signals(stage.setup(start), 'setup')
+    Finalize(None, _teardown_worker, exitpriority=10)
+
+
+def _teardown_worker() -> None:
+    _check_signals(_worker_stage.teardown(Stop()), 'teardown')
+
+
+def _check_signals(outputs: Iterable, phase: str) -> None:
+    # The items emitted by the setup or teardown of a worker cannot be
+    # forwarded, and are reported to the parent process instead.
+    for out_data in outputs:
+        if not isinstance(out_data, (Start, Stop, Barrier)):
+            _worker_errors.put(
+                f'{_worker_stage.name} emits items in its {phase}, which '
+                f'is not supported in a process pool.')
+            return
+
+
+def _process_chunk(chunk: List[Dict]) -> List[List[Dict]]:
+    """
+    Processes a chunk of projected input items in a worker process.
+
+    :return: For every input item, the list of its projected output items.
+    """
+    stage = _worker_stage
+    return [
+        [stage.get_output_item(out_data) for out_data in stage.process(item)]
+        for item in chunk
+    ]
+
+
+class ProcessPoolStage(Stage):
+    """
+    A wrapper running a CPU-bound stage on a pool of worker processes to
+    work around the GIL. Projected input items are shipped to the workers
+    in chunks, and the logged data of every item is kept in the parent
+    process and re-attached to the results, so that it never crosses the
+    process boundary. The wrapped stage must be picklable. Its setup and
+    teardown run once per worker process, the setup with the Start signal
+    of the run and the teardown with an empty Stop signal when the worker
+    exits, and they must not emit items: a stage emitting items in its
+    setup or teardown, such as a final summary, fails with a ValueError
+    when the Stop signal arrives.
+    """
+    def __init__(
+        self,
+        stage: Stage,
+        workers: int = None,
+        chunk_size: int = 100,
+        max_in_flight: int = None,
+        name: str = None,
+        mp_context=None,
+    ) -> None:
+        """
+        Initializes the ProcessPoolStage with the stage to be wrapped and
+        the configuration of the process pool.
+
+        :param stage: The stage whose process method runs in the workers.
+        :param workers: Optional; the number of worker processes. Defaults
+                        to the number of processors.
+        :param chunk_size: Optional; the number of items sent to a worker at
+                           once.
+        :param max_in_flight: Optional; the maximum number of chunks being
+                              processed or waiting to be emitted. Defaults to
+                              twice the number of workers.
+        :param name: Optional; the name of the stage.
+        :param mp_context: Optional; the multiprocessing context used to
+                           start the workers.
+        """
+        super().__init__(name or f'ProcessPool:{stage.name}')
+        self.stage = stage
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.max_in_flight = max_in_flight
+        self.mp_context = mp_context
+
+    @property
+    def input_columns(self) -> List[str]:
+        return self.stage.input_columns
+
+    @property
+    def stateless(self) -> bool:
+        return self.stage.stateless
+
+    def validate(self, columns: Optional[Set[str]]) -> Optional[Set[str]]:
+        return self.stage.validate(columns)
+
+    def get_executor(
+        self,
+        start: Start,
+        errors,
+    ) -> ProcessPoolExecutor:
+        """
+        Creates a process pool whose workers each set up their own copy of
+        the wrapped stage.
+
+        :param start: The Start signal the workers are set up with.
+        :param errors: The queue the workers report their errors to.
+        :return: The process pool executor.
+        """
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self.mp_context,
+            initializer=_init_worker,
+            initargs=(self.stage, start, errors),
+        )
+
+    def run(self, source: Iterable = None, **kwargs) -> Iterator:
+        """
+        Executes the wrapped stage on the process pool. The setup and the
+        teardown of the wrapped stage run once per worker process, while the
+        Start and Stop signals are forwarded downstream as they are. The
+        workers are started when Start arrives, and shut down, and thus
+        torn down, when Stop arrives.
+
+        :param source: An iterable of source data items for processing.
+        :param kwargs: Additional keyword arguments, including the logged
+                       columns.
+        :return: An iterator over all processed data items, in input order.
+        :raises ValueError: If the wrapped stage emits items in its setup or
+                            teardown.
+        """
+        source = source or []
+        get_logged = compile_projection(
+            kwargs.get('logged_columns'), missing_ok=True)
+        errors = (self.mp_context or multiprocessing).SimpleQueue()
+        executor = None
+        pending = deque()
+        chunk, chunk_logged = [], []
+        try:
+            for in_data in source:
+                logged = get_logged(in_data) if get_logged else None
+                if isinstance(in_data, (Start, Stop, Barrier)):
+                    if chunk:
+                        pending.append(self._submit(
+                            executor, chunk, chunk_logged))
+                        chunk, chunk_logged = [], []
+                    yield from self._drain(pending, 0)
+                    if isinstance(in_data, Start):
+                        self.compile_projections()
+                        if executor is not None:
+                            executor.shutdown(wait=True)
+                        executor = self.get_executor(in_data, errors)
+                    elif isinstance(in_data, Stop):
+                        if executor is not None:
+                            executor.shutdown(wait=True)
+                            executor = None
+                        if not errors.empty():
+                            raise ValueError(errors.get())
+                    elif not self.stateless:
+                        continue
+                    yield in_data
+                    continue
+                if executor is None:
+                    executor = self.get_executor(Start(), errors)
+                chunk.append(self.get_input_item(in_data))
+                chunk_logged.append(logged)
+                if len(chunk) >= self.chunk_size:
+                    pending.append(self._submit(
+                        executor, chunk, chunk_logged))
+                    chunk, chunk_logged = [], []
+                    yield from self._drain(pending, self._max_in_flight())
+            if chunk:
+                pending.append(self._submit(executor, chunk, chunk_logged))
+            yield from self._drain(pending, 0)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+            errors.close()
+
+    @staticmethod
+    def _submit(
+        executor: ProcessPoolExecutor,
+        chunk: List[Dict],
+        chunk_logged: List[Dict],
+    ) -> Tuple[Future, List[Dict]]:
+        return executor.submit(_process_chunk, chunk), chunk_logged
+
+    def _max_in_flight(self) -> int:
+        return self.max_in_flight or 2 * (self.workers or os.cpu_count() or 1)
+
+    def _drain(self, pending: deque, limit: int) -> Iterator:
+        while pending and (len(pending) > limit or pending[0][0].done()):
+            future, chunk_logged = pending.popleft()
+            yield from self._get_outputs(future, chunk_logged)
+
+    @staticmethod
+    def _get_outputs(future: Future, chunk_logged: List[Dict]) -> Iterator:
+        for outputs, logged in zip(future.result(), chunk_logged):
+            for out_data in outputs:
+                if logged:
+                    out_data.update(logged)
+                yield out_data
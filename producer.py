@@ -1,6 +1,8 @@
-from typing import Dict, Iterator
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 from .common import Start, Stop
+from .predicates import Predicate
 
 
 class Producer:
@@ -9,6 +11,70 @@ class Producer:
     This class allows for the generation of a stream of items, including
     initiation and termination signals.
     """
+    @property
+    def produced_columns(self) -> Optional[List[str]]:
+        """
+        Declares the columns of the produced items, so that the stages and
+        consumers downstream can be validated before any data flows.
+
+        :return: List of produced column names, or None if unknown.
+        """
+        return None
+
+    @property
+    def offset(self) -> Any:
+        """
+        The position of the producer after its last produced item, which can
+        be persisted, as JSON, and passed to seek to resume a run.
+
+        :return: The position, or None if the producer cannot resume.
+        """
+        return None
+
+    def seek(self, offset: Any) -> None:
+        """
+        Positions the producer, before its stream starts, right after the
+        item at which its offset was taken. This method must be implemented
+        by subclasses supporting resumable runs.
+
+        :param offset: A position previously reported by offset.
+        """
+        raise NotImplementedError
+
+    def shards(
+        self,
+        count: int,
+        key: Union[str, List[str]] = None,
+    ) -> List['Producer']:
+        """
+        Splits the stream of the producer into disjoint shards, to be
+        produced in separate processes. By default, every shard reads the
+        whole stream and keeps either every count-th item, or the items
+        whose key columns hash to the shard. Subclasses may override it
+        with a cheaper split, such as byte ranges of a file.
+
+        :param count: The number of shards.
+        :param key: Optional; the column, or columns, the items are
+                    hash-partitioned on, so that equal keys land in the same
+                    shard.
+        :return: A list of producers, one per shard.
+        """
+        return [
+            ShardProducer(self, count, index, key) for index in range(count)
+        ]
+
+    def where(self, predicate: Predicate) -> 'Producer':
+        """
+        Restricts the stream of the producer to the items matching a
+        predicate, see predicates.Predicate. By default, the items are
+        filtered as they are produced. Subclasses may override it to drop
+        the rows before they are turned into items, see FileProducer.
+
+        :param predicate: The predicate the items must match.
+        :return: A producer of the matching items.
+        """
+        return FilteredProducer(self, predicate)
+
     @property
     def stream(
         self,
@@ -31,3 +97,79 @@ class Producer:
         :return: An iterator generating the stream data items.
         """
         raise NotImplementedError
+
+
+class ShardProducer(Producer):
+    """
+    A shard of the stream of another producer, keeping either every
+    count-th item or the items whose key columns hash to the shard. The
+    hash is a CRC32 of the representation of the key values, which is
+    stable across processes.
+    """
+    def __init__(
+        self,
+        producer: Producer,
+        count: int,
+        index: int,
+        key: Union[str, List[str]] = None,
+    ) -> None:
+        """
+        Initializes the ShardProducer with the producer to be split.
+
+        :param producer: The producer to be split.
+        :param count: The number of shards.
+        :param index: The index of this shard.
+        :param key: Optional; the column, or columns, to hash-partition on.
+                    If not given, the items are dealt round-robin.
+        """
+        self.producer = producer
+        self.count = count
+        self.index = index
+        self.key = [key] if isinstance(key, str) else key
+
+    @property
+    def produced_columns(self) -> Optional[List[str]]:
+        return self.producer.produced_columns
+
+    def to_stream(self) -> Iterator[Dict]:
+        count, index = self.count, self.index
+        if not self.key:
+            for position, item in enumerate(self.producer.to_stream()):
+                if position % count == index:
+                    yield item
+            return
+        columns = self.key
+        for item in self.producer.to_stream():
+            key = repr(tuple(item.get(column) for column in columns))
+            if zlib.crc32(key.encode()) % count == index:
+                yield item
+
+
+class FilteredProducer(Producer):
+    """
+    The items of another producer matching a predicate. Its offset is the
+    offset of the other producer.
+    """
+    def __init__(self, producer: Producer, predicate: Predicate) -> None:
+        """
+        Initializes the FilteredProducer with the producer to be filtered.
+
+        :param producer: The producer to be filtered.
+        :param predicate: The predicate the items must match.
+        """
+        self.producer = producer
+        self.predicate = predicate
+
+    @property
+    def produced_columns(self) -> Optional[List[str]]:
+        return self.producer.produced_columns
+
+    @property
+    def offset(self) -> Any:
+        return self.producer.offset
+
+    def seek(self, offset: Any) -> None:
+        self.producer.seek(offset)
+
+    def to_stream(self) -> Iterator[Dict]:
+        return filter(self.predicate.compile(), self.producer.to_stream())
@@ -0,0 +1,192 @@
+from functools import lru_cache
+from operator import itemgetter
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, KeysView, Mapping, Tuple,
+)
+
+
+class Record(tuple):
+    """
+    A compact, immutable data item with a fixed schema: the values are
+    stored in a tuple, while the column names and their positions are
+    shared by every record of the same type, see record_type. A record can
+    be used wherever a read-only dictionary is expected, so that
+    `item['col']`, `item.get('col')`, `item.keys()` and `{**item}` keep
+    working, and it takes a fraction of the memory of a dictionary with the
+    same columns. Records are created by stages configured with
+    `records=True`, or from dictionaries with from_dict.
+    """
+    __slots__ = ()
+    columns: Tuple[str, ...] = ()
+    _index: Dict[str, int] = {}
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> 'Record':
+        """
+        Builds a record of this type from a dictionary.
+
+        :param data: A dictionary holding at least the columns of the type.
+        :return: The record.
+        """
+        return tuple.__new__(cls, [data[column] for column in cls.columns])
+
+    def __getitem__(self, key: str) -> Any:
+        return tuple.__getitem__(self, self._index[key])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.columns)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __ne__(self, other: object) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'Record({self.to_dict()!r})'
+
+    def __reduce__(self) -> Tuple:
+        return _rebuild, (self.columns, tuple(self.values()))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        index = self._index.get(key)
+        if index is None:
+            return default
+        return tuple.__getitem__(self, index)
+
+    def keys(self) -> KeysView:
+        return self._index.keys()
+
+    def values(self) -> Iterator:
+        return tuple.__iter__(self)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return zip(self.columns, tuple.__iter__(self))
+
+    def to_dict(self) -> Dict:
+        """
+        Converts the record into a dictionary.
+
+        :return: A new dictionary with the columns of the record.
+        """
+        return dict(zip(self.columns, tuple.__iter__(self)))
+
+    def project(self, columns: Iterable[str]) -> 'Record':
+        """
+        Projects the record on some of its columns. The positions of the
+        columns are resolved once per pair of record types.
+
+        :param columns: The column names to be kept.
+        :return: A record of the projected type, sharing the values.
+        """
+        return _get_projector(type(self), tuple(columns))(self)
+
+    def extend(self, data: Mapping) -> 'Record':
+        """
+        Adds columns to the record, or replaces the values of existing ones.
+
+        :param data: The columns to be added.
+        :return: A record of the extended type.
+        """
+        if not data:
+            return self
+        if not self._index.keys().isdisjoint(data):
+            merged = {**self.to_dict(), **data}
+            return tuple.__new__(record_type(merged), merged.values())
+        return tuple.__new__(
+            _get_extended_type(type(self), tuple(data)),
+            (*tuple.__iter__(self), *data.values()),
+        )
+
+
+Mapping.register(Record)
+
+
+def record_type(columns: Iterable[str]) -> type:
+    """
+    Gets the record type of a schema. Types are generated once per schema
+    and shared afterwards.
+
+    :param columns: The column names, in order.
+    :return: A subclass of Record for these columns.
+    """
+    return _record_type(tuple(columns))
+
+
+def compile_record_projection(columns: Iterable[str]) -> Callable:
+    """
+    Compiles a column projection into a function building a record from a
+    dictionary or a record, with a single tuple display. Records are
+    projected by position, with a projection compiled once per record type.
+
+    :param columns: The column names to be projected.
+    :return: The projection function.
+    """
+    columns = tuple(columns)
+    new, cls = tuple.__new__, record_type(columns)
+    getter = _get_values_getter(columns)
+
+    def project_dict(data: Mapping) -> Record:
+        return new(cls, getter(data))
+    projections = {dict: project_dict}
+
+    def project(data: Mapping) -> Record:
+        projection = projections.get(type(data))
+        if projection is None:
+            if isinstance(data, Record):
+                projection = _get_projector(type(data), columns)
+            else:
+                projection = project_dict
+            projections[type(data)] = projection
+        return projection(data)
+    return project
+
+
+@lru_cache(maxsize=None)
+def _record_type(columns: Tuple[str, ...]) -> type:
+    return type('Record', (Record,), {
+        '__slots__': (),
+        'columns': columns,
+        '_index': {column: index for index, column in enumerate(columns)},
+    })
+
+
+def _get_values_getter(keys: Tuple) -> Callable[[Any], Tuple]:
+    # itemgetter returns a single value, rather than a tuple, for one key.
+    if not keys:
+        return lambda data: ()
+    if len(keys) == 1:
+        key, = keys
+        return lambda data: (data[key],)
+    return itemgetter(*keys)
+
+
+@lru_cache(maxsize=None)
+def _get_projector(source: type, columns: Tuple[str, ...]) -> Callable:
+    # Records are read by position, through the __getitem__ of tuple, since
+    # the one of Record looks the column names up.
+    new, cls = tuple.__new__, record_type(columns)
+    getter = _get_values_getter(
+        tuple(source._index[column] for column in columns))
+    values = tuple.__iter__
+
+    def project(record: Record) -> Record:
+        return new(cls, getter(tuple(values(record))))
+    return project
+
+
+@lru_cache(maxsize=None)
+def _get_extended_type(source: type, columns: Tuple[str, ...]) -> type:
+    return record_type(source.columns + columns)
+
+
+def _rebuild(columns: Tuple[str, ...], values: Tuple) -> Record:
+    return tuple.__new__(record_type(columns), values)
@@ -0,0 +1,240 @@
+import struct
+from collections.abc import Mapping
+from operator import itemgetter
+from typing import Callable, Dict, Iterator, Sequence, Tuple, Union
+
+_CODES = {int: 'q', float: 'd', bool: '?'}
+_LENGTH = struct.Struct('<H')
+
+Field = Union[Tuple[str, type], Tuple[str, type, int]]
+
+
+class RecordCodec:
+    """
+    Encodes items of a fixed schema into fixed-size binary records, and
+    decodes them, with a single struct call per record. A schema lists
+    the fields as (name, type) tuples, the type being int (64-bit), float
+    (64-bit) or bool, or as (name, type, size) tuples for str (UTF-8) and
+    bytes values of at most size bytes. A record starts with a bitmap of
+    its None values, so that every field may be None, which is also the
+    value of missing columns, and the lengths of the str and bytes values
+    follow the last field.
+    """
+    def __init__(self, fields: Sequence[Field]) -> None:
+        """
+        Initializes the RecordCodec with its schema.
+
+        :param fields: The fields of the records, in order.
+        :raises ValueError: If the schema is empty, or a field type is not
+                            supported.
+        """
+        if not fields:
+            raise ValueError('A schema must have fields.')
+        self.fields = [tuple(field) for field in fields]
+        self.names = [field[0] for field in self.fields]
+        bitmap_size = (len(self.fields) + 7) // 8
+        codes = [f'{bitmap_size}s']
+        # The str and bytes fields are packed as padded bytes, and their
+        # lengths are packed after the last field.
+        texts = []
+        for index, field in enumerate(self.fields):
+            if field[1] in _CODES:
+                codes.append(_CODES[field[1]])
+            elif field[1] in (str, bytes) and len(field) == 3:
+                codes.append(f'{int(field[2])}s')
+                texts.append((index, int(field[2]), field[1] is str))
+            else:
+                raise ValueError(f'Invalid field {field}.')
+        self._struct = struct.Struct(
+            '<' + ''.join(codes) + 'H' * len(texts))
+        self.size = self._struct.size
+        self._bitmap_size = bitmap_size
+        self._texts = tuple(texts)
+        # A getter reads the value of a field, or the length of its bytes,
+        # along with the position of the bytes of str and bytes fields.
+        self._getters = {}
+        lengths = struct.calcsize('<' + ''.join(codes))
+        for index, field in enumerate(self.fields):
+            position = struct.calcsize('<' + ''.join(codes[:index + 1]))
+            if field[1] in _CODES:
+                getter = (
+                    struct.Struct('<' + codes[index + 1]).unpack_from,
+                    position, None, None,
+                )
+            else:
+                getter = (
+                    _LENGTH.unpack_from, lengths, field[1], position)
+                lengths += _LENGTH.size
+            self._getters[field[0]] = (index >> 3, 1 << (index & 7), *getter)
+        self._zero = bytes(bitmap_size)
+        self._zeros = tuple(
+            {str: '', bytes: b''}.get(field[1], 0) for field in self.fields)
+        self._get_values = (
+            itemgetter(*self.names) if len(self.names) > 1
+            else _get_single(self.names[0])
+        )
+
+    def __reduce__(self) -> Tuple:
+        # struct.Struct objects cannot be pickled, so that a codec is
+        # rebuilt from its schema.
+        return RecordCodec, (self.fields,)
+
+    def encode(self, item: Dict) -> bytes:
+        """
+        Encodes an item into a new record.
+
+        :param item: The item, such as a dictionary or a Record.
+        :return: The record.
+        """
+        buffer = bytearray(self.size)
+        self.encode_into(buffer, 0, item)
+        return bytes(buffer)
+
+    def encode_into(self, buffer, offset: int, item: Dict) -> None:
+        """
+        Encodes an item in place, into a writable buffer such as a
+        bytearray, an mmap or a shared memory block.
+
+        :param buffer: The buffer.
+        :param offset: The position of the record in the buffer.
+        :param item: The item, such as a dictionary or a Record.
+        :raises ValueError: If a value exceeds the size of its field.
+        """
+        try:
+            values = self._get_values(item)
+        except KeyError:
+            values = tuple(map(item.get, self.names))
+        nulls = self._zero
+        if None in values:
+            nulls, values = _replace_nulls(
+                values, self._zeros, self._bitmap_size)
+        if not self._texts:
+            self._struct.pack_into(buffer, offset, nulls, *values)
+            return
+        values = list(values)
+        lengths = []
+        for index, size, text in self._texts:
+            value = values[index]
+            if text:
+                value = values[index] = value.encode()
+            length = len(value)
+            if length > size:
+                raise ValueError(
+                    f'The value of {self.names[index]} exceeds {size} '
+                    f'bytes.')
+            lengths.append(length)
+        self._struct.pack_into(buffer, offset, nulls, *values, *lengths)
+
+    def decode(self, buffer, offset: int = 0) -> Dict:
+        """
+        Decodes a record into a dictionary.
+
+        :param buffer: The buffer holding the record.
+        :param offset: Optional; the position of the record in the buffer.
+        :return: The item.
+        """
+        nulls, *values = self._struct.unpack_from(buffer, offset)
+        if self._texts:
+            lengths = values[len(self.names):]
+            for (index, _, text), length in zip(self._texts, lengths):
+                value = values[index][:length]
+                values[index] = value.decode() if text else value
+        item = dict(zip(self.names, values))
+        if nulls != self._zero:
+            nulls = int.from_bytes(nulls, 'little')
+            for index, name in enumerate(self.names):
+                if nulls >> index & 1:
+                    item[name] = None
+        return item
+
+    def view(self, buffer, offset: int = 0) -> 'BinaryRecord':
+        """
+        Wraps a record into a read-only mapping, without copying nor
+        decoding it.
+
+        :param buffer: The buffer holding the record.
+        :param offset: Optional; the position of the record in the buffer.
+        :return: The mapping, decoding its values on access.
+        """
+        return BinaryRecord(self, buffer, offset)
+
+    def get_value(self, buffer, name: str, offset: int = 0) -> object:
+        """
+        Decodes a single value of a record.
+
+        :param buffer: The buffer holding the record.
+        :param name: The name of the field.
+        :param offset: Optional; the position of the record in the buffer.
+        :return: The value.
+        :raises KeyError: If the field does not exist.
+        """
+        return BinaryRecord(self, buffer, offset)[name]
+
+
+def _get_single(name: str) -> Callable[[Dict], Tuple]:
+    # itemgetter returns a single value, rather than a tuple, for one name.
+    return lambda data: (data[name],)
+
+
+def _replace_nulls(
+    values: Tuple,
+    zeros: Tuple,
+    size: int,
+) -> Tuple[bytes, Tuple]:
+    # Builds the bitmap of the None values, and replaces them with the zero
+    # value of their field.
+    nulls = 0
+    replaced = []
+    for index, (value, zero) in enumerate(zip(values, zeros)):
+        if value is None:
+            nulls |= 1 << index
+            value = zero
+        replaced.append(value)
+    return nulls.to_bytes(size, 'little'), tuple(replaced)
+
+
+class BinaryRecord(Mapping):
+    """
+    A read-only mapping over a binary record, see RecordCodec.view, which
+    decodes its values on access and never copies the record: it only
+    refers to its buffer, such as the memoryview of a shared memory block,
+    and its position. It stays valid as long as the buffer holds the
+    record, and to_dict copies it out.
+    """
+    __slots__ = ('codec', 'buffer', 'offset')
+
+    def __init__(self, codec: RecordCodec, buffer, offset: int = 0) -> None:
+        self.codec = codec
+        self.buffer = buffer
+        self.offset = offset
+
+    def __getitem__(self, name: str) -> object:
+        buffer, offset = self.buffer, self.offset
+        byte, bit, unpack_from, position, kind, start = (
+            self.codec._getters[name])
+        if buffer[offset + byte] & bit:
+            return None
+        value, = unpack_from(buffer, offset + position)
+        if kind is None:
+            return value
+        # The value is sliced out of the buffer, without its padding.
+        start += offset
+        value = bytes(buffer[start:start + value])
+        return value.decode() if kind is str else value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.codec.names)
+
+    def __len__(self) -> int:
+        return len(self.codec.names)
+
+    def __repr__(self) -> str:
+        return f'BinaryRecord({self.to_dict()!r})'
+
+    def to_dict(self) -> Dict:
+        """
+        Decodes the whole record.
+
+        :return: The values of the record, by name.
+        """
+        return self.codec.decode(self.buffer, self.offset)
@@ -0,0 +1,146 @@
+from bisect import bisect_right
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class Router:
+    """
+    A base class for declarative routing tables. A router is built once
+    into a lookup structure, and its route method returns the route key of
+    an item, or None if the item matches no route.
+    """
+    @property
+    def columns(self) -> List[str]:
+        """
+        Specifies the columns the routing depends on.
+
+        :return: List of column names.
+        """
+        return []
+
+    def route(self, item: Dict) -> Optional[Hashable]:
+        """
+        Looks up the route key of an item. This method must be implemented
+        by subclasses.
+
+        :param item: The item to be routed.
+        :return: The route key, or None if the item matches no route.
+        """
+        raise NotImplementedError
+
+
+class ColumnRouter(Router):
+    """
+    Routes items by the value of a column, either taken as the route key
+    itself or mapped to a route key through a lookup table.
+    """
+    def __init__(
+        self,
+        column: str,
+        routes: Dict[Hashable, Hashable] = None,
+    ) -> None:
+        """
+        Initializes the ColumnRouter with its routing column.
+
+        :param column: The column holding the routing value.
+        :param routes: Optional; a mapping from routing values to route
+                       keys. If not given, the value is the route key.
+        """
+        self.column = column
+        self.routes = routes
+        if routes is None:
+            self.route = lambda item: item.get(column)
+        else:
+            get_route = dict(routes).get
+            self.route = lambda item: get_route(item.get(column))
+
+    @property
+    def columns(self) -> List[str]:
+        return [self.column]
+
+
+class RangeRouter(Router):
+    """
+    Routes items by the range the value of a column falls in. The ranges
+    are half-open, [low, high), must not overlap, and are looked up with a
+    binary search.
+    """
+    def __init__(
+        self,
+        column: str,
+        ranges: Dict[Hashable, Tuple[object, object]],
+    ) -> None:
+        """
+        Initializes the RangeRouter with its routing column and ranges.
+
+        :param column: The column holding the routing value.
+        :param ranges: A mapping from route keys to (low, high) bounds,
+                       where a None bound is unbounded.
+        """
+        self.column = column
+        self.ranges = ranges
+        bounds = sorted(
+            ranges.items(),
+            key=lambda route: (route[1][0] is not None, route[1][0]),
+        )
+        self._lows, self._highs, self._keys = [], [], []
+        for key, (low, high) in bounds:
+            previous_high = self._highs[-1] if self._highs else low
+            if self._keys and (
+                previous_high is None or low is None or low < previous_high
+            ):
+                raise ValueError(
+                    f'Range of route {key} overlaps route {self._keys[-1]}.')
+            self._lows.append(low)
+            self._highs.append(high)
+            self._keys.append(key)
+        self._unbounded_low = bool(self._lows) and self._lows[0] is None
+        if self._unbounded_low:
+            self._lows = self._lows[1:]
+
+    @property
+    def columns(self) -> List[str]:
+        return [self.column]
+
+    def route(self, item: Dict) -> Optional[Hashable]:
+        value = item.get(self.column)
+        if value is None:
+            return None
+        index = bisect_right(self._lows, value)
+        if not self._unbounded_low:
+            index -= 1
+            if index < 0:
+                return None
+        high = self._highs[index]
+        if high is not None and value >= high:
+            return None
+        return self._keys[index]
+
+
+class PredicateRouter(Router):
+    """
+    Routes items through a table of predicates evaluated in order: an item
+    goes to the route of the first predicate it satisfies.
+    """
+    def __init__(
+        self,
+        routes: List[Tuple[Hashable, Callable[[Dict], bool]]],
+        columns: List[str] = None,
+    ) -> None:
+        """
+        Initializes the PredicateRouter with its predicate table.
+
+        :param routes: A list of (route key, predicate) pairs.
+        :param columns: Optional; the columns the predicates depend on.
+        """
+        self.routes = list(routes)
+        self._columns = columns or []
+
+    @property
+    def columns(self) -> List[str]:
+        return self._columns
+
+    def route(self, item: Dict) -> Optional[Hashable]:
+        for key, predicate in self.routes:
+            if predicate(item):
+                return key
+        return None
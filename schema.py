@@ -0,0 +1,55 @@
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class SchemaError(ValueError):
+    """
+    Raised when a stage or a consumer requires columns which are not
+    produced upstream.
+    """
+
+
+def check_columns(
+    owner: str,
+    required_columns: Iterable[str],
+    columns: Optional[Set[str]],
+) -> None:
+    """
+    Checks that the required columns are among the available columns.
+
+    :param owner: The name of the stage or consumer, for the error message.
+    :param required_columns: The columns required by the stage or consumer.
+    :param columns: The columns available upstream, or None if unknown, in
+                    which case nothing is checked.
+    """
+    if columns is None:
+        return
+    missing = set(required_columns or ()) - set(columns)
+    if missing:
+        raise SchemaError(
+            f'{owner} requires the columns {sorted(missing)}, which are not '
+            f'produced upstream. Available columns: {sorted(columns)}.'
+        )
+
+
+def validate_stages(
+    stages: List[Dict],
+    columns: Optional[Set[str]],
+) -> Optional[Set[str]]:
+    """
+    Validates a sequence of stages against the columns of the items
+    entering the first one. The logged columns of a stage are added to the
+    columns of its output items, unless the stage aggregates its items.
+
+    :param stages: The stage infos of a pipeline.
+    :param columns: The columns of the input items, or None if unknown.
+    :return: The columns of the output items of the last stage, or None if
+             unknown.
+    """
+    if columns is not None:
+        columns = set(columns)
+    for stage_info in stages:
+        stage = stage_info['stage']
+        columns = stage.validate(columns)
+        if columns is not None and not stage.aggregating:
+            columns = columns | set(stage_info.get('logged_columns') or ())
+    return columns
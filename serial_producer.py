@@ -1,3 +1,4 @@
+from itertools import islice
 from typing import Dict, Iterator
 
 from .producer import Producer
@@ -6,7 +7,8 @@ from .producer import Producer
 class SerialProducer(Producer):
     """
     A producer that generates items from a serial data source, such as a
-    list or file, for processing in a pipeline.
+    list or file, for processing in a pipeline. Its offset is the number of
+    items produced, so a run can be resumed over the same source.
     """
     def __init__(self, source) -> None:
         """
@@ -15,6 +17,21 @@ class SerialProducer(Producer):
         :param source: The data source providing items to be processed.
         """
         self.source = source
+        self._offset = 0
+        self._skip = 0
+
+    @property
+    def offset(self) -> int:
+        return self._offset
+
+    def seek(self, offset: int) -> None:
+        self._skip = offset
 
     def to_stream(self) -> Iterator[Dict]:
-        yield from self.source
+        source = iter(self.source)
+        self._offset = 0
+        if self._skip:
+            self._offset = sum(1 for _ in islice(source, self._skip))
+        for item in source:
+            self._offset += 1
+            yield item
@@ -0,0 +1,162 @@
+import logging
+import os
+import traceback
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Optional, Tuple
+
+from .checkpoint import Checkpoint
+from .consumer import Consumer
+from .metrics import Metrics
+from .producer import Producer
+from .task import Task
+
+_worker_task = None
+
+
+def _init_worker(task: 'ShardedTask') -> None:
+    """
+    Initializes a worker process with its own copy of the task.
+    """
+    global _worker_task
+    _worker_task = task
+
+
+def _run_shard(
+    index: int,
+    producer: Producer,
+) -> Tuple[int, Optional[Metrics], Optional[str], Any]:
+    return (index,) + _worker_task.run_shard(index, producer)
+
+
+class ShardedTask(Task):
+    """
+    A task splitting the stream of its producer into shards, see
+    Producer.shards, and running the same graph of pipeline and consumer on
+    every shard in a pool of worker processes. Every shard builds its own
+    execution plan, whose pipeline and consumer go through their own Start
+    and Stop signals. The metrics of the shards are merged into the metrics
+    of the task, their errors are collected in `errors`, and the results of
+    the consumers can be merged by overriding get_shard_result and combine.
+    The task must be picklable unless the workers are forked.
+    """
+    def __init__(self, **kwargs) -> None:
+        """
+        Initializes the ShardedTask with optional configuration parameters.
+
+        :param kwargs: Configuration parameters for the task, see Task. The
+                       stream is split into `workers` shards, which defaults
+                       to the number of processors, and hash-partitioned on
+                       the `shard_key` column, or columns, if set. The
+                       workers are started with the `mp_context`
+                       multiprocessing context if set. Every shard keeps its
+                       own checkpoint, next to the checkpoint of the task.
+        """
+        super().__init__(**kwargs)
+        self.workers = kwargs.get('workers') or os.cpu_count() or 1
+        self.shard_key = kwargs.get('shard_key')
+        self.mp_context = kwargs.get('mp_context')
+        self.errors: List[str] = []
+
+    def get_shard_result(self, consumer: Consumer) -> Any:
+        """
+        Extracts the result of a shard from its consumer once the shard has
+        been consumed, to be sent back to the parent process. The result
+        must be picklable.
+
+        :param consumer: The consumer of the shard.
+        :return: The result of the shard, None by default.
+        """
+        return None
+
+    def combine(self, results: List[Any]) -> None:
+        """
+        Merges the results of the shards, for consumers that aggregate.
+        This method is called in the parent process once every shard has
+        completed, and does nothing by default.
+
+        :param results: The results of the shards, in the order of the
+                        shards, see get_shard_result.
+        """
+        pass
+
+    def run_shard(
+        self,
+        index: int,
+        producer: Producer,
+    ) -> Tuple[Optional[Metrics], Optional[str], Any]:
+        """
+        Streams a shard through a fresh execution plan, see
+        PlanBuilder.build_plan, in a worker process, so that the shard is
+        validated and optimized as the task would be.
+
+        :param index: The index of the shard.
+        :param producer: The producer of the shard.
+        :return: The metrics of the shard if instrumented, the formatted
+                 error if the shard failed, and the result of the shard.
+        """
+        metrics = Metrics() if self.metrics else None
+        if self.checkpoint:
+            self.checkpoint = Checkpoint(
+                f'{self.checkpoint.path}.{index}',
+                every_items=self.checkpoint.every_items,
+                every_seconds=self.checkpoint.every_seconds,
+            )
+        try:
+            producer = self.get_producer(producer)
+            plan = self.build_plan(producer.produced_columns, metrics)
+            if metrics:
+                metrics.start()
+            plan.run(producer)
+            if metrics:
+                metrics.stop()
+            if self.checkpoint:
+                self.checkpoint.remove()
+            return metrics, None, self.get_shard_result(plan.consumer)
+        except Exception:
+            if metrics:
+                metrics.stop()
+            return metrics, traceback.format_exc(), None
+
+    def main(self) -> None:
+        try:
+            warnings.warn(f'{self.name} started ...')
+            logging.info(f'{self.name} started ...')
+            self.setup()
+            if self.metrics:
+                self.metrics.start()
+            shards = self.producer.shards(self.workers, key=self.shard_key)
+            results = [None] * len(shards)
+            with ProcessPoolExecutor(
+                max_workers=len(shards),
+                mp_context=self.mp_context,
+                initializer=_init_worker,
+                initargs=(self,),
+            ) as executor:
+                futures = [
+                    executor.submit(_run_shard, index, shard)
+                    for index, shard in enumerate(shards)
+                ]
+                for future in futures:
+                    index, metrics, error, result = future.result()
+                    if metrics and self.metrics:
+                        self.metrics.merge(metrics)
+                    if error:
+                        self.errors.append(error)
+                        logging.warning(
+                            f'{self.name} shard {index} failed: {error}')
+                    results[index] = result
+            if self.errors:
+                raise RuntimeError(
+                    f'{len(self.errors)} of {len(shards)} shards failed.')
+            self.combine(results)
+        except Exception as ex:
+            warnings.warn(f'{self.name} failed: {traceback.format_exc()}')
+            logging.warning(f'{self.name} failed ...')
+            logging.exception(str(ex))
+        finally:
+            if self.metrics:
+                self.metrics.stop()
+            self.teardown()
+            warnings.warn(f'{self.name} stopped ...')
+            logging.info(f'{self.name} stopped ...')
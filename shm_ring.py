@@ -0,0 +1,208 @@
+import multiprocessing
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, List
+
+from .record_codec import BinaryRecord, RecordCodec
+
+# The number of records written, the number of records read, and whether
+# the writer has closed the ring.
+_HEADER = struct.Struct('<qq?')
+_HEADER_SIZE = 64
+_END = object()
+
+
+class SharedRing:
+    """
+    A bounded ring buffer of binary records, see record_codec.RecordCodec,
+    in a shared memory block, carrying items of a fixed schema from one
+    writer process to one reader process without pickling them. The
+    writer encodes the items in place, in the free slots of the ring, and
+    the reader gets BinaryRecord views over the slots, which only decode
+    the values they are asked for. The slots of the records returned by
+    get are handed back to the writer by the next call to get, or by
+    release, so that the records must be copied out with to_dict to be
+    kept longer. A lock guards the counters of the ring, which are
+    updated once per group of records, and a full or empty ring is
+    polled with growing sleeps. The ring is passed to the other process
+    as an argument of multiprocessing.Process, and the process creating
+    it unlinks it. ProcessPoolStage and ShardedTask do not use rings: the
+    workers of a process pool take their chunks from a single shared task
+    queue, whereas a ring links one writer to one reader, and the shards
+    of a ShardedTask read their own producers, so that no item crosses
+    processes.
+    """
+    def __init__(
+        self,
+        codec: RecordCodec,
+        capacity: int = 65536,
+        name: str = None,
+        lock=None,
+    ) -> None:
+        """
+        Initializes the SharedRing, creating its shared memory block unless
+        its name is given.
+
+        :param codec: The codec of the records.
+        :param capacity: Optional; the number of records of the ring.
+        :param name: Optional; the name of an existing block to attach to.
+        :param lock: Optional; the lock shared with the other process.
+        """
+        self.codec = codec
+        self.capacity = capacity
+        self.lock = lock if lock is not None else multiprocessing.Lock()
+        # The creating process owns the block, even in forked processes.
+        self.owner = os.getpid() if name is None else None
+        self.memory = shared_memory.SharedMemory(
+            name=name,
+            create=name is None,
+            size=_HEADER_SIZE + capacity * codec.size,
+        )
+        if name is None:
+            _HEADER.pack_into(self.memory.buf, 0, 0, 0, False)
+        self._written = 0
+        self._read = 0
+        self._pending = 0
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def __getstate__(self) -> Dict:
+        return {
+            'codec': self.codec,
+            'capacity': self.capacity,
+            'name': self.name,
+            'lock': self.lock,
+            'owner': self.owner,
+        }
+
+    def __setstate__(self, state: Dict) -> None:
+        owner = state.pop('owner')
+        self.__init__(**state)
+        self.owner = owner
+
+    def put_many(self, items: Iterable[Dict]) -> None:
+        """
+        Writes items into the ring, waiting for free slots when it is full.
+
+        :param items: The items to be written.
+        """
+        codec, capacity = self.codec, self.capacity
+        size, buffer = codec.size, self.memory.buf
+        encode_into = codec.encode_into
+        iterator = iter(items)
+        item = next(iterator, _END)
+        while item is not _END:
+            free = self._wait_free()
+            position = self._written
+            while free and item is not _END:
+                encode_into(
+                    buffer, _HEADER_SIZE + position % capacity * size, item)
+                position += 1
+                free -= 1
+                item = next(iterator, _END)
+            self._written = position
+            with self.lock:
+                _, read, closed = _HEADER.unpack_from(buffer)
+                _HEADER.pack_into(buffer, 0, position, read, closed)
+
+    def put(self, item: Dict) -> None:
+        """
+        Writes an item into the ring, waiting for a free slot when it is
+        full. Writing items in groups with put_many is faster.
+
+        :param item: The item to be written.
+        """
+        self.put_many((item,))
+
+    def close(self) -> None:
+        """
+        Tells the reader that no more items will be written.
+        """
+        with self.lock:
+            written, read, _ = _HEADER.unpack_from(self.memory.buf)
+            _HEADER.pack_into(self.memory.buf, 0, written, read, True)
+
+    def get(self, max_count: int = None) -> List[BinaryRecord]:
+        """
+        Reads the available records, waiting for some when the ring is
+        empty, and releases the records returned by the previous call.
+
+        :param max_count: Optional; the maximum number of records read.
+        :return: The records, or an empty list once the ring is closed and
+                 empty.
+        """
+        self.release()
+        codec, capacity = self.codec, self.capacity
+        size, buffer = codec.size, self.memory.buf
+        delay = 0.0
+        while True:
+            with self.lock:
+                written, _, closed = _HEADER.unpack_from(buffer)
+            available = written - self._read
+            if available or closed:
+                break
+            time.sleep(delay)
+            delay = min(delay * 2 or 1e-5, 1e-3)
+        if max_count is not None:
+            available = min(available, max_count)
+        records = []
+        view = codec.view
+        for position in range(self._read, self._read + available):
+            records.append(
+                view(buffer, _HEADER_SIZE + position % capacity * size))
+        self._pending = available
+        return records
+
+    def release(self) -> None:
+        """
+        Hands the slots of the records returned by the last call to get
+        back to the writer.
+        """
+        if not self._pending:
+            return
+        self._read += self._pending
+        self._pending = 0
+        with self.lock:
+            written, _, closed = _HEADER.unpack_from(self.memory.buf)
+            _HEADER.pack_into(
+                self.memory.buf, 0, written, self._read, closed)
+
+    def __iter__(self) -> Iterator[BinaryRecord]:
+        """
+        Reads all the records, until the ring is closed and empty. Every
+        record stays valid until the iteration moves past the group of
+        records it was read with.
+
+        :return: An iterator over the records.
+        """
+        while True:
+            records = self.get()
+            if not records:
+                return
+            yield from records
+
+    def detach(self) -> None:
+        """
+        Detaches the ring from its shared memory block, and removes the
+        block if the ring created it. No record of the ring may be used
+        afterwards.
+        """
+        self._pending = 0
+        self.memory.close()
+        if self.owner == os.getpid():
+            self.memory.unlink()
+
+    def _wait_free(self) -> int:
+        delay = 0.0
+        while True:
+            with self.lock:
+                _, read, _ = _HEADER.unpack_from(self.memory.buf)
+            free = self.capacity - (self._written - read)
+            if free:
+                return free
+            time.sleep(delay)
+            delay = min(delay * 2 or 1e-5, 1e-3)
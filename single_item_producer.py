@@ -1,4 +1,4 @@
-from typing import Any, Dict, Iterator
+from typing import Any, Dict, Iterator, List
 
 from .producer import Producer
 
@@ -15,6 +15,22 @@ class SingleItemProducer(Producer):
         :param item: The single item to be processed.
         """
         self.item = item
+        self._offset = 0
+        self._skip = 0
+
+    @property
+    def offset(self) -> int:
+        return self._offset
+
+    def seek(self, offset: int) -> None:
+        self._skip = offset
+
+    @property
+    def produced_columns(self) -> List[str]:
+        return list(self.item)
 
     def to_stream(self) -> Iterator[Dict]:
-        yield self.item
+        self._offset = self._skip
+        if not self._skip:
+            self._offset = 1
+            yield self.item
@@ -0,0 +1,62 @@
+import sqlite3
+from operator import itemgetter
+from typing import Dict, List, Set
+
+from .buffered_consumer import BufferedConsumer
+
+
+class SqliteConsumer(BufferedConsumer):
+    """
+    A sink inserting the given columns of items into a SQLite table, with
+    one executemany call and one transaction per buffer.
+    """
+    def __init__(
+        self,
+        database: str,
+        table: str,
+        columns: List[str],
+        **kwargs,
+    ) -> None:
+        """
+        Initializes the SqliteConsumer with the table to be written.
+
+        :param database: The path of the database file.
+        :param table: The name of the table, which must exist.
+        :param columns: The columns to be inserted, in order.
+        :param kwargs: Additional keyword arguments, see BufferedConsumer.
+        """
+        super().__init__(**kwargs)
+        self.database = database
+        self.table = table
+        self.columns = columns
+        self.connection = None
+        names = ', '.join(self.quote(column) for column in columns)
+        values = ', '.join('?' * len(columns))
+        self.statement = (
+            f'INSERT INTO {self.quote(table)} ({names}) VALUES ({values})')
+        if len(columns) == 1:
+            column, = columns
+            self._get_row = lambda item: (item[column],)
+        else:
+            self._get_row = itemgetter(*columns)
+
+    @staticmethod
+    def quote(name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    @property
+    def required_columns(self) -> Set:
+        return set(self.columns)
+
+    def setup(self, item: Dict) -> None:
+        self.connection = sqlite3.connect(self.database)
+
+    def flush(self, batch: List[Dict]) -> None:
+        with self.connection:
+            self.connection.executemany(
+                self.statement, map(self._get_row, batch))
+
+    def teardown(self, item: Dict) -> None:
+        super().teardown(item)
+        self.connection.close()
+        self.connection = None
@@ -1,6 +1,7 @@
-from typing import Dict, Iterable, Iterator
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 
-from .base_stage import BaseStage, Start, Stop
+from .base_stage import BaseStage, Start, Stop, compile_projection
+from .common import Barrier, Batch
 
 
 class Stage(BaseStage):
@@ -10,6 +11,33 @@ class Stage(BaseStage):
     and teardown phases of data handling, offering a structured approach to
     data transformation or analysis.
     """
+    def __init__(
+        self,
+        name: str = None,
+        batch_size: int = None,
+        no_copy: bool = False,
+        records: bool = False,
+    ) -> None:
+        """
+        Initializes the Stage with an optional name and batch size.
+
+        :param name: Optional; the name of the stage.
+        :param batch_size: Optional; when set, data items are grouped into
+                           batches of this size and handed to process_batch.
+        :param no_copy: Optional; if True, output items are passed through
+                        without being copied when neither output columns
+                        nor logged columns are configured.
+        :param records: Optional; if True, the declared input and output
+                        columns are projected into compact Record objects
+                        instead of dictionaries, see record.Record.
+        """
+        super().__init__(name, no_copy=no_copy, records=records)
+        self._batch_size = batch_size
+
+    @property
+    def batch_size(self) -> Optional[int]:
+        return self._batch_size
+
     def setup(self, item: Dict) -> Iterator:
         """
         Sets up any necessary resources or state before starting the
@@ -32,6 +60,19 @@ class Stage(BaseStage):
         """
         raise NotImplementedError
 
+    def process_batch(self, items: List[Dict]) -> Iterator[Iterable[Dict]]:
+        """
+        Processes a batch of items when the stage runs in batch mode. This
+        method may be overridden by subclasses to process the whole batch at
+        once. By default, it calls process for every item of the batch.
+
+        :param items: The batch of items to be processed.
+        :return: An iterator yielding, for every input item and in the same
+                 order, an iterable of its processed items.
+        """
+        for item in items:
+            yield self.process(item)
+
     def teardown(self, item: Dict) -> Iterator:
         """
         Cleans up any resources or state after the processing of data items
@@ -57,17 +98,96 @@ class Stage(BaseStage):
         :return: An iterator over all processed and potentially transformed
                  data items.
         """
+        if self.batch_size:
+            yield from self.run_batches(source, **kwargs)
+            return
         source = source or []
-        logged_columns = kwargs.get('logged_columns') or []
+        get_logged = None if self.aggregating else compile_projection(
+            kwargs.get('logged_columns'), missing_ok=True)
         for in_data in source:
-            item = self.get_input_item(in_data)
-            logged = {k: in_data.get(k) for k in logged_columns}
-            if isinstance(item, Start):
-                for out_data in self.setup(item):
+            logged = get_logged(in_data) if get_logged else None
+            if isinstance(in_data, Start):
+                self.compile_projections()
+                for out_data in self.setup(in_data):
                     yield self.get_output_item(out_data, logged_data=logged)
-            elif isinstance(item, Stop):
-                for out_data in self.teardown(item):
+            elif isinstance(in_data, Stop):
+                for out_data in self.teardown(in_data):
                     yield self.get_output_item(out_data, logged_data=logged)
+            elif isinstance(in_data, Barrier):
+                if self.stateless:
+                    yield in_data
             else:
+                item = self.get_input_item(in_data)
                 for out_data in self.process(item):
                     yield self.get_output_item(out_data, logged_data=logged)
+
+    def run_batches(self, source: Iterable = None, **kwargs) -> Iterator:
+        """
+        Executes the stage in batch mode. Data items arriving between the
+        signals are grouped into batches of batch_size items,
+        and every batch is projected, processed by process_batch and merged
+        with its logged data in one go. Batches received from an upstream
+        batch-capable stage are processed without being split.
+
+        :param source: An iterable of source data items or batches.
+        :param kwargs: Additional keyword arguments. `logged_columns` lists
+                       the columns carried over from input to output items
+                       and `emit_batches` requests the processed items to be
+                       yielded as batches instead of one by one.
+        :return: An iterator over processed data items or batches.
+        """
+        source = source or []
+        get_logged = None if self.aggregating else compile_projection(
+            kwargs.get('logged_columns'), missing_ok=True)
+        emit_batches = kwargs.get('emit_batches') or False
+        batch_size = self.batch_size
+        pending = Batch()
+        for in_data in source:
+            if isinstance(in_data, Batch):
+                if pending or len(in_data) < batch_size:
+                    pending.extend(in_data)
+                else:
+                    yield from self._run_batch(
+                        in_data, get_logged, emit_batches)
+            elif isinstance(in_data, (Start, Stop, Barrier)):
+                if pending:
+                    yield from self._run_batch(
+                        pending, get_logged, emit_batches)
+                    pending = Batch()
+                if isinstance(in_data, Barrier):
+                    if self.stateless:
+                        yield in_data
+                    continue
+                logged = get_logged(in_data) if get_logged else None
+                if isinstance(in_data, Start):
+                    self.compile_projections()
+                    outputs = self.setup(in_data)
+                else:
+                    outputs = self.teardown(in_data)
+                for out_data in outputs:
+                    yield self.get_output_item(out_data, logged_data=logged)
+                continue
+            else:
+                pending.append(in_data)
+            if len(pending) >= batch_size:
+                yield from self._run_batch(pending, get_logged, emit_batches)
+                pending = Batch()
+        if pending:
+            yield from self._run_batch(pending, get_logged, emit_batches)
+
+    def _run_batch(
+        self,
+        items: Batch,
+        get_logged: Optional[Callable[[Dict], Dict]],
+        emit_batches: bool,
+    ) -> Iterator:
+        logged = list(map(get_logged, items)) if get_logged else None
+        batch = self.get_output_batch(
+            self.process_batch(self.get_input_batch(items)),
+            logged_data=logged,
+        )
+        if emit_batches:
+            if batch:
+                yield batch
+        else:
+            yield from batch
@@ -1,13 +1,14 @@
 import logging
 import traceback
 import warnings
+from typing import Dict, Optional
 
-from .consumer import Consumer
-from .pipeline import Pipeline
-from .producer import Producer
+from .checkpoint import Checkpoint
+from .metrics import Metrics
+from .plan import PlanBuilder
 
 
-class Task:
+class Task(PlanBuilder):
     """
     A high-level class designed to orchestrate the execution of a data
     processing task, integrating producers, pipelines, and consumers in a
@@ -17,21 +18,39 @@ class Task:
         """
         Initializes the Task with optional configuration parameters.
 
-        :param kwargs: Configuration parameters for the task.
+        :param kwargs: Configuration parameters for the task. If
+                       `instrument` is True, the stages and consumers are
+                       instrumented, and a summary is logged every
+                       `log_interval` seconds if set. If `checkpoint` (a
+                       state file path) is set or `resume` is True, the
+                       position of the producer is checkpointed every
+                       `checkpoint_items` items and/or `checkpoint_seconds`
+                       seconds, and a run with `resume` set restarts from
+                       the last checkpoint. If `reuse_plan` is True, the
+                       graph of pipeline and consumer is built once per
+                       plan key, from the class and `plan_options` of the
+                       task, and reused by the next tasks, see
+                       PlanBuilder.get_plan.
+                       If `optimize` is True, the pipeline is optimized
+                       when the plan is built, see optimizer.optimize.
         """
+        self.options = dict(kwargs)
         self.name = kwargs.get('name') or self.__class__.__name__
-
-    @property
-    def pipeline(self) -> Pipeline:
-        raise NotImplementedError
-
-    @property
-    def consumer(self) -> Consumer:
-        raise NotImplementedError
-
-    @property
-    def producer(self) -> Producer:
-        raise NotImplementedError
+        self.metrics = (
+            Metrics(log_interval=kwargs.get('log_interval'))
+            if kwargs.get('instrument') else None
+        )
+        self.resume = kwargs.get('resume') or False
+        self.checkpoint = (
+            Checkpoint(
+                kwargs.get('checkpoint') or f'{self.name}.checkpoint',
+                every_items=kwargs.get('checkpoint_items'),
+                every_seconds=kwargs.get('checkpoint_seconds'),
+            )
+            if kwargs.get('checkpoint') or self.resume else None
+        )
+        self.reuse_plan = kwargs.get('reuse_plan') or False
+        self.optimize = kwargs.get('optimize') or False
 
     def setup(self) -> None:
         pass
@@ -39,17 +58,38 @@ class Task:
     def teardown(self) -> None:
         pass
 
+    @property
+    def report(self) -> Optional[Dict]:
+        """
+        The structured report of the instrumentation metrics. It only
+        covers the run of this task, even when its plan is reused.
+
+        :return: The report, or None if the task is not instrumented.
+        """
+        return self.metrics.report() if self.metrics else None
+
+    def get_option(self, name: str) -> object:
+        return self.options.get(name)
+
     def main(self) -> None:
         try:
             warnings.warn(f'{self.name} started ...')
             logging.info(f'{self.name} started ...')
             self.setup()
-            self.consumer.consume(self.pipeline.run(self.producer.stream))
+            producer = self.get_producer()
+            plan = self.get_plan(producer.produced_columns)
+            if self.metrics:
+                self.metrics.start()
+            plan.run(producer)
+            if self.checkpoint:
+                self.checkpoint.remove()
         except Exception as ex:
             warnings.warn(f'{self.name} failed: {traceback.format_exc()}')
             logging.warning(f'{self.name} failed ...')
             logging.exception(str(ex))
         finally:
+            if self.metrics:
+                self.metrics.stop()
             self.teardown()
             warnings.warn(f'{self.name} stopped ...')
             logging.info(f'{self.name} stopped ...')
@@ -0,0 +1,168 @@
+import queue
+import threading
+from typing import Iterable, Iterator, List
+
+from .base_stage import BaseStage
+from .pipeline import Pipeline
+
+_END = object()
+
+
+class _Failure:
+    """
+    Carries an exception raised in a stage thread down to the caller.
+    """
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class _UpstreamFailure(Exception):
+    def __init__(self, failure: _Failure) -> None:
+        super().__init__(str(failure.error))
+        self.failure = failure
+
+
+class ThreadedPipeline(Pipeline):
+    """
+    A pipeline running every stage in its own thread, so that stages make
+    progress concurrently instead of one at a time. The producer, the
+    stages and the caller are connected by bounded queues, through which
+    the Start and Stop signals and any exception raised by a stage are
+    propagated. Stage code does not need to change.
+    """
+    def __init__(
+        self,
+        stage: BaseStage,
+        logged_columns: List[str] = None,
+        name: str = None,
+        queue_size: int = 1000,
+    ) -> None:
+        """
+        Initializes the ThreadedPipeline with a single starting stage.
+
+        :param stage: The first processing stage to be added to the pipeline.
+        :param logged_columns: Optional columns to be logged during processing.
+        :param name: Optional name for the pipeline.
+        :param queue_size: Optional; the capacity of the queue feeding the
+                           first stage, which is also the default capacity
+                           for the other queues.
+        """
+        super().__init__(stage, logged_columns=logged_columns, name=name)
+        self.queue_size = queue_size
+        self.stages[0]['queue_size'] = queue_size
+
+    def add_stage(
+        self,
+        stage: BaseStage,
+        logged_columns: List[str] = None,
+        name: str = None,
+        queue_size: int = None,
+    ) -> 'ThreadedPipeline':
+        """
+        Adds a new stage to the pipeline for processing items in sequence.
+
+        :param stage: The stage to be added.
+        :param logged_columns: Optional columns to be logged by this stage.
+        :param name: Optional name for the stage.
+        :param queue_size: Optional; the capacity of the queue feeding this
+                           stage.
+        :return: The pipeline instance to allow for method chaining.
+        """
+        super().add_stage(stage, logged_columns=logged_columns, name=name)
+        self.stages[-1]['queue_size'] = queue_size
+        return self
+
+    def run(self, source: Iterable = None, **kwargs) -> Iterator:
+        """
+        Starts one thread reading the source and one thread per stage, and
+        yields the items coming out of the last stage. Stopping the
+        iteration early stops all the threads.
+
+        :param source: An iterable of source data items for processing.
+        :param kwargs: Additional keyword arguments, see Pipeline.run.
+        :return: An iterator over all processed data items.
+        """
+        stopped = threading.Event()
+        stage_runs = self.get_stage_runs(**kwargs)
+        queues = [
+            queue.Queue(
+                maxsize=stage_info.get('queue_size') or self.queue_size)
+            for stage_info, _ in stage_runs
+        ] + [queue.Queue(maxsize=self.queue_size)]
+        threads = [threading.Thread(
+            target=self._feed,
+            args=(source or [], queues[0], stopped),
+            name=f'{self.name}:source',
+            daemon=True,
+        )]
+        for index, (stage_info, run_kwargs) in enumerate(stage_runs):
+            stage = stage_info['stage']
+            threads.append(threading.Thread(
+                target=self._feed,
+                args=(
+                    stage.run(
+                        self._receive(queues[index], stopped), **run_kwargs),
+                    queues[index + 1],
+                    stopped,
+                ),
+                name=f'{self.name}:{stage.name}',
+                daemon=True,
+            ))
+        for thread in threads:
+            thread.start()
+        try:
+            yield from self._receive(queues[-1], stopped)
+        except _UpstreamFailure as ex:
+            raise ex.failure.error
+        finally:
+            stopped.set()
+
+    @classmethod
+    def _feed(
+        cls,
+        items: Iterable,
+        out_queue: queue.Queue,
+        stopped: threading.Event,
+    ) -> None:
+        """
+        Puts the given items in the queue, followed by an end marker, or by
+        a failure if iterating over the items raises an exception.
+        """
+        try:
+            for item in items:
+                if not cls._put(out_queue, item, stopped):
+                    return
+            cls._put(out_queue, _END, stopped)
+        except _UpstreamFailure as ex:
+            cls._put(out_queue, ex.failure, stopped)
+        except Exception as ex:
+            cls._put(out_queue, _Failure(ex), stopped)
+
+    @staticmethod
+    def _put(
+        out_queue: queue.Queue,
+        item: object,
+        stopped: threading.Event,
+    ) -> bool:
+        while not stopped.is_set():
+            try:
+                out_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _receive(in_queue: queue.Queue, stopped: threading.Event) -> Iterator:
+        while True:
+            try:
+                item = in_queue.get(timeout=0.1)
+            except queue.Empty:
+                if stopped.is_set():
+                    return
+                continue
+            if item is _END:
+                return
+            if isinstance(item, _Failure):
+                raise _UpstreamFailure(item)
+            yield item
@@ -0,0 +1,145 @@
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .base_stage import compile_projection
+from .columnar import ColumnBatch
+from .common import Barrier, Batch, Start, Stop
+from .stage import Stage
+
+
+class VectorStage(Stage):
+    """
+    A stage processing whole columns at once instead of one item at a time,
+    which avoids allocating and indexing a dictionary for every item.
+    Incoming items and batches are grouped into ColumnBatch objects of
+    batch_size items, and ColumnBatch objects coming from an upstream
+    vectorized stage are processed as they are. The input and output
+    columns select columns without copying them, and logged columns are
+    carried over by reference. Within a Pipeline, the stage hands
+    ColumnBatch objects over to a following vectorized stage, and items or
+    batches to any other stage.
+    """
+    def __init__(self, name: str = None, batch_size: int = 1024) -> None:
+        """
+        Initializes the VectorStage with an optional name and batch size.
+
+        :param name: Optional; the name of the stage.
+        :param batch_size: Optional; the number of items grouped into a
+                           ColumnBatch.
+        """
+        super().__init__(name, batch_size=batch_size)
+
+    @property
+    def columnar(self) -> bool:
+        return True
+
+    def process_columns(self, batch: ColumnBatch) -> ColumnBatch:
+        """
+        Processes a whole batch of items, column by column. This method must
+        be implemented by subclasses. The output batch must hold as many
+        items as the input batch when logged columns are configured.
+
+        :param batch: The input columns of the items.
+        :return: The columns of the processed items.
+        """
+        raise NotImplementedError
+
+    def process(self, item: Dict) -> Iterator:
+        batch = ColumnBatch.from_rows([item])
+        yield from self.process_columns(batch).to_rows()
+
+    def run(self, source: Iterable = None, **kwargs) -> Iterator:
+        """
+        Executes the stage on whole columns. Data items arriving between the
+        signals are grouped into ColumnBatch objects of batch_size items.
+
+        :param source: An iterable of source data items, batches or
+                       ColumnBatch objects.
+        :param kwargs: Additional keyword arguments. `logged_columns` lists
+                       the columns carried over from input to output items,
+                       `emit_columns` requests the processed items to be
+                       yielded as ColumnBatch objects, and `emit_batches` as
+                       batches, instead of one by one.
+        :return: An iterator over processed data items, batches or
+                 ColumnBatch objects.
+        """
+        source = source or []
+        logged_columns = kwargs.get('logged_columns') or []
+        get_logged = compile_projection(logged_columns, missing_ok=True)
+        emit = (
+            kwargs.get('emit_columns') or False,
+            kwargs.get('emit_batches') or False,
+        )
+        batch_size = self.batch_size
+        pending = Batch()
+        for in_data in source:
+            if isinstance(in_data, ColumnBatch):
+                if pending:
+                    yield from self._run_columns(
+                        ColumnBatch.from_rows(pending), logged_columns, emit)
+                    pending = Batch()
+                yield from self._run_columns(in_data, logged_columns, emit)
+                continue
+            if isinstance(in_data, Batch):
+                pending.extend(in_data)
+            elif isinstance(in_data, (Start, Stop, Barrier)):
+                if pending:
+                    yield from self._run_columns(
+                        ColumnBatch.from_rows(pending), logged_columns, emit)
+                    pending = Batch()
+                if isinstance(in_data, Barrier):
+                    if self.stateless:
+                        yield in_data
+                    continue
+                logged = get_logged(in_data) if get_logged else None
+                if isinstance(in_data, Start):
+                    self.compile_projections()
+                    outputs = self.setup(in_data)
+                else:
+                    outputs = self.teardown(in_data)
+                for out_data in outputs:
+                    yield self.get_output_item(out_data, logged_data=logged)
+                continue
+            else:
+                pending.append(in_data)
+            if len(pending) >= batch_size:
+                yield from self._run_columns(
+                    ColumnBatch.from_rows(pending), logged_columns, emit)
+                pending = Batch()
+        if pending:
+            yield from self._run_columns(
+                ColumnBatch.from_rows(pending), logged_columns, emit)
+
+    def _run_columns(
+        self,
+        batch: ColumnBatch,
+        logged_columns: List[str],
+        emit: Tuple[bool, bool],
+    ) -> Iterator:
+        input_columns = self.input_columns
+        out_batch = self.process_columns(
+            batch.select(input_columns) if input_columns else batch)
+        output_columns = self.output_columns
+        if output_columns:
+            out_batch = out_batch.select(output_columns)
+        if logged_columns:
+            if out_batch.num_rows != batch.num_rows:
+                raise ValueError(
+                    f'Stage {self.name} cannot carry logged columns over '
+                    f'{batch.num_rows} items to {out_batch.num_rows} items.'
+                )
+            # Missing logged columns are carried over as None, as in row
+            # mode.
+            out_batch = ColumnBatch({**out_batch, **{
+                column: batch[column] if column in batch
+                else [None] * batch.num_rows
+                for column in logged_columns
+            }}, num_rows=out_batch.num_rows)
+        emit_columns, emit_batches = emit
+        if not out_batch.num_rows:
+            return
+        if emit_columns:
+            yield out_batch
+        elif emit_batches:
+            yield out_batch.to_rows()
+        else:
+            yield from out_batch.to_rows()
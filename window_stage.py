@@ -0,0 +1,273 @@
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Union
+
+from .aggregation import Aggregations, Aggregator, get_key_getter
+from .common import Stop
+from .stage import Stage
+
+
+class WindowStage(Stage):
+    """
+    A stage aggregating the items of every key over windows, with
+    incremental accumulators, see aggregation.Aggregator.
+
+    Count windows hold `size` consecutive items of a key, and a new window
+    starts every `step` items of the key. Their bounds are the positions,
+    within the stream, of their first item and of the item following their
+    last item, and the state of a key is dropped once it has no open
+    window, so that idle keys hold no memory. Time windows last `duration`
+    seconds, and start every `step` seconds on a grid aligned on the
+    epoch. The time of an item is read from time_column, in seconds, or is
+    the processing time. A time window is emitted once an item later than
+    its end arrives, and the items arriving after their windows have been
+    emitted are counted in late_items and dropped. Every output item
+    carries the key columns, the window_start and window_end columns and
+    the aggregated columns. The
+    windows still open when the Stop signal arrives are emitted as they
+    are, before the Stop signal, and count windows then end with the
+    stream. The logged data of the items is not carried over to the
+    windows, see BaseStage.aggregating.
+    """
+    window_columns = ['window_start', 'window_end']
+
+    def __init__(
+        self,
+        aggregations: Aggregations,
+        key: Union[str, List[str], None] = None,
+        size: int = None,
+        duration: float = None,
+        step: Union[int, float] = None,
+        time_column: str = None,
+        name: str = None,
+    ) -> None:
+        """
+        Initializes the WindowStage with its aggregations and windows.
+
+        :param aggregations: The aggregations, by output column, see
+                             aggregation.Aggregator.
+        :param key: Optional; the column, or columns, of the keys windowed
+                    separately.
+        :param size: The number of items of a count window.
+        :param duration: The number of seconds of a time window.
+        :param step: The number of items, or seconds, between the starts of
+                     two windows.
+        :param time_column: Optional; the column holding the time of the
+                            items of time windows.
+        :param name: Optional; the name of the stage.
+        :raises ValueError: If the windows are not properly defined.
+        """
+        super().__init__(name)
+        if (size is None) == (duration is None):
+            raise ValueError('Either size or duration must be given.')
+        length = size if duration is None else duration
+        if not length or length <= 0 or not step or step <= 0:
+            raise ValueError(
+                f'Invalid window of {length} with a step of {step}.')
+        self.key_columns, self.get_key = get_key_getter(key)
+        self.aggregator = Aggregator(aggregations)
+        self.size = size
+        self.duration = duration
+        self.step = step
+        self.time_column = time_column
+        self.late_items = 0
+        self._position = 0
+        self._windows: Dict = {}
+        self._watermark: Optional[float] = None
+
+    @property
+    def input_columns(self) -> List[str]:
+        time_columns = [self.time_column] if self.time_column else []
+        return list(dict.fromkeys([
+            *self.key_columns,
+            *time_columns,
+            *self.aggregator.input_columns,
+        ]))
+
+    @property
+    def output_columns(self) -> List[str]:
+        return [
+            *self.key_columns,
+            *self.window_columns,
+            *self.aggregator.names,
+        ]
+
+    @property
+    def stateless(self) -> bool:
+        return False
+
+    @property
+    def aggregating(self) -> bool:
+        return True
+
+    def setup(self, item: Dict) -> Iterator:
+        self.late_items = 0
+        self._position = 0
+        self._windows = {}
+        self._watermark = None
+        yield from super().setup(item)
+
+    def process(self, item: Dict) -> Iterator:
+        if self.duration is None:
+            return self._process_count(item)
+        return self._process_time(item)
+
+    def teardown(self, item: Stop) -> Iterator:
+        windows, self._windows = self._windows, {}
+        if self.duration is None:
+            for key, (_, open_windows) in windows.items():
+                for start, accumulators, _ in open_windows:
+                    yield self.get_result(
+                        key, start, self._position, accumulators)
+        else:
+            for start in sorted(windows):
+                yield from self._emit_time_window(start, windows.pop(start))
+        yield from super().teardown(item)
+
+    def get_result(
+        self,
+        key: tuple,
+        start: Union[int, float],
+        end: Union[int, float],
+        accumulators: List,
+    ) -> Dict:
+        """
+        Builds the output item of a window.
+
+        :param key: The key of the window.
+        :param start: The start of the window.
+        :param end: The end of the window, excluded.
+        :param accumulators: The accumulators of the window.
+        :return: The key, window and aggregated columns of the window.
+        """
+        return {
+            **dict(zip(self.key_columns, key)),
+            'window_start': start,
+            'window_end': end,
+            **self.aggregator.result(accumulators),
+        }
+
+    def _process_count(self, item: Dict) -> Iterator[Dict]:
+        position = self._position
+        self._position = position + 1
+        key = self.get_key(item)
+        # The state of a key is the number of its items to come before its
+        # next window opens, and its open windows, each made of its start,
+        # its accumulators and its number of items.
+        state = self._windows.get(key)
+        if state is None:
+            state = self._windows[key] = [0, deque()]
+        open_windows: Deque[List] = state[1]
+        if not state[0]:
+            open_windows.append([position, self.aggregator.create(), 0])
+            state[0] = self.step
+        state[0] -= 1
+        for window in open_windows:
+            self.aggregator.add(window[1], item)
+            window[2] += 1
+        # Windows are opened, and thus completed, in order.
+        while open_windows and open_windows[0][2] >= self.size:
+            start, accumulators, _ = open_windows.popleft()
+            yield self.get_result(key, start, position + 1, accumulators)
+        if not open_windows and not state[0]:
+            del self._windows[key]
+
+    def _process_time(self, item: Dict) -> Iterator[Dict]:
+        moment = item.get(self.time_column) if self.time_column else None
+        if moment is None:
+            moment = time.time()
+        watermark = self._watermark
+        if watermark is None or moment > watermark:
+            self._watermark = watermark = moment
+        # The windows containing the item start in (moment - duration,
+        # moment], on the grid of steps.
+        last = math.floor(moment / self.step) * self.step
+        first = last
+        while first - self.step > moment - self.duration:
+            first -= self.step
+        key = self.get_key(item)
+        windows = self._windows
+        added = False
+        start = first
+        while start <= last:
+            if start + self.duration > watermark:
+                groups = windows.get(start)
+                if groups is None:
+                    groups = windows[start] = {}
+                accumulators = groups.get(key)
+                if accumulators is None:
+                    accumulators = groups[key] = self.aggregator.create()
+                self.aggregator.add(accumulators, item)
+                added = True
+            start += self.step
+        if not added:
+            self.late_items += 1
+        for start in sorted(windows):
+            if start + self.duration > watermark:
+                break
+            yield from self._emit_time_window(start, windows.pop(start))
+
+    def _emit_time_window(
+        self,
+        start: float,
+        groups: Dict[tuple, List],
+    ) -> Iterator[Dict]:
+        for key, accumulators in groups.items():
+            yield self.get_result(
+                key, start, start + self.duration, accumulators)
+
+
+class TumblingWindowStage(WindowStage):
+    """
+    A stage aggregating the items of every key over consecutive windows
+    which do not overlap, of `size` items or `duration` seconds, see
+    WindowStage.
+    """
+    def __init__(
+        self,
+        aggregations: Aggregations,
+        key: Union[str, List[str], None] = None,
+        size: int = None,
+        duration: float = None,
+        time_column: str = None,
+        name: str = None,
+    ) -> None:
+        super().__init__(
+            aggregations,
+            key=key,
+            size=size,
+            duration=duration,
+            step=size if duration is None else duration,
+            time_column=time_column,
+            name=name,
+        )
+
+
+class SlidingWindowStage(WindowStage):
+    """
+    A stage aggregating the items of every key over overlapping windows of
+    `size` items or `duration` seconds, starting every `step` items or
+    seconds, see WindowStage. Every item is added to the accumulators of
+    each of the windows it belongs to, so that a key holds at most
+    size / step sets of accumulators.
+    """
+    def __init__(
+        self,
+        aggregations: Aggregations,
+        step: Union[int, float],
+        key: Union[str, List[str], None] = None,
+        size: int = None,
+        duration: float = None,
+        time_column: str = None,
+        name: str = None,
+    ) -> None:
+        super().__init__(
+            aggregations,
+            key=key,
+            size=size,
+            duration=duration,
+            step=step,
+            time_column=time_column,
+            name=name,
+        )